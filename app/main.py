@@ -4,6 +4,7 @@ from contextlib import asynccontextmanager
 import asyncio
 import logging
 import os
+import re
 import time
 import uuid
 import warnings
@@ -80,6 +81,10 @@ class _AccessLogNoiseFilter(logging.Filter):
         "/api/stores",
         "/api/keys/count",
     )
+    # 一次 regex 掃描取代逐一組字串比對
+    _QUIET_GET_PATTERN = re.compile(
+        "GET (?:" + "|".join(re.escape(path) for path in _QUIET_GET_PATHS) + ") "
+    )
 
     def filter(self, record: logging.LogRecord) -> bool:
         msg = record.getMessage()
@@ -87,7 +92,7 @@ class _AccessLogNoiseFilter(logging.Filter):
             return False
         if "/tts/tts_" in msg and " 202" in msg:
             return False
-        if " 200" in msg and any(f"GET {p} " in msg for p in self._QUIET_GET_PATHS):
+        if " 200" in msg and self._QUIET_GET_PATTERN.search(msg):
             return False
         return True
 
@@ -304,12 +309,13 @@ def _get_system_prompt(api_key_info, store_name: str, messages: list) -> Optiona
     if not deps.prompt_manager:
         return None
 
+    store_prompts = deps.prompt_manager.get_store_prompts(store_name)
     if api_key_info and api_key_info.prompt_index is not None:
-        prompts = deps.prompt_manager.list_prompts(store_name)
+        prompts = store_prompts.prompts
         if 0 <= api_key_info.prompt_index < len(prompts):
             return prompts[api_key_info.prompt_index].content
 
-    active_prompt = deps.prompt_manager.get_active_prompt(store_name)
+    active_prompt = store_prompts.get_active_prompt()
     if active_prompt:
         return active_prompt.content
 
@@ -84,6 +84,12 @@ class Session(BaseModel):
         """判斷是否可以與 user 互動"""
         return self.step != SessionStep.SCORING
 
+    @property
+    def current_question_id(self) -> Optional[str]:
+        """目前題目的 id（無題目時為 None）"""
+        question = self.current_question
+        return question.get("id") if isinstance(question, dict) else None
+
     def is_quiz_complete(self, total_questions: int) -> bool:
         """判斷測驗是否完成"""
         return len(self.answers) >= total_questions
@@ -6,7 +6,7 @@ Prompt 管理模組 (MongoDB 版本)
 import logging
 import uuid
 from datetime import datetime, timezone
-from typing import List, Optional, Dict, Any
+from typing import Any, Dict, Iterable, List, Optional
 
 from pydantic import BaseModel, Field
 from pymongo import MongoClient
@@ -89,6 +89,15 @@ class StorePrompts(BaseModel):
     quiz_negative_keywords: List[str] = Field(default_factory=list)
     quiz_copy: Dict[str, Dict[str, str]] = Field(default_factory=dict)
 
+    def find_prompt(self, prompt_id: Optional[str]) -> Optional[Prompt]:
+        """在已載入的 prompts 中找指定 id（最多 3 筆，直接線性掃）。"""
+        if not prompt_id:
+            return None
+        return next((p for p in self.prompts if p.id == prompt_id), None)
+
+    def get_active_prompt(self) -> Optional[Prompt]:
+        return self.find_prompt(self.active_prompt_id)
+
 
 
 class PromptManager:
@@ -117,9 +126,23 @@ class PromptManager:
 
         log(f"[PromptManager] 已連接 MongoDB: {self.DB_NAME}.{self.COLLECTION_NAME}")
 
-    def get_store_prompts(self, store_name: str) -> StorePrompts:
-        """載入 Store 的 prompts"""
-        doc = self.collection.find_one({"store_name": store_name})
+    def get_store_prompts(
+        self,
+        store_name: str,
+        fields: Optional[Iterable[str]] = None,
+    ) -> StorePrompts:
+        """載入 Store 的 prompts
+
+        Args:
+            store_name: Store 名稱
+            fields: 只讀取這些欄位（Mongo projection），未列出的欄位為預設值。
+                僅供唯讀路徑使用，部分載入的物件不可再 save_store_prompts。
+        """
+        projection = None
+        if fields is not None:
+            projection = {field: 1 for field in fields}
+            projection["store_name"] = 1
+        doc = self.collection.find_one({"store_name": store_name}, projection)
 
         if not doc:
             return StorePrompts(store_name=store_name)
@@ -149,22 +172,11 @@ class PromptManager:
 
     def get_prompt(self, store_name: str, prompt_id: str) -> Optional[Prompt]:
         """取得特定 prompt"""
-        store_prompts = self.get_store_prompts(store_name)
-
-        for prompt in store_prompts.prompts:
-            if prompt.id == prompt_id:
-                return prompt
-
-        return None
+        return self.get_store_prompts(store_name).find_prompt(prompt_id)
 
     def get_active_prompt(self, store_name: str) -> Optional[Prompt]:
         """取得當前啟用的 prompt"""
-        store_prompts = self.get_store_prompts(store_name)
-
-        if not store_prompts.active_prompt_id:
-            return None
-
-        return self.get_prompt(store_name, store_prompts.active_prompt_id)
+        return self.get_store_prompts(store_name).get_active_prompt()
 
     def create_prompt(
         self,
@@ -223,30 +235,29 @@ class PromptManager:
             ValueError: Prompt 不存在
         """
         store_prompts = self.get_store_prompts(store_name)
+        prompt = store_prompts.find_prompt(prompt_id)
+        if prompt is None:
+            raise ValueError(f"Prompt {prompt_id} 不存在")
+
+        # prompt 是 store_prompts.prompts 裡同一個物件，原地修改即可
+        if name is not None:
+            prompt.name = name
+        if content is not None:
+            prompt.content = content
+        if content_en is not None:
+            prompt.content_en = content_en
+        if response_rule_sections is not None:
+            prompt.response_rule_sections = response_rule_sections
+        if welcome is not None:
+            prompt.welcome = welcome
+        if max_response_chars is not None:
+            prompt.max_response_chars = max_response_chars
+        prompt.updated_at = datetime.now(timezone.utc).isoformat()
+
+        self.save_store_prompts(store_prompts)
+        log(f"[PromptManager] 更新 Prompt: {prompt_id}")
 
-        for i, prompt in enumerate(store_prompts.prompts):
-            if prompt.id == prompt_id:
-                if name is not None:
-                    prompt.name = name
-                if content is not None:
-                    prompt.content = content
-                if content_en is not None:
-                    prompt.content_en = content_en
-                if response_rule_sections is not None:
-                    prompt.response_rule_sections = response_rule_sections
-                if welcome is not None:
-                    prompt.welcome = welcome
-                if max_response_chars is not None:
-                    prompt.max_response_chars = max_response_chars
-                prompt.updated_at = datetime.now(timezone.utc).isoformat()
-
-                store_prompts.prompts[i] = prompt
-                self.save_store_prompts(store_prompts)
-                log(f"[PromptManager] 更新 Prompt: {prompt_id}")
-
-                return prompt
-
-        raise ValueError(f"Prompt {prompt_id} 不存在")
+        return prompt
 
     def delete_prompt(self, store_name: str, prompt_id: str):
         """刪除 prompt
@@ -8,24 +8,37 @@ HCIoT 扁平於 persona_by_prompt[id]）。
 
 from __future__ import annotations
 
+import os
 import re
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Callable, Dict, Optional, Tuple, Type
 
 from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 
 from app.auth import verify_authenticated
+from app.prompts import PromptIndexEntry
 from app.services.agent_utils import normalize_language as _normalize_language
+from app.services.gemini_service import run_sync
 import app.deps as deps
 
 SUPPORTED_LANGUAGES = ("zh", "en")
 
+# 讀取端點（list / active / runtime-settings）的短 TTL 快取秒數；設 0 停用。
+# 快取為 per-process，mutation 只會清掉處理該請求的 worker，其他 worker 最多晚 TTL 秒看到變更。
+_READ_CACHE_TTL_SEC = float(os.getenv("PERSONA_READ_CACHE_TTL_SECONDS", "10"))
+
 
 class PersonaStorageAdapter:
     """抽象 persona 資料在 store_prompts 上的讀寫方式。"""
 
+    # persona 所在的 StorePrompts 頂層欄位（唯讀端點用來做 projection）
+    attr: str
+
     def get(self, store_prompts, prompt_id: str) -> Optional[Dict[str, str]]:
         raise NotImplementedError
 
@@ -160,43 +173,109 @@ class _RuntimeRuleSectionsPayload(BaseModel):
     knowledge_rules: Optional[str] = None
 
 
+class _RuntimeRuleSectionsByLanguage(BaseModel):
+    """固定 zh / en 兩個欄位（取代 Dict[str, ...]），其他語言 key 一律忽略。"""
+
+    zh: Optional[_RuntimeRuleSectionsPayload] = None
+    en: Optional[_RuntimeRuleSectionsPayload] = None
+
+
+class _RuntimeWelcomeByLanguage(BaseModel):
+    zh: Optional[_RuntimeWelcomePayload] = None
+    en: Optional[_RuntimeWelcomePayload] = None
+
+
 class _UpdateRuntimeSettingsRequestBase(BaseModel):
     prompt_id: Optional[str] = None
-    response_rule_sections: Optional[Dict[str, _RuntimeRuleSectionsPayload]] = None
-    welcome: Optional[Dict[str, _RuntimeWelcomePayload]] = None
+    response_rule_sections: Optional[_RuntimeRuleSectionsByLanguage] = None
+    welcome: Optional[_RuntimeWelcomeByLanguage] = None
     max_response_chars: Optional[int] = None
 
 
 def build_persona_router(config: PersonaRouterConfig) -> APIRouter:
     router = APIRouter(tags=[config.tag], dependencies=[Depends(verify_authenticated)])
 
+    read_cache: Dict[tuple, Tuple[float, bytes]] = {}
+    read_cache_generation = 0
+
+    def invalidate_read_cache() -> None:
+        nonlocal read_cache_generation
+        read_cache_generation += 1
+        read_cache.clear()
+
+    async def cached_read(key: tuple, build: Callable[[], dict]) -> Response:
+        """命中快取直接在 event loop 回傳；否則把 Mongo 讀取丟到 thread 執行。
+
+        快取存的是編碼好的 JSON bytes：命中時不必複製也不必再序列化，呼叫端拿不到可變的快取內容。
+        """
+        if _READ_CACHE_TTL_SEC > 0:
+            cached = read_cache.get(key)
+            if cached and time.monotonic() - cached[0] < _READ_CACHE_TTL_SEC:
+                return Response(content=cached[1], media_type="application/json")
+        generation = read_cache_generation
+        payload = await run_sync(build)
+        body = JSONResponse(jsonable_encoder(payload)).body
+        # 讀取期間若有 mutation 就不寫回，避免把舊資料放進剛清空的快取
+        if _READ_CACHE_TTL_SEC > 0 and generation == read_cache_generation:
+            read_cache[key] = (time.monotonic(), body)
+        return Response(content=body, media_type="application/json")
+
+    # list / active 只需要 index、啟用 id、persona map，不必把 runtime settings 等整份讀回來
+    persona_read_fields = (
+        config.prompt_index_attr,
+        config.active_prompt_id_attr,
+        config.persona_adapter.attr,
+    )
+
     def require_prompt_manager():
         if not deps.prompt_manager:
             raise HTTPException(status_code=500, detail="Prompt Manager 未初始化")
         return deps.prompt_manager
 
+    store_names = {"zh": config.store_name_zh, "en": config.store_name_en}
+
     def store_name_for(language: Optional[str]) -> str:
-        return config.store_name_en if _normalize_language(language) == "en" else config.store_name_zh
+        return store_names[_normalize_language(language)]
+
+    # 預設 persona / 預設 prompt 在 router 建立時算好，呼叫端會改動所以回傳 copy
+    _default_zh = config.persona_defaults.get("zh", "")
+    _default_persona = {"zh": _default_zh, "en": config.persona_defaults.get("en", _default_zh)}
+    _default_prompt_dicts = {
+        lang: {
+            "id": config.system_default_prompt_id,
+            "name": config.default_prompt_names[lang],
+            "content": config.persona_defaults.get(lang, _default_zh),
+            "created_at": "",
+            "updated_at": "",
+            "is_default": True,
+            "readonly": True,
+        }
+        for lang in SUPPORTED_LANGUAGES
+    }
 
     def default_persona_pair() -> Dict[str, str]:
-        zh = config.persona_defaults.get("zh", "")
-        en = config.persona_defaults.get("en", zh)
-        return {"zh": zh, "en": en}
+        return dict(_default_persona)
 
     def legacy_persona_pair(content: Optional[str]) -> Dict[str, str]:
         base = content or ""
-        if base in (config.persona_defaults.get("zh"), config.persona_defaults.get("en")):
+        if base in (_default_zh, config.persona_defaults.get("en")):
             return default_persona_pair()
         return {"zh": base, "en": base}
 
     def normalize_persona_pair(raw_pair, fallback_content: Optional[str]) -> Dict[str, str]:
-        legacy = legacy_persona_pair(fallback_content)
         if not isinstance(raw_pair, dict):
-            return legacy
+            return legacy_persona_pair(fallback_content)
+        # 兩種語言都有值是常態，只有缺值時才組 legacy fallback
         pair: Dict[str, str] = {}
+        legacy: Optional[Dict[str, str]] = None
         for lang in SUPPORTED_LANGUAGES:
             value = raw_pair.get(lang)
-            pair[lang] = value if isinstance(value, str) and value.strip() else legacy[lang]
+            if isinstance(value, str) and value.strip():
+                pair[lang] = value
+                continue
+            if legacy is None:
+                legacy = legacy_persona_pair(fallback_content)
+            pair[lang] = legacy[lang]
         return pair
 
     def prompt_content_for_language(
@@ -211,16 +290,7 @@ def build_persona_router(config: PersonaRouterConfig) -> APIRouter:
         return pair.get(lang, pair["zh"])
 
     def default_prompt_dict(language: str) -> dict:
-        lang = _normalize_language(language)
-        return {
-            "id": config.system_default_prompt_id,
-            "name": config.default_prompt_names[lang],
-            "content": config.persona_defaults.get(lang, config.persona_defaults.get("zh", "")),
-            "created_at": "",
-            "updated_at": "",
-            "is_default": True,
-            "readonly": True,
-        }
+        return dict(_default_prompt_dicts[_normalize_language(language)])
 
     def next_custom_prompt_name(prompts, language: str) -> str:
         lang = _normalize_language(language)
@@ -259,14 +329,19 @@ def build_persona_router(config: PersonaRouterConfig) -> APIRouter:
                 detail=f"自訂人物設定最多 {config.max_custom_prompts} 個",
             )
 
-    def copy_default_runtime(prompt_id: str, store_name: str):
+    def copy_default_runtime(prompt_id: str, store_name: str, store_prompts):
+        """把預設 runtime 複製到新人物設定（只改 store_prompts，由呼叫端一起 save）。"""
         pm = require_prompt_manager()
         base = config.runtime_settings_load(
             pm,
             config.system_default_prompt_id,
             store_name=store_name,
+            store_prompts=store_prompts,
+        )
+        config.runtime_settings_save(
+            pm, base, prompt_id=prompt_id, store_name=store_name,
+            store_prompts=store_prompts, persist=False,
         )
-        config.runtime_settings_save(pm, base, prompt_id=prompt_id, store_name=store_name)
 
     # --- App-specific index helpers ---
 
@@ -287,55 +362,61 @@ def build_persona_router(config: PersonaRouterConfig) -> APIRouter:
         """Write the app-specific active_prompt_id."""
         setattr(store_prompts, config.active_prompt_id_attr, prompt_id)
 
-    def _find_index_position(index: list, prompt_id: str) -> Optional[int]:
-        return next((i for i, entry in enumerate(index) if entry.id == prompt_id), None)
-
     def _find_index_entry(index: list, prompt_id: str):
-        position = _find_index_position(index, prompt_id)
-        return index[position] if position is not None else None
+        return next((entry for entry in index if entry.id == prompt_id), None)
+
+    def load_store_prompts(store_name: str):
+        """每個 request 只讀一次 store 文件；沒有 Prompt Manager 時回傳 None。"""
+        if not deps.prompt_manager:
+            return None
+        return deps.prompt_manager.get_store_prompts(store_name)
 
-    def validate_and_resolve_prompt_id(requested: Optional[str], store_name: str) -> str:
+    def validate_and_resolve_prompt_id(requested: Optional[str], store_prompts) -> str:
         if requested:
             if requested == config.system_default_prompt_id:
                 return config.system_default_prompt_id
-            pm = require_prompt_manager()
-            store_prompts = pm.get_store_prompts(store_name)
+            require_prompt_manager()
             index = _get_index(store_prompts)
             if _find_index_entry(index, requested) is None:
                 raise HTTPException(status_code=404, detail="人物設定不存在")
             return requested
-        if not deps.prompt_manager:
+        if store_prompts is None:
             return config.system_default_prompt_id
-        store_prompts = deps.prompt_manager.get_store_prompts(store_name)
         return _get_app_active_id(store_prompts) or config.system_default_prompt_id
 
     def merge_runtime_settings(current, request):
-        data = current.model_dump()
+        # model_copy 不重跑驗證；欄位型別已由 request model 把關、字數上下限由 endpoint 檢查
+        updated = current.model_copy(deep=True)
         if request.response_rule_sections is not None:
             for lang in SUPPORTED_LANGUAGES:
-                section = request.response_rule_sections.get(lang)
+                section = getattr(request.response_rule_sections, lang)
                 if not section:
                     continue
+                target = updated.response_rule_sections[lang]
                 for field in config.runtime_settings_rule_section_fields:
                     value = getattr(section, field, None)
                     if isinstance(value, str) and value.strip():
-                        data["response_rule_sections"][lang][field] = value
+                        setattr(target, field, value)
         if request.welcome is not None:
             for lang in SUPPORTED_LANGUAGES:
-                block = request.welcome.get(lang)
+                block = getattr(request.welcome, lang)
                 if not block:
                     continue
+                target = updated.welcome[lang]
                 if isinstance(block.title, str) and block.title.strip():
-                    data["welcome"][lang]["title"] = block.title
+                    target.title = block.title
                 if isinstance(block.description, str) and block.description.strip():
-                    data["welcome"][lang]["description"] = block.description
+                    target.description = block.description
         if request.max_response_chars is not None:
-            data["max_response_chars"] = request.max_response_chars
-        return config.runtime_settings_type(**data)
+            updated.max_response_chars = request.max_response_chars
+        return updated
 
     @router.get("/")
-    def list_prompts(language: str = "zh"):
+    async def list_prompts(language: str = "zh"):
         lang = _normalize_language(language)
+        return await cached_read(("list", lang), lambda: build_prompt_list(lang))
+
+    def build_prompt_list(lang: str) -> dict:
         store_name = store_name_for(lang)
         default_prompt = default_prompt_dict(lang)
 
@@ -344,24 +425,26 @@ def build_persona_router(config: PersonaRouterConfig) -> APIRouter:
         store_prompts = None
 
         if deps.prompt_manager:
-            store_prompts = deps.prompt_manager.get_store_prompts(store_name)
-            index = _get_index(store_prompts)
-            custom_prompts = [entry.model_dump() for entry in index]
-            active_prompt_id = _get_app_active_id(store_prompts)
-
-        for p in custom_prompts:
-            p["content"] = prompt_content_for_language(
-                p["id"],
-                p.get("content"),
-                lang,
-                store_prompts,
+            store_prompts = deps.prompt_manager.get_store_prompts(
+                store_name, fields=persona_read_fields,
             )
-            p["is_default"] = False
-            p["readonly"] = False
+            active_prompt_id = _get_app_active_id(store_prompts)
+            # index entry 只有四個欄位，直接投影成 dict，不必走 model_dump
+            custom_prompts = [
+                {
+                    "id": entry.id,
+                    "name": entry.name,
+                    "created_at": entry.created_at,
+                    "updated_at": entry.updated_at,
+                    "content": prompt_content_for_language(entry.id, None, lang, store_prompts),
+                    "is_default": False,
+                    "readonly": False,
+                    "is_active": entry.id == active_prompt_id,
+                }
+                for entry in _get_index(store_prompts)
+            ]
 
         default_prompt["is_active"] = not active_prompt_id
-        for p in custom_prompts:
-            p["is_active"] = p["id"] == active_prompt_id
 
         custom_prompts.sort(key=lambda p: prompt_order_key(str(p.get("name", ""))))
 
@@ -380,8 +463,6 @@ def build_persona_router(config: PersonaRouterConfig) -> APIRouter:
         index = _get_index(store_prompts)
         enforce_custom_prompt_limit(index)
 
-        from app.prompts import PromptIndexEntry
-
         entry = PromptIndexEntry(name=request.name)
         index.append(entry)
         _set_index(store_prompts, index)
@@ -389,9 +470,9 @@ def build_persona_router(config: PersonaRouterConfig) -> APIRouter:
         persona_pair = default_persona_pair()
         persona_pair[lang] = request.content
         config.persona_adapter.set(store_prompts, entry.id, persona_pair)
+        copy_default_runtime(entry.id, store_name, store_prompts)
         pm.save_store_prompts(store_prompts)
-
-        copy_default_runtime(entry.id, store_name)
+        invalidate_read_cache()
 
         return entry.model_dump()
 
@@ -404,16 +485,14 @@ def build_persona_router(config: PersonaRouterConfig) -> APIRouter:
         index = _get_index(store_prompts)
         enforce_custom_prompt_limit(index)
 
-        from app.prompts import PromptIndexEntry
-
         entry = PromptIndexEntry(name=next_custom_prompt_name(index, lang))
         index.append(entry)
         _set_index(store_prompts, index)
         _set_app_active_id(store_prompts, entry.id)
         config.persona_adapter.set(store_prompts, entry.id, default_persona_pair())
+        copy_default_runtime(entry.id, store_name, store_prompts)
         pm.save_store_prompts(store_prompts)
-
-        copy_default_runtime(entry.id, store_name)
+        invalidate_read_cache()
 
         config.main_agent.remove_all_sessions()
         return {"prompt": entry.model_dump(), "message": config.clone_success_message}
@@ -430,11 +509,10 @@ def build_persona_router(config: PersonaRouterConfig) -> APIRouter:
         store_name = store_name_for(lang)
         store_prompts = pm.get_store_prompts(store_name)
         index = _get_index(store_prompts)
-        entry_idx = _find_index_position(index, prompt_id)
-        if entry_idx is None:
+        entry = _find_index_entry(index, prompt_id)
+        if entry is None:
             raise HTTPException(status_code=404, detail=f"Prompt {prompt_id} 不存在")
 
-        entry = index[entry_idx]
         if request.name is not None:
             entry.name = request.name
 
@@ -446,10 +524,11 @@ def build_persona_router(config: PersonaRouterConfig) -> APIRouter:
             persona_pair[lang] = request.content
             config.persona_adapter.set(store_prompts, prompt_id, persona_pair)
 
+        # entry 是 index 裡同一個物件，原地修改即可
         entry.updated_at = datetime.now(timezone.utc).isoformat()
-        index[entry_idx] = entry
         _set_index(store_prompts, index)
         pm.save_store_prompts(store_prompts)
+        invalidate_read_cache()
 
         payload = entry.model_dump()
         payload["content"] = persona_pair.get(lang, "")
@@ -482,6 +561,7 @@ def build_persona_router(config: PersonaRouterConfig) -> APIRouter:
                 setattr(store_prompts, config.runtime_overrides_attr, overrides)
 
         pm.save_store_prompts(store_prompts)
+        invalidate_read_cache()
         return {"message": "人物設定已刪除"}
 
     @router.post("/active")
@@ -499,23 +579,27 @@ def build_persona_router(config: PersonaRouterConfig) -> APIRouter:
             _set_app_active_id(store_prompts, None)
 
         pm.save_store_prompts(store_prompts)
+        invalidate_read_cache()
         config.main_agent.remove_all_sessions()
         return {"message": "已設定啟用的人物設定", "prompt_id": request.prompt_id}
 
     @router.get("/active")
-    def get_active_prompt(language: str = "zh"):
+    async def get_active_prompt(language: str = "zh"):
         pm = require_prompt_manager()
         lang = _normalize_language(language)
+        return await cached_read(("active", lang), lambda: build_active_prompt(pm, lang))
+
+    def build_active_prompt(pm, lang: str) -> dict:
         store_name = store_name_for(lang)
-        store_prompts = pm.get_store_prompts(store_name)
+        store_prompts = pm.get_store_prompts(store_name, fields=persona_read_fields)
         active_id = _get_app_active_id(store_prompts)
         if not active_id:
-            return {"prompt": default_prompt_dict(language), "is_default": True}
+            return {"prompt": default_prompt_dict(lang), "is_default": True}
 
         index = _get_index(store_prompts)
         entry = _find_index_entry(index, active_id)
         if not entry:
-            return {"prompt": default_prompt_dict(language), "is_default": True}
+            return {"prompt": default_prompt_dict(lang), "is_default": True}
 
         payload = entry.model_dump()
         payload["content"] = prompt_content_for_language(
@@ -524,13 +608,22 @@ def build_persona_router(config: PersonaRouterConfig) -> APIRouter:
         return {"prompt": payload, "is_default": False}
 
     @router.get("/runtime-settings")
-    def get_runtime_settings(prompt_id: Optional[str] = None, language: str = "zh"):
+    async def get_runtime_settings(prompt_id: Optional[str] = None, language: str = "zh"):
+        lang = _normalize_language(language)
+        return await cached_read(
+            ("runtime", lang, prompt_id),
+            lambda: build_runtime_settings(prompt_id, lang),
+        )
+
+    def build_runtime_settings(prompt_id: Optional[str], language: str) -> dict:
         store_name = store_name_for(language)
-        runtime_prompt_id = validate_and_resolve_prompt_id(prompt_id, store_name)
+        store_prompts = load_store_prompts(store_name)
+        runtime_prompt_id = validate_and_resolve_prompt_id(prompt_id, store_prompts)
         settings = config.runtime_settings_load(
             deps.prompt_manager,
             runtime_prompt_id,
             store_name=store_name,
+            store_prompts=store_prompts,
         )
         return {"prompt_id": runtime_prompt_id, "settings": settings.model_dump()}
 
@@ -549,15 +642,20 @@ def build_persona_router(config: PersonaRouterConfig) -> APIRouter:
                 )
         pm = require_prompt_manager()
         store_name = store_name_for(language)
-        runtime_prompt_id = validate_and_resolve_prompt_id(request.prompt_id, store_name)
+        store_prompts = pm.get_store_prompts(store_name)
+        runtime_prompt_id = validate_and_resolve_prompt_id(request.prompt_id, store_prompts)
         if runtime_prompt_id == config.system_default_prompt_id:
             raise HTTPException(status_code=403, detail=config.runtime_default_readonly_message)
 
-        current = config.runtime_settings_load(pm, runtime_prompt_id, store_name=store_name)
+        current = config.runtime_settings_load(
+            pm, runtime_prompt_id, store_name=store_name, store_prompts=store_prompts,
+        )
         updated = merge_runtime_settings(current, request)
         config.runtime_settings_save(
-            pm, updated, prompt_id=runtime_prompt_id, store_name=store_name
+            pm, updated, prompt_id=runtime_prompt_id, store_name=store_name,
+            store_prompts=store_prompts,
         )
+        invalidate_read_cache()
         config.main_agent.remove_all_sessions()
         return {
             "message": config.runtime_update_message,
@@ -16,6 +16,7 @@ import unicodedata
 from contextlib import contextmanager
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from operator import itemgetter
 from pathlib import Path
 from typing import Callable, Literal
 
@@ -405,7 +406,7 @@ def build_plain_topics_admin(
             if not filter_hidden:
                 payload["hidden"] = category_hidden
             categories.append(payload)
-        return sorted(categories, key=lambda item: item["order"])
+        return sorted(categories, key=itemgetter("order"))
 
     @public_router.get("/topics/{lang}")
     def list_topics_slim(lang: Lang):
@@ -21,6 +21,9 @@ from app.routers.knowledge_utils import (
     EDITABLE_EXTENSIONS,
     TEXT_PREVIEW_EXTENSIONS,
     extract_docx_text,
+    knowledge_cache_headers,
+    not_modified_response,
+    read_upload_limited,
     safe_filename,
     write_docx_text,
     xlsx_to_csv_bytes,
@@ -48,10 +51,11 @@ from app.routers._shared.qa_kb_upload import (
     save_qa_csv_to_topic,
 )
 from app.services._shared.qa_kb.csv_utils import _parse_csv_rows, merge_csv_files
+from app.services.gemini_service import run_sync
 
 logger = logging.getLogger(__name__)
 
-SUPPORTED_EXTRACT_EXTENSIONS = {".docx", ".txt", ".md", ".csv", ".xlsx"}
+SUPPORTED_EXTRACT_EXTENSIONS = frozenset({".docx", ".txt", ".md", ".csv", ".xlsx"})
 MAX_QA_EXTRACT_FILE_SIZE_BYTES = 5 * 1024 * 1024
 MAX_QA_EXTRACT_TEXT_LENGTH = 30000
 
@@ -138,7 +142,91 @@ def _get_doc_or_404(config: QaKbRouterConfig, language: str, filename: str) -> t
     return safe_name, doc
 
 
+def _save_knowledge_upload(
+    config: QaKbRouterConfig,
+    background_tasks: BackgroundTasks,
+    *,
+    language: str,
+    safe_name: str,
+    file_bytes: bytes,
+    upload_content_type: str | None,
+    category_id: str | None,
+    topic_id: str | None,
+    category_label: str | None,
+    topic_label: str | None,
+    hidden_questions: str | None,
+):
+    ext = Path(safe_name).suffix.lower()
+    if ext == ".xlsx":
+        try:
+            file_bytes = xlsx_to_csv_bytes(file_bytes)
+        except Exception as error:
+            return _fallback_upload_error_response(f"XLSX 轉檔失敗: {error}")
+        safe_name = Path(safe_name).with_suffix(".csv").name
+        ext = ".csv"
+
+    # Validate file size, count, and total store storage limit
+    store = config.knowledge_store_factory()
+    files = store.list_files(language)
+    validate_upload_limits(files, safe_name, file_bytes)
+
+    editable = ext in EDITABLE_EXTENSIONS
+    content_type = upload_content_type or mimetypes.guess_type(safe_name)[0] or "application/octet-stream"
+    if ext == ".csv":
+        try:
+            parsed = _parse_csv_rows(file_bytes)
+            if not parsed:
+                raise HTTPException(status_code=400, detail="CSV 解析失敗")
+            fieldnames, _ = parsed
+            if "q" not in fieldnames or "a" not in fieldnames:
+                raise HTTPException(status_code=400, detail="CSV 格式無法識別 q/a 欄位")
+            file_bytes = _prepare_csv_bytes(file_bytes)
+        except HTTPException as error:
+            return _fallback_upload_error_response(getattr(error, "detail", str(error)))
+
+    merged_topic_id = _build_merged_topic_id(category_id, topic_id)
+    parsed_hidden = _parse_hidden_questions(hidden_questions)
+
+    if ext == ".csv":
+        return save_qa_csv_to_topic(
+            config=config,
+            background_tasks=background_tasks,
+            language=language,
+            csv_bytes=file_bytes,
+            filename=safe_name,
+            content_type=content_type,
+            editable=editable,
+            topic_id=merged_topic_id,
+            category_label=category_label,
+            topic_label=topic_label,
+            hidden_questions=parsed_hidden,
+        )
 
+    saved = _insert_uploaded_file(
+        config,
+        language=language,
+        filename=safe_name,
+        file_bytes=file_bytes,
+        content_type=content_type,
+        editable=editable,
+        topic_id=merged_topic_id,
+        category_label=category_label,
+        topic_label=topic_label,
+    )
+    _schedule_rag_sync(config, background_tasks, language, saved["name"], file_bytes)
+    config.invalidate_cache(language)
+    return {
+        "name": saved["name"],
+        "display_name": saved["display_name"],
+        "size": saved["size"],
+        "synced": False,
+        "topic_synced": False,
+        "topic_id": saved.get("topic_id"),
+        "category_label": saved.get("category_label"),
+        "topic_label": saved.get("topic_label"),
+        "uploaded_count": 1,
+        "uploaded_files": [saved["name"]],
+    }
 
 
 def _add_knowledge_routes(router: APIRouter, config: QaKbRouterConfig) -> None:
@@ -148,11 +236,15 @@ def _add_knowledge_routes(router: APIRouter, config: QaKbRouterConfig) -> None:
         return {"files": files, "language": language}
 
     @router.get("/files/{filename}/content")
-    def get_file_content(filename: str, language: str = "zh"):
+    def get_file_content(request: Request, response: Response, filename: str, language: str = "zh"):
         safe_name, doc = _get_doc_or_404(config, language, filename)
 
         ext = Path(safe_name).suffix.lower()
         file_bytes = doc.get("data", b"")
+        cache_headers = knowledge_cache_headers(doc)
+        if (cached := not_modified_response(request, cache_headers)) is not None:
+            return cached
+        response.headers.update(cache_headers)
 
         if ext == ".docx":
             content = extract_docx_text(file_bytes)
@@ -170,12 +262,18 @@ def _add_knowledge_routes(router: APIRouter, config: QaKbRouterConfig) -> None:
         return {"filename": safe_name, "editable": True, "content": content, "size": doc.get("size", len(file_bytes))}
 
     @router.get("/files/{filename}/download")
-    def download_file(filename: str, language: str = "zh"):
+    def download_file(request: Request, filename: str, language: str = "zh"):
         safe_name, doc = _get_doc_or_404(config, language, filename)
 
         file_bytes = doc.get("data", b"")
+        cache_headers = knowledge_cache_headers(doc)
+        if (cached := not_modified_response(request, cache_headers)) is not None:
+            return cached
         content_type = doc.get("content_type") or "application/octet-stream"
-        headers = {"Content-Disposition": f"attachment; filename*=UTF-8''{quote(safe_name)}"}
+        headers = {
+            "Content-Disposition": f"attachment; filename*=UTF-8''{quote(safe_name)}",
+            **cache_headers,
+        }
         return Response(content=file_bytes, media_type=content_type, headers=headers)
 
     @router.put("/files/{filename}/content")
@@ -230,7 +328,7 @@ def _add_knowledge_routes(router: APIRouter, config: QaKbRouterConfig) -> None:
         return {"message": "已更新", "synced": False, "topic_synced": topic_synced}
 
     @router.put("/files/{filename}/metadata")
-    async def update_file_metadata(
+    def update_file_metadata(
         filename: str,
         request: UpdateFileMetadataRequest,
         language: str = "zh",
@@ -270,82 +368,25 @@ def _add_knowledge_routes(router: APIRouter, config: QaKbRouterConfig) -> None:
         check_upload_rate_limit(request)
         display_name = file.filename or f"file_{uuid.uuid4().hex[:8]}"
         safe_name = safe_filename(display_name)
-        file_bytes = await file.read()
-
-        ext = Path(safe_name).suffix.lower()
-        if ext == ".xlsx":
-            try:
-                file_bytes = xlsx_to_csv_bytes(file_bytes)
-            except Exception as error:
-                return _fallback_upload_error_response(f"XLSX 轉檔失敗: {error}")
-            safe_name = Path(safe_name).with_suffix(".csv").name
-            ext = ".csv"
-
-        # Validate file size, count, and total store storage limit
-        store = config.knowledge_store_factory()
-        files = store.list_files(language)
-        validate_upload_limits(files, safe_name, file_bytes)
-
-        editable = ext in EDITABLE_EXTENSIONS
-        content_type = file.content_type or mimetypes.guess_type(safe_name)[0] or "application/octet-stream"
-        if ext == ".csv":
-            try:
-                parsed = _parse_csv_rows(file_bytes)
-                if not parsed:
-                    raise HTTPException(status_code=400, detail="CSV 解析失敗")
-                fieldnames, _ = parsed
-                if "q" not in fieldnames or "a" not in fieldnames:
-                    raise HTTPException(status_code=400, detail="CSV 格式無法識別 q/a 欄位")
-                file_bytes = _prepare_csv_bytes(file_bytes)
-            except HTTPException as error:
-                return _fallback_upload_error_response(getattr(error, "detail", str(error)))
-
-        merged_topic_id = _build_merged_topic_id(category_id, topic_id)
-        parsed_hidden = _parse_hidden_questions(hidden_questions)
-
-        if ext == ".csv":
-            return save_qa_csv_to_topic(
-                config=config,
-                background_tasks=background_tasks,
-                language=language,
-                csv_bytes=file_bytes,
-                filename=safe_name,
-                content_type=content_type,
-                editable=editable,
-                topic_id=merged_topic_id,
-                category_label=category_label,
-                topic_label=topic_label,
-                hidden_questions=parsed_hidden,
-            )
-
-        saved = _insert_uploaded_file(
+        file_bytes = await read_upload_limited(file)
+        # 讀檔之後的驗證、轉檔、寫入與排程都是同步 Mongo/CPU 工作，移到 thread 執行
+        return await run_sync(
+            _save_knowledge_upload,
             config,
+            background_tasks,
             language=language,
-            filename=safe_name,
+            safe_name=safe_name,
             file_bytes=file_bytes,
-            content_type=content_type,
-            editable=editable,
-            topic_id=merged_topic_id,
+            upload_content_type=file.content_type,
+            category_id=category_id,
+            topic_id=topic_id,
             category_label=category_label,
             topic_label=topic_label,
+            hidden_questions=hidden_questions,
         )
-        _schedule_rag_sync(config, background_tasks, language, saved["name"], file_bytes)
-        config.invalidate_cache(language)
-        return {
-            "name": saved["name"],
-            "display_name": saved["display_name"],
-            "size": saved["size"],
-            "synced": False,
-            "topic_synced": False,
-            "topic_id": saved.get("topic_id"),
-            "category_label": saved.get("category_label"),
-            "topic_label": saved.get("topic_label"),
-            "uploaded_count": 1,
-            "uploaded_files": [saved["name"]],
-        }
 
     @router.delete("/files/{filename}")
-    async def delete_knowledge_file(
+    def delete_knowledge_file(
         filename: str,
         background_tasks: BackgroundTasks,
         language: str = "zh",
@@ -516,13 +557,11 @@ def _add_extract_routes(router: APIRouter, config: QaKbRouterConfig) -> None:
             if ext not in SUPPORTED_EXTRACT_EXTENSIONS:
                 raise HTTPException(status_code=400, detail="不支援的檔案格式，僅支援 .docx, .txt, .md, .csv, .xlsx")
 
-            file_bytes = await file.read()
-            if len(file_bytes) > MAX_QA_EXTRACT_FILE_SIZE_BYTES:
-                raise HTTPException(status_code=400, detail="檔案大小不可超過 5 MB")
+            file_bytes = await read_upload_limited(file, MAX_QA_EXTRACT_FILE_SIZE_BYTES)
 
             try:
                 extract_text = config.extract_text_from_upload or _extract_text_from_upload
-                text = extract_text(file_bytes, safe_name)
+                text = await run_sync(extract_text, file_bytes, safe_name)
             except ValueError as e:
                 raise HTTPException(status_code=400, detail=str(e)) from e
         elif text_input is not None and text_input.strip():
@@ -564,7 +603,7 @@ def _add_extract_routes(router: APIRouter, config: QaKbRouterConfig) -> None:
         return result
 
     @router.post("/qa-extract/{job_id}/import")
-    async def import_extracted_qa(
+    def import_extracted_qa(
         job_id: str,
         req: ImportQaRequest,
         background_tasks: BackgroundTasks,
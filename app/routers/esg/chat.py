@@ -4,9 +4,9 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime, timedelta, timezone
+from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 import app.deps as deps
 from app.auth import require_app_access, require_history_access, verify_admin
@@ -27,16 +27,18 @@ from app.services.esg.main_agent import main_agent
 from app.services.esg.quiz_flow import ESG_QUIZ_CONFIG
 from app.services.general.managed_chat import ManagedChatConfig, ManagedChatService
 from app.utils import (
+    FastJSONResponse,
     build_date_query,
     build_history_summary_response,
+    construct_export_response,
     count_session_conversations,
     export_sessions_by_ids,
-    filter_conversations_by_session_language,
+    export_sessions_by_mode,
     filter_export_sessions_by_language,
-    filter_session_ids_by_language,
-    group_conversations_by_session,
+    load_history_page,
     normalize_history_pagination,
     simplified_conversation_sessions,
+    stream_export_response,
 )
 
 _TZ_TAIPEI = timezone(timedelta(hours=8))
@@ -137,15 +139,12 @@ async def get_conversations(
     date_to: str | None = None,
     page: int = 1,
     page_size: int = 20,
+    cursor: str | None = None,
 ):
     try:
         conversation_logger = _get_conversation_logger()
         if session_id:
-            conversations = [
-                conversation
-                for conversation in conversation_logger.get_session_logs(session_id)
-                if conversation.get("mode") == _MODE
-            ]
+            conversations = conversation_logger.get_session_logs(session_id, mode=_MODE)
             return {
                 "session_id": session_id,
                 "mode": _MODE,
@@ -155,19 +154,19 @@ async def get_conversations(
 
         page, page_size = normalize_history_pagination(page, page_size)
         query = build_date_query(_MODE, date_from, date_to)
-        session_ids, total_sessions = conversation_logger.get_paginated_session_ids(
-            query=query,
-            page=page,
-            page_size=page_size,
+        sessions, total_sessions, next_cursor = load_history_page(
+            conversation_logger, query, page=page, page_size=page_size, cursor=cursor
         )
-        sessions = conversation_logger.get_session_summaries(session_ids, query=query)
         return build_history_summary_response(
             mode=_MODE,
             sessions=sessions,
             total_sessions=total_sessions,
-            page=page,
+            page=page if cursor is None else None,
             page_size=page_size,
+            next_cursor=next_cursor,
         )
+    except HTTPException:
+        raise
     except Exception as exc:
         logger.error("Failed to get ESG conversations: %s", exc)
         raise HTTPException(status_code=500, detail=str(exc))
@@ -213,11 +212,30 @@ async def export_conversations(
     date_to: str | None = None,
     simple: bool = False,
     language: str | None = None,
+    stream: bool = False,
+    limit: Annotated[int | None, Query(ge=1)] = None,
 ):
+    """匯出對話歷史；stream=true（且未指定 session_ids）時改以 NDJSON 逐頁串流。
+
+    limit 只匯出首則訊息時間最新的 N 個 session（未指定 session_ids 時有效，
+    stream=true 時亦同）。
+    """
     try:
         conversation_logger = _get_conversation_logger()
         session_manager = _get_session_manager()
 
+        if stream and not session_ids:
+            return stream_export_response(
+                conversation_logger,
+                _MODE,
+                date_from,
+                date_to,
+                session_manager,
+                language,
+                simple=simple,
+                limit=limit,
+            )
+
         if session_ids:
             sessions, total_conversations = export_sessions_by_ids(
                 conversation_logger,
@@ -232,25 +250,15 @@ async def export_conversations(
                 )
                 total_conversations = count_session_conversations(sessions)
         else:
-            if date_from or date_to:
-                query = build_date_query(_MODE, date_from, date_to)
-                ids, _ = conversation_logger.get_paginated_session_ids(
-                    query=query,
-                    page=1,
-                    page_size=100000,
-                )
-                ids = filter_session_ids_by_language(ids, session_manager, language)
-                conversations = conversation_logger.get_logs_for_sessions(ids)
-            else:
-                conversations = conversation_logger.get_session_logs_by_mode(_MODE)
-                conversations = filter_conversations_by_session_language(
-                    conversations,
-                    session_manager,
-                    language,
-                )
-
-            sessions = group_conversations_by_session(conversations)
-            total_conversations = len(conversations)
+            sessions, total_conversations = export_sessions_by_mode(
+                conversation_logger,
+                _MODE,
+                session_manager,
+                language,
+                limit=limit,
+                date_from=date_from,
+                date_to=date_to,
+            )
 
         result = {
             "exported_at": datetime.now(_TZ_TAIPEI).isoformat(),
@@ -260,10 +268,10 @@ async def export_conversations(
             "total_sessions": len(sessions),
         }
         if simple:
-            return JSONResponse(
+            return FastJSONResponse(
                 content=simplified_conversation_sessions(result["sessions"])
             )
-        return result
+        return construct_export_response(ExportConversationsResponse, result)
     except Exception as exc:
         logger.error("Failed to export ESG conversations: %s", exc)
         raise HTTPException(status_code=500, detail=str(exc))
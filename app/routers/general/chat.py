@@ -10,7 +10,6 @@ from datetime import datetime, timezone
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
 from app.auth import extract_user_gemini_api_key, verify_auth
@@ -28,14 +27,18 @@ from app.schemas.chat import (
     GeneralConversationsBySessionResponse,
     GeneralConversationsResponse,
 )
+from app.services.gemini_service import run_sync
 from app.services.tts_text import prepare_tts_text
 from app.models_config import DEFAULT_RAG_MODEL
 from app.utils import (
+    FastJSONResponse,
     LazyProxy,
     build_date_query,
     build_history_summary_response,
+    construct_export_response,
     export_sessions_by_ids,
     group_conversations_by_session,
+    load_history_page,
     normalize_history_pagination,
     simplified_conversation_sessions,
 )
@@ -123,13 +126,14 @@ def _resolve_active_prompt(store_name: str, auth: dict):
     if not deps.prompt_manager:
         return None
 
+    store_prompts = deps.prompt_manager.get_store_prompts(store_name)
     if auth.get("role") == "user" and auth.get("prompt_index") is not None:
-        prompts = deps.prompt_manager.list_prompts(store_name)
+        prompts = store_prompts.prompts
         prompt_index = auth["prompt_index"]
         if 0 <= prompt_index < len(prompts):
             return prompts[prompt_index]
 
-    return deps.prompt_manager.get_active_prompt(store_name)
+    return store_prompts.get_active_prompt()
 
 
 def _resolve_opening_message(store_name: str, auth: dict, language: str = "zh") -> str:
@@ -281,7 +285,7 @@ def start_chat(req: ChatStartRequest, request: Request, auth: dict = Depends(ver
     """Start a generic homepage chat session backed by local RAG."""
     if req.previous_session_id:
         main_agent.remove_session(req.previous_session_id)
-        logger.info("Cleaned up previous general session: %s...", req.previous_session_id[:8])
+        logger.info("Cleaned up previous general session: %.8s...", req.previous_session_id)
 
     user_gemini_api_key = extract_user_gemini_api_key(request)
     owner_key_hash = hash_user_gemini_api_key(user_gemini_api_key)
@@ -387,7 +391,11 @@ async def send_message(req: ChatMessageRequest, request: Request, auth: dict = D
 
             if req.turn_number:
                 try:
-                    _get_conversation_logger().delete_turns_from(session.session_id, req.turn_number)
+                    await run_sync(
+                        _get_conversation_logger().delete_turns_from,
+                        session.session_id,
+                        req.turn_number,
+                    )
                 except Exception:
                     pass
 
@@ -410,13 +418,17 @@ async def send_message(req: ChatMessageRequest, request: Request, auth: dict = D
                 session_manager.update_session(persisted)
         main_agent.remove_session(session.session_id)
         try:
-            _get_conversation_logger().delete_turns_from(session.session_id, req.turn_number)
+            await run_sync(
+                _get_conversation_logger().delete_turns_from,
+                session.session_id,
+                req.turn_number,
+            )
         except Exception:
             logger.exception("Failed to truncate general conversation logs")
 
     logger.info(
-        "[用戶訊息] Session: %s... | 訊息: '%s'",
-        session.session_id[:8],
+        "[用戶訊息] Session: %.8s... | 訊息: '%s'",
+        session.session_id,
         req.message,
     )
 
@@ -429,11 +441,11 @@ async def send_message(req: ChatMessageRequest, request: Request, auth: dict = D
 
     answer = result.get("message", "")
     citations = result.get("citations") or []
-    logger.info("[AI回應] 一般對話 | %s...", answer[:80])
+    logger.info("[AI回應] 一般對話 | %.80s...", answer)
 
     language = session.language
     tts_response = attach_tts_message_id(
-        ChatResponse(
+        ChatResponse.model_construct(
             message=answer,
             tts_text=prepare_tts_text(answer, language),
         ),
@@ -441,7 +453,8 @@ async def send_message(req: ChatMessageRequest, request: Request, auth: dict = D
         _get_tts_manager(),
     )
 
-    log_result = _get_conversation_logger().log_conversation(
+    log_result = await run_sync(
+        _get_conversation_logger().log_conversation,
         session_id=session.session_id,
         user_message=req.message,
         agent_response=answer,
@@ -496,6 +509,7 @@ def get_general_conversations(
     date_to: Optional[str] = None,
     page: int = 1,
     page_size: int = 20,
+    cursor: Optional[str] = None,
     auth: dict = Depends(verify_auth),
 ):
     """取得 general chat 的對話歷史（session 列表）"""
@@ -515,23 +529,22 @@ def get_general_conversations(
         )
 
         page, page_size = normalize_history_pagination(page, page_size)
-        session_ids, total_sessions = conversation_logger.get_paginated_session_ids(
-            query=query,
-            page=page,
-            page_size=page_size,
+        session_list, total_sessions, next_cursor = load_history_page(
+            conversation_logger, query, page=page, page_size=page_size, cursor=cursor
         )
 
-        session_list = conversation_logger.get_session_summaries(session_ids, query=query)
-
         return build_history_summary_response(
             mode="general",
             sessions=session_list,
             total_sessions=total_sessions,
-            page=page,
+            page=page if cursor is None else None,
             page_size=page_size,
+            next_cursor=next_cursor,
             extra={"store_name": store_name},
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Failed to get general conversations: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -588,9 +601,9 @@ def export_general_conversations(
         }
 
         if simple:
-            return JSONResponse(content=simplified_conversation_sessions(result.get("sessions", [])))
+            return FastJSONResponse(content=simplified_conversation_sessions(result.get("sessions", [])))
 
-        return result
+        return construct_export_response(ExportGeneralConversationsResponse, result)
 
     except Exception as e:
         logger.error("Failed to export general conversations: %s", e)
@@ -609,17 +622,16 @@ def get_general_conversation_detail(
     """取得指定 session 的完整對話內容"""
     try:
         conversation_logger = _get_conversation_logger()
-        conversations = conversation_logger.get_session_logs(session_id)
-        conversations = [c for c in conversations if c.get("mode") == "general"]
+        conversations = conversation_logger.get_session_logs(session_id, mode="general")
 
         store_name = "unknown"
         if conversations:
             store_name = conversations[0].get("session_snapshot", {}).get("store", "unknown")
 
         logger.info(
-            "Retrieved %d general conversations for session %s...",
+            "Retrieved %d general conversations for session %.8s...",
             len(conversations),
-            session_id[:8],
+            session_id,
         )
 
         return {
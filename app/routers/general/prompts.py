@@ -156,8 +156,9 @@ def list_store_prompts(store_name: str):
     if not deps.prompt_manager:
         raise HTTPException(status_code=500, detail="Prompt Manager 未初始化")
 
-    custom_prompts = [p.model_dump() for p in deps.prompt_manager.list_prompts(store_name)]
-    active_prompt = deps.prompt_manager.get_active_prompt(store_name)
+    store_prompts = deps.prompt_manager.get_store_prompts(store_name)
+    custom_prompts = [p.model_dump() for p in store_prompts.prompts]
+    active_prompt = store_prompts.get_active_prompt()
     active_prompt_id = active_prompt.id if active_prompt else None
 
     for p in custom_prompts:
@@ -11,7 +11,7 @@ from datetime import datetime, timezone
 from typing import Any
 from urllib.parse import unquote
 
-from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile
 from pydantic import BaseModel
 
 from app.auth import extract_user_gemini_api_key, require_admin, verify_auth
@@ -21,6 +21,9 @@ from app.routers.knowledge_utils import (
     TEXT_PREVIEW_EXTENSIONS,
     delete_from_rag,
     extract_docx_text,
+    knowledge_cache_headers,
+    not_modified_response,
+    read_upload_limited,
     safe_filename,
     sync_to_rag,
     write_docx_text,
@@ -29,6 +32,7 @@ from app.routers.knowledge_utils import (
 )
 from app.services import app_key_map, gemini_clients
 from app.services.db_names import CONTROL_PLANE_DB_NAME
+from app.services.gemini_service import run_sync
 from app.services.hciot.knowledge_store import get_hciot_knowledge_store
 from app.services.jti.knowledge_store import get_jti_knowledge_store
 from app.services.knowledge_store import get_knowledge_store
@@ -632,18 +636,27 @@ async def upload_file(
         raise HTTPException(status_code=400, detail="Managed stores use their app-specific knowledge pages")
 
     normalized = normalize_store_name(store_name)
-    if not get_store_registry().get_store(normalized, _owner_key_hash(request)):
+    if not await run_sync(get_store_registry().get_store, normalized, _owner_key_hash(request)):
         raise HTTPException(status_code=404, detail="Knowledge store not found")
 
     display_name = file.filename or f"file_{uuid.uuid4().hex[:8]}"
     safe_name = safe_filename(display_name)
-    file_bytes = await file.read()
+    file_bytes = await read_upload_limited(file)
+    content_type = file.content_type or mimetypes.guess_type(safe_name)[0] or "application/octet-stream"
+    # 寫入 Mongo 與 RAG 索引（embedding）都是同步阻塞工作，移到 thread 執行
+    return await run_sync(_save_general_upload, normalized, safe_name, file_bytes, content_type)
 
+
+def _save_general_upload(
+    normalized: str,
+    safe_name: str,
+    file_bytes: bytes,
+    content_type: str,
+) -> dict[str, Any]:
     # Validate file size, count, and total store storage limit
     files = _list_general_store_files(normalized)
     validate_upload_limits(files, safe_name, file_bytes)
 
-    content_type = file.content_type or mimetypes.guess_type(safe_name)[0] or "application/octet-stream"
     saved = get_knowledge_store().insert_file(
         language=normalized,
         filename=safe_name,
@@ -699,6 +712,7 @@ def get_store_file_content(
     store_name: str,
     filename: str,
     request: Request,
+    response: Response,
     auth: dict = Depends(verify_auth),
 ):
     """Return text content of a file for inline preview/edit."""
@@ -720,6 +734,10 @@ def get_store_file_content(
         raise HTTPException(status_code=404, detail="File not found")
 
     file_bytes: bytes = doc.get("data", b"")
+    cache_headers = knowledge_cache_headers(doc)
+    if (cached := not_modified_response(request, cache_headers)) is not None:
+        return cached
+    response.headers.update(cache_headers)
     ext = (
         "." + safe_name.rsplit(".", 1)[-1].lower()
         if "." in safe_name
@@ -751,7 +769,7 @@ def get_store_file_content(
 
 
 @router.put("/stores/{store_name}/files/{filename:path}/content")
-async def update_store_file_content(
+def update_store_file_content(
     store_name: str,
     filename: str,
     req: UpdateFileContentRequest,
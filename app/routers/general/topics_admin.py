@@ -14,6 +14,8 @@ buttons.
 
 from __future__ import annotations
 
+from operator import itemgetter
+
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
@@ -104,7 +106,7 @@ def _build_categories(store_name: str, filter_hidden: bool) -> list[dict]:
         if not filter_hidden:
             payload["hidden"] = category_hidden
         categories.append(payload)
-    return sorted(categories, key=lambda c: c["order"])
+    return sorted(categories, key=itemgetter("order"))
 
 
 @public_router.get("/stores/{store_name}/topics")
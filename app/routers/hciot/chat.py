@@ -5,10 +5,9 @@ HCIoT chat API - session management, messages, and conversation history.
 import logging
 from datetime import datetime, timedelta, timezone
 from time import perf_counter
-from typing import Optional
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 import app.deps as deps
 from app.auth import require_app_access, require_history_access, verify_admin
@@ -26,16 +25,18 @@ from app.schemas.chat import (
 from app.services.hciot.main_agent import main_agent
 from app.services.hciot.runtime_settings import get_available_tts_characters
 from app.utils import (
+    FastJSONResponse,
     build_date_query,
     build_history_summary_response,
+    construct_export_response,
     count_session_conversations,
     export_sessions_by_ids,
-    filter_conversations_by_session_language,
+    export_sessions_by_mode,
     filter_export_sessions_by_language,
-    filter_session_ids_by_language,
-    group_conversations_by_session,
+    load_history_page,
     normalize_history_pagination,
     simplified_conversation_sessions,
+    stream_export_response,
 )
 
 _TZ_TAIPEI = timezone(timedelta(hours=8))
@@ -111,8 +112,8 @@ async def create_session(request: CreateSessionRequest):
         if request.previous_session_id:
             main_agent.remove_session(request.previous_session_id)
             logger.info(
-                "Cleaned up previous HCIoT session: %s...",
-                request.previous_session_id[:8],
+                "Cleaned up previous HCIoT session: %.8s...",
+                request.previous_session_id,
             )
 
         session = await _run_db_call(
@@ -144,8 +145,8 @@ async def chat(request: ChatRequest):
             raise HTTPException(status_code=404, detail="Session not found")
 
         logger.info(
-            "[用戶訊息] Session: %s... | 訊息: '%s'",
-            request.session_id[:8],
+            "[用戶訊息] Session: %.8s... | 訊息: '%s'",
+            request.session_id,
             request.message,
         )
 
@@ -156,15 +157,12 @@ async def chat(request: ChatRequest):
                 request.session_id,
                 request.turn_number,
             )
-            logs = [
-                log
-                for log in await _run_db_call(
-                    "conversation.get_session_logs.rollback",
-                    conversation_logger.get_session_logs,
-                    request.session_id,
-                )
-                if log.get("mode") == "hciot"
-            ]
+            logs = await _run_db_call(
+                "conversation.get_session_logs.rollback",
+                conversation_logger.get_session_logs,
+                request.session_id,
+                mode="hciot",
+            )
             if logs:
                 session = await _run_db_call(
                     "session.rebuild_from_logs",
@@ -186,7 +184,7 @@ async def chat(request: ChatRequest):
 
         result = await main_agent.chat(session_id=request.session_id, user_message=request.message)
         answer = result["message"]
-        logger.info("[AI回應] HCIoT | %s...", answer[:80])
+        logger.info("[AI回應] HCIoT | %.80s...", answer)
 
         updated_session = await _run_db_call(
             "session.get.after_agent", session_manager.get_session, request.session_id
@@ -206,7 +204,7 @@ async def chat(request: ChatRequest):
         )
         _, final_turn_number = log_result or (None, None)
 
-        response = ChatResponse(**result, turn_number=final_turn_number)
+        response = ChatResponse.model_construct(**result, turn_number=final_turn_number)
         return attach_tts_message_id(
             response,
             language,
@@ -228,44 +226,41 @@ async def get_conversations(
     session_id: Optional[str] = None,
     page: int = 1,
     page_size: int = 20,
+    cursor: Optional[str] = None,
 ):
     mode = "hciot"
     try:
         conversation_logger = _get_conversation_logger()
         # Single-session detail request (used by ConversationHistoryModal resume)
         if session_id:
-            logs = await _run_db_call(
+            conversations = await _run_db_call(
                 "conversation.get_session_logs.detail",
                 conversation_logger.get_session_logs,
                 session_id,
+                mode=mode,
             )
-            conversations = [c for c in logs if c.get("mode") == mode]
             logger.info(
-                "Retrieved %d HCIoT conversations for session %s...",
+                "Retrieved %d HCIoT conversations for session %.8s...",
                 len(conversations),
-                session_id[:8],
+                session_id,
             )
             return {"mode": mode, "conversations": conversations}
 
         page, page_size = normalize_history_pagination(page, page_size)
         query = build_date_query(mode, date_from, date_to)
-        session_ids, total_sessions = await _run_db_call(
-            "conversation.get_paginated_session_ids",
-            conversation_logger.get_paginated_session_ids,
-            query=query,
+        session_list, total_sessions, next_cursor = await _run_db_call(
+            "conversation.load_history_page",
+            load_history_page,
+            conversation_logger,
+            query,
             page=page,
             page_size=page_size,
-        )
-        session_list = await _run_db_call(
-            "conversation.get_session_summaries",
-            conversation_logger.get_session_summaries,
-            session_ids,
-            query=query,
+            cursor=cursor,
         )
         logger.info(
-            "Retrieved %d HCIoT session summaries on page %d/%d (total %d)",
+            "Retrieved %d HCIoT session summaries on page %s/%d (total %s)",
             len(session_list),
-            page,
+            page if cursor is None else "cursor",
             page_size,
             total_sessions,
         )
@@ -273,9 +268,12 @@ async def get_conversations(
             mode=mode,
             sessions=session_list,
             total_sessions=total_sessions,
-            page=page,
+            page=page if cursor is None else None,
             page_size=page_size,
+            next_cursor=next_cursor,
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Failed to get HCIoT conversations: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -315,12 +313,31 @@ async def export_conversations(
     date_to: Optional[str] = None,
     simple: bool = False,
     language: Optional[str] = None,
+    stream: bool = False,
+    limit: Annotated[Optional[int], Query(ge=1)] = None,
 ):
+    """匯出對話歷史；stream=true（且未指定 session_ids）時改以 NDJSON 逐頁串流。
+
+    limit 只匯出首則訊息時間最新的 N 個 session（未指定 session_ids 時有效，
+    stream=true 時亦同）。
+    """
     mode = "hciot"
     try:
         conversation_logger = _get_conversation_logger()
         session_manager = _get_session_manager()
 
+        if stream and not session_ids:
+            return stream_export_response(
+                conversation_logger,
+                mode,
+                date_from,
+                date_to,
+                session_manager,
+                language,
+                simple=simple,
+                limit=limit,
+            )
+
         if session_ids:
             sessions, total_conversations = await _run_db_call(
                 "conversation.export_by_ids",
@@ -346,56 +363,32 @@ async def export_conversations(
                 "total_sessions": len(sessions),
             }
         else:
-            if date_from or date_to:
-                query = build_date_query(mode, date_from, date_to)
-                sid_list, _ = await _run_db_call(
-                    "conversation.get_paginated_session_ids.export",
-                    conversation_logger.get_paginated_session_ids,
-                    query=query,
-                    page=1,
-                    page_size=100000,
-                )
-                sid_list = await _run_db_call(
-                    "session.filter_ids_by_language",
-                    filter_session_ids_by_language,
-                    sid_list,
-                    session_manager,
-                    language,
-                )
-                all_conversations = await _run_db_call(
-                    "conversation.get_logs_for_sessions",
-                    conversation_logger.get_logs_for_sessions,
-                    sid_list,
-                )
-            else:
-                all_conversations = await _run_db_call(
-                    "conversation.get_session_logs_by_mode",
-                    conversation_logger.get_session_logs_by_mode,
-                    mode,
-                )
-                all_conversations = await _run_db_call(
-                    "session.filter_conversations_by_language",
-                    filter_conversations_by_session_language,
-                    all_conversations,
-                    session_manager,
-                    language,
-                )
+            session_list, total_conversations = await _run_db_call(
+                "conversation.export_by_mode",
+                export_sessions_by_mode,
+                conversation_logger,
+                mode,
+                session_manager,
+                language,
+                limit=limit,
+                date_from=date_from,
+                date_to=date_to,
+            )
 
-            session_list = group_conversations_by_session(all_conversations)
             result = {
                 "exported_at": datetime.now(_TZ_TAIPEI).isoformat(),
                 "mode": mode,
                 "sessions": session_list,
-                "total_conversations": len(all_conversations),
+                "total_conversations": total_conversations,
                 "total_sessions": len(session_list),
             }
 
         if simple:
-            return JSONResponse(
+            return FastJSONResponse(
                 content=simplified_conversation_sessions(result.get("sessions", []))
             )
 
-        return result
+        return construct_export_response(ExportConversationsResponse, result)
     except Exception as e:
         logger.error("Failed to export HCIoT conversations: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
@@ -121,7 +122,7 @@ def _build_categories(language: Lang, filter_hidden: bool = True) -> list[dict]:
             category_payload["hidden"] = category_hidden
 
         categories.append(category_payload)
-    return sorted(categories, key=lambda category: category["order"])
+    return sorted(categories, key=itemgetter("order"))
 
 
 @public_router.get("/topics/{lang}")
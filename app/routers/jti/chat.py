@@ -2,12 +2,13 @@
 JTI Chat API — session management, chat messages, and conversation history.
 """
 
+import json
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Union
+from typing import Annotated, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
 import app.deps as deps
 from app.auth import require_app_access, require_history_access, verify_admin
@@ -27,16 +28,18 @@ from app.services.general.managed_chat import ManagedChatConfig, ManagedChatServ
 from app.services.jti.main_agent import main_agent
 from app.services.jti.quiz_flow import JTI_QUIZ_CONFIG
 from app.utils import (
+    FastJSONResponse,
     build_date_query,
     build_history_summary_response,
+    construct_export_response,
     count_session_conversations,
     export_sessions_by_ids,
-    filter_conversations_by_session_language,
+    export_sessions_by_mode,
     filter_export_sessions_by_language,
-    filter_session_ids_by_language,
-    group_conversations_by_session,
+    load_history_page,
     normalize_history_pagination,
     simplified_conversation_sessions,
+    stream_export_response,
 )
 
 _TZ_TAIPEI = timezone(timedelta(hours=8))
@@ -108,7 +111,7 @@ async def create_session(request: CreateSessionRequest):
     try:
         return await chat_service.create_session(request)
     except Exception as e:
-        logger.error(f"Failed to create session: {e}")
+        logger.error("Failed to create session: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -134,10 +137,41 @@ async def chat(request: ChatRequest):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Chat failed: {e}", exc_info=True)
+        logger.error("Chat failed: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _sse_event(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False, default=str)}\n\n"
+
+
+@runtime_router.post("/chat/message/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    串流版對話端點（Server-Sent Events）
+
+    - LLM 回覆：逐段送出 `delta` 事件，最後送出 `done`（完整 ChatResponse）
+    - 測驗流程等後端接管的回合：直接送出單一 `done`
+    - 失敗時送出 `error`（status_code + detail）
+    """
+
+    async def event_source():
+        try:
+            async for event, payload in chat_service.stream_message(request):
+                yield _sse_event(event, payload)
+        except HTTPException as e:
+            yield _sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            logger.error("Chat stream failed: %s", e, exc_info=True)
+            yield _sse_event("error", {"status_code": 500, "detail": str(e)})
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @compat_history_router.get(
     "/history",
     response_model=Union[ConversationsBySessionResponse, ConversationsGroupedResponse],
@@ -154,27 +188,30 @@ async def get_conversations(
     date_to: Optional[str] = None,
     page: int = 1,
     page_size: int = 20,
+    cursor: Optional[str] = None,
 ):
-    """取得對話歷史"""
+    """取得對話歷史
+
+    列表預設以 page 分頁；帶 cursor（第一頁傳空字串）時改用游標分頁，
+    回應附 next_cursor、不含總數。
+    """
     mode = "jti"
     try:
         conversation_logger = _get_conversation_logger()
         if session_id:
-            conversations = conversation_logger.get_session_logs(session_id)
-            conversations = [c for c in conversations if c.get("mode") == mode]
-            logger.info(f"Retrieved {len(conversations)} conversations for session {session_id}")
+            conversations = conversation_logger.get_session_logs(session_id, mode=mode)
+            logger.info("Retrieved %d conversations for session %s", len(conversations), session_id)
             return {"session_id": session_id, "mode": mode, "conversations": conversations, "total": len(conversations)}
         else:
             page, page_size = normalize_history_pagination(page, page_size)
             query = build_date_query(mode, date_from, date_to)
-            session_ids, total_sessions = conversation_logger.get_paginated_session_ids(
-                query=query, page=page, page_size=page_size
+            session_list, total_sessions, next_cursor = load_history_page(
+                conversation_logger, query, page=page, page_size=page_size, cursor=cursor
             )
-            session_list = conversation_logger.get_session_summaries(session_ids, query=query)
             logger.info(
-                "Retrieved %d JTI session summaries on page %d/%d (total %d)",
+                "Retrieved %d JTI session summaries on page %s/%d (total %s)",
                 len(session_list),
-                page,
+                page if cursor is None else "cursor",
                 page_size,
                 total_sessions,
             )
@@ -182,12 +219,15 @@ async def get_conversations(
                 mode=mode,
                 sessions=session_list,
                 total_sessions=total_sessions,
-                page=page,
+                page=page if cursor is None else None,
                 page_size=page_size,
+                next_cursor=next_cursor,
             )
 
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Failed to get conversations: {e}")
+        logger.error("Failed to get conversations: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -224,13 +264,33 @@ async def export_conversations(
     date_to: Optional[str] = None,
     simple: bool = False,
     language: Optional[str] = None,
+    stream: bool = False,
+    limit: Annotated[Optional[int], Query(ge=1)] = None,
 ):
-    """匯出對話歷史為 JSON 格式"""
+    """匯出對話歷史為 JSON 格式
+
+    stream=true（且未指定 session_ids）時改以 NDJSON 串流，每行一個 session，
+    逐頁查詢，記憶體用量與總對話量無關。
+    limit 只匯出首則訊息時間最新的 N 個 session（未指定 session_ids 時有效，
+    stream=true 時亦同）。
+    """
     mode = "jti"
     try:
         conversation_logger = _get_conversation_logger()
         session_manager = _get_session_manager()
 
+        if stream and not session_ids:
+            return stream_export_response(
+                conversation_logger,
+                mode,
+                date_from,
+                date_to,
+                session_manager,
+                language,
+                simple=simple,
+                limit=limit,
+            )
+
         if session_ids:
             sessions, total_conversations = export_sessions_by_ids(conversation_logger, session_ids, mode)
             if language:
@@ -244,32 +304,28 @@ async def export_conversations(
                 "total_sessions": len(sessions),
             }
         else:
-            if date_from or date_to:
-                query = build_date_query(mode, date_from, date_to)
-                sid_list, _ = conversation_logger.get_paginated_session_ids(query=query, page=1, page_size=100000)
-                sid_list = filter_session_ids_by_language(sid_list, session_manager, language)
-                all_conversations = conversation_logger.get_logs_for_sessions(sid_list)
-            else:
-                all_conversations = conversation_logger.get_session_logs_by_mode(mode)
-                all_conversations = filter_conversations_by_session_language(
-                    all_conversations,
-                    session_manager,
-                    language,
-                )
-
-            session_list = group_conversations_by_session(all_conversations)
+            session_list, total_conversations = export_sessions_by_mode(
+                conversation_logger,
+                mode,
+                session_manager,
+                language,
+                limit=limit,
+                date_from=date_from,
+                date_to=date_to,
+            )
+
             result = {
                 "exported_at": datetime.now(_TZ_TAIPEI).isoformat(),
                 "mode": mode,
                 "sessions": session_list,
-                "total_conversations": len(all_conversations),
+                "total_conversations": total_conversations,
                 "total_sessions": len(session_list),
             }
 
         if simple:
-            return JSONResponse(content=simplified_conversation_sessions(result.get("sessions", [])))
+            return FastJSONResponse(content=simplified_conversation_sessions(result.get("sessions", [])))
 
-        return result
+        return construct_export_response(ExportConversationsResponse, result)
     except Exception as e:
-        logger.error(f"Failed to export conversations: {e}")
+        logger.error("Failed to export conversations: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -31,7 +31,7 @@ async def quiz_start(request: QuizActionRequest):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"quiz_start failed: {e}", exc_info=True)
+        logger.error("quiz_start failed: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -44,5 +44,5 @@ async def quiz_pause(request: QuizActionRequest):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"quiz_pause failed: {e}", exc_info=True)
+        logger.error("quiz_pause failed: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
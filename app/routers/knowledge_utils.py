@@ -5,28 +5,38 @@ Contains common file operations, docx processing, and RAG sync logic.
 """
 
 from collections import defaultdict
+import hashlib
 import io
 import logging
+import re
 import time
 import zipfile
 import xml.etree.ElementTree as ET
 from pathlib import Path
 from typing import Any, Protocol
 
-from fastapi import HTTPException, Request
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.responses import Response
 
 from app.services.rag.backfill import get_backfill_service
 
 logger = logging.getLogger(__name__)
 
-EDITABLE_EXTENSIONS = {".txt", ".md", ".csv", ".json", ".yaml", ".yml", ".docx"}
+EDITABLE_EXTENSIONS = frozenset({".txt", ".md", ".csv", ".json", ".yaml", ".yml", ".docx"})
 TEXT_PREVIEW_EXTENSIONS = EDITABLE_EXTENSIONS | {".log", ".py", ".js", ".html"}
-ALLOWED_UPLOAD_EXTENSIONS = {".csv", ".txt", ".md", ".docx", ".xlsx"}
+ALLOWED_UPLOAD_EXTENSIONS = frozenset({".csv", ".txt", ".md", ".docx", ".xlsx"})
+_PRECOMPRESSED_DOCX_MEDIA = frozenset({".png", ".jpg", ".jpeg", ".gif", ".webp"})
 MAX_SINGLE_UPLOAD_SIZE_BYTES = 5 * 1024 * 1024
 MAX_TOTAL_UPLOAD_FILES = 1000
 MAX_TOTAL_UPLOAD_SIZE_BYTES = 50 * 1024 * 1024
+UPLOAD_READ_CHUNK_BYTES = 1024 * 1024
 UPLOAD_RATE_LIMIT = 10
 UPLOAD_RATE_WINDOW_SECONDS = 60
+# XML 1.0 不允許的字元（\t \n \r 以外的控制字元、surrogate、U+FFFE/U+FFFF）
+_XML_ILLEGAL_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+_ETAG_METADATA_FIELDS = (
+    "namespace", "language", "filename", "display_name", "content_type", "editable", "updated_at",
+)
 
 
 class KnowledgeStoreProtocol(Protocol):
@@ -62,10 +72,26 @@ def write_docx_text(original_data: bytes, text: str) -> bytes:
     """Replace paragraph text in a .docx file, preserving other XML elements."""
     ns = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
 
-    with zipfile.ZipFile(io.BytesIO(original_data), "r") as zf:
-        xml_content = zf.read("word/document.xml")
+    output = io.BytesIO()
+    # 來源 zip 只開一次：讀 document.xml 與逐一複製其他 entry 共用同一個 central directory
+    with zipfile.ZipFile(io.BytesIO(original_data), "r") as z_in:
+        root = ET.fromstring(z_in.read("word/document.xml"))
+        _replace_docx_body_paragraphs(root, ns, text)
+        new_xml = ET.tostring(root, encoding="utf-8", xml_declaration=True)
 
-    root = ET.fromstring(xml_content)
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as z_out:
+            for item in z_in.infolist():
+                if item.filename == "word/document.xml":
+                    z_out.writestr(item, new_xml, compress_type=zipfile.ZIP_DEFLATED)
+                elif Path(item.filename).suffix.lower() in _PRECOMPRESSED_DOCX_MEDIA:
+                    # 已壓縮的圖片再 deflate 幾乎不會變小，直接 store 省 CPU
+                    z_out.writestr(item, z_in.read(item), compress_type=zipfile.ZIP_STORED)
+                else:
+                    z_out.writestr(item, z_in.read(item))
+    return output.getvalue()
+
+
+def _replace_docx_body_paragraphs(root: ET.Element, ns: str, text: str) -> None:
     body = root.find(f"{{{ns}}}body")
     if body is None:
         raise ValueError("docx 格式異常：找不到 body")
@@ -78,7 +104,8 @@ def write_docx_text(original_data: bytes, text: str) -> bytes:
             non_para.append(child)
             body.remove(child)
 
-    for line in text.split("\n"):
+    # 貼上的文字可能含 \x0c 等 XML 不允許的控制字元，寫入前移除，避免產生 Word 打不開的 document.xml
+    for line in _XML_ILLEGAL_CHARS.sub("", text).split("\n"):
         p = ET.SubElement(body, f"{{{ns}}}p")
         r = ET.SubElement(p, f"{{{ns}}}r")
         t = ET.SubElement(r, f"{{{ns}}}t")
@@ -88,17 +115,30 @@ def write_docx_text(original_data: bytes, text: str) -> bytes:
     for elem in non_para:
         body.append(elem)
 
-    new_xml = ET.tostring(root, encoding="utf-8", xml_declaration=True)
 
-    output = io.BytesIO()
-    with zipfile.ZipFile(io.BytesIO(original_data), "r") as z_in:
-        with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as z_out:
-            for item in z_in.infolist():
-                if item.filename == "word/document.xml":
-                    z_out.writestr(item, new_xml)
-                else:
-                    z_out.writestr(item, z_in.read(item.filename))
-    return output.getvalue()
+def knowledge_cache_headers(doc: dict[str, Any]) -> dict[str, str]:
+    """Strong ETag from the stored file document; no-cache makes browsers revalidate on every fetch.
+
+    The hash covers the bytes plus the metadata the responses expose (name, language,
+    content type, editable) and ``updated_at``, so a rename or metadata-only change
+    with identical bytes still yields a new ETag.
+    """
+    digest = hashlib.sha1(doc.get("data", b""), usedforsecurity=False)
+    for field in _ETAG_METADATA_FIELDS:
+        digest.update(b"\0" + str(doc.get(field)).encode("utf-8"))
+    return {"ETag": f'"{digest.hexdigest()}"', "Cache-Control": "private, no-cache"}
+
+
+def not_modified_response(request: Request, cache_headers: dict[str, str]) -> Response | None:
+    """Return a bodiless 304 when If-None-Match already names the current ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    etag = cache_headers["ETag"]
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if etag in tags or "*" in tags:
+        return Response(status_code=304, headers=cache_headers)
+    return None
 
 
 def sync_to_rag(source_type: str, language: str, filename: str, file_bytes: bytes) -> None:
@@ -163,6 +203,25 @@ def _stored_file_matches_name(file_info: dict, filename: str) -> bool:
     return file_info.get("filename") == filename or file_info.get("name") == filename
 
 
+async def read_upload_limited(
+    file: UploadFile,
+    max_bytes: int = MAX_SINGLE_UPLOAD_SIZE_BYTES,
+) -> bytes:
+    """Read an upload in chunks, rejecting it as soon as it exceeds ``max_bytes``.
+
+    Starlette already spools large request bodies to disk; reading in chunks keeps an
+    oversized upload from being copied into memory in full just to fail the size check.
+    """
+    buffer = bytearray()
+    while chunk := await file.read(UPLOAD_READ_CHUNK_BYTES):
+        buffer += chunk
+        if len(buffer) > max_bytes:
+            raise HTTPException(
+                status_code=400, detail=f"單一檔案大小不可超過 {max_bytes // (1024 * 1024)} MB"
+            )
+    return bytes(buffer)
+
+
 def validate_upload_limits(files: list[dict], new_file_name: str, new_file_bytes: bytes) -> None:
     ext = Path(new_file_name).suffix.lower()
     if ext not in ALLOWED_UPLOAD_EXTENSIONS:
@@ -5,6 +5,7 @@ from __future__ import annotations
 from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
+from pydantic.dataclasses import dataclass
 
 
 class CreateSessionRequest(BaseModel):
@@ -33,6 +34,14 @@ class ChatRequest(BaseModel):
 
 
 class ChatResponse(BaseModel):
+    """Chat turn payload.
+
+    Services build it with ``model_construct`` from trusted in-process data,
+    so fields are not validated anywhere: FastAPI serializes an instance of the
+    declared ``response_model`` as-is (wrong types only trigger a pydantic
+    serializer warning). Callers must pass correctly typed values.
+    """
+
     message: str
     tts_text: Optional[str] = None
     tts_message_id: Optional[str] = None
@@ -83,7 +92,12 @@ class ConversationSessionGroup(BaseModel):
     total: int
 
 
-class ConversationSessionSummary(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class ConversationSessionSummary:
+    """History list row. A slotted pydantic dataclass rather than a BaseModel:
+    list endpoints validate one per session on the way out, and slots avoid a
+    per-instance __dict__ (roughly 10x less memory per row)."""
+
     session_id: str
     first_message_time: Optional[str] = None
     last_message_time: Optional[str] = None
@@ -103,10 +117,11 @@ class ConversationsGroupedResponse(BaseModel):
     mode: str
     sessions: List[ConversationSessionSummary]
     total_conversations: int
-    total_sessions: int
-    page: int
+    total_sessions: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class DeleteConversationRequest(BaseModel):
@@ -140,10 +155,11 @@ class GeneralConversationsResponse(BaseModel):
     mode: str
     sessions: List[ConversationSessionSummary]
     total_conversations: int
-    total_sessions: int
-    page: int
+    total_sessions: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class ExportGeneralConversationsResponse(BaseModel):
@@ -179,8 +179,8 @@ class NestedProfileRuntimeSettingsAdapter(RuntimeSettingsStorageAdapter):
         existing = profiles_map.get(prompt_id)
         profile = existing if isinstance(existing, dict) else {}
 
-        if self.persona_key and self.default_persona_factory:
-            profile.setdefault(self.persona_key, self.default_persona_factory())
+        if self.persona_key and self.default_persona_factory and self.persona_key not in profile:
+            profile[self.persona_key] = self.default_persona_factory()
 
         profile[self.runtime_key] = settings_data
         profiles_map[prompt_id] = profile
@@ -238,11 +238,13 @@ class RuntimeSettingsRepo(Generic[RuntimeSettingsModel]):
         prompt_manager,
         prompt_id: Optional[str] = None,
         store_name: Optional[str] = None,
+        store_prompts=None,
     ) -> RuntimeSettingsModel:
-        if not prompt_manager:
-            return self.get_default_runtime_settings()
-
-        store_prompts = prompt_manager.get_store_prompts(store_name or self.store_name)
+        """store_prompts 已由呼叫端載入時直接沿用，省一次 Mongo 讀取。"""
+        if store_prompts is None:
+            if not prompt_manager:
+                return self.get_default_runtime_settings()
+            store_prompts = prompt_manager.get_store_prompts(store_name or self.store_name)
         runtime_prompt_id = self.resolve_runtime_prompt_id(store_prompts, prompt_id)
         raw = self.load_raw_runtime_settings(store_prompts, runtime_prompt_id)
 
@@ -264,8 +266,12 @@ class RuntimeSettingsRepo(Generic[RuntimeSettingsModel]):
         settings: RuntimeSettingsModel,
         prompt_id: Optional[str] = None,
         store_name: Optional[str] = None,
+        store_prompts=None,
+        persist: bool = True,
     ) -> str:
-        store_prompts = prompt_manager.get_store_prompts(store_name or self.store_name)
+        """persist=False 時只寫進 store_prompts，由呼叫端合併成一次 save。"""
+        if store_prompts is None:
+            store_prompts = prompt_manager.get_store_prompts(store_name or self.store_name)
         runtime_prompt_id = self.resolve_runtime_prompt_id(store_prompts, prompt_id)
 
         self.storage_adapter.save_raw(
@@ -273,5 +279,6 @@ class RuntimeSettingsRepo(Generic[RuntimeSettingsModel]):
             runtime_prompt_id,
             settings.model_dump(),
         )
-        prompt_manager.save_store_prompts(store_prompts)
+        if persist:
+            prompt_manager.save_store_prompts(store_prompts)
         return runtime_prompt_id
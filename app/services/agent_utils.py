@@ -8,6 +8,7 @@ import re
 from google.genai import types
 
 CORE_MARKER_PATTERN = re.compile(r"\[CORE:\s*([^\]]+?)\]", flags=re.IGNORECASE)
+CITE_MARKER_PATTERN = re.compile(r"\s*\[cite:\s*[^\]]*\]")
 
 
 def build_search_knowledge_decl(
@@ -32,10 +33,25 @@ def build_search_knowledge_decl(
     )
 
 
+# 常見語言代碼直接查表，未命中才走 strip / lower
+_NORMALIZED_LANGUAGES = {
+    "zh": "zh",
+    "en": "en",
+    "ZH": "zh",
+    "EN": "en",
+    "zh-TW": "zh",
+    "en-US": "en",
+}
+
+
 def normalize_language(language: str | None) -> str:
     """將語言代碼正規化為 'en' 或 'zh'。"""
-    if isinstance(language, str) and language.strip().lower().startswith("en"):
-        return "en"
+    if isinstance(language, str):
+        normalized = _NORMALIZED_LANGUAGES.get(language)
+        if normalized is not None:
+            return normalized
+        if language.strip().lower().startswith("en"):
+            return "en"
     return "zh"
 
 
@@ -59,7 +75,7 @@ def extract_response_text(response) -> str:
 def strip_citations(text: str) -> str:
     """移除模型回覆中的檢索標記，並保留 CORE 內容本身。"""
     text = strip_core_markup(text)
-    text = re.sub(r"\s*\[cite:\s*[^\]]*\]", "", text)
+    text = CITE_MARKER_PATTERN.sub("", text)
     return text.strip()
 
 
@@ -68,6 +84,62 @@ def strip_core_markup(text: str) -> str:
     return CORE_MARKER_PATTERN.sub(r"\1", text)
 
 
+# 串流時尚未閉合的標記最多保留的字數，超過即視為一般文字送出
+_MAX_PENDING_MARKER_CHARS = 500
+_MARKER_PREFIXES = ("cite:", "CORE:")
+
+
+def _may_start_marker(text: str) -> bool:
+    """text 以 `[` 開頭且尚未閉合時，判斷它是否仍可能長成 [cite:] / [CORE:] 標記。"""
+    head = text[1:6]
+    return head == "cite:"[: len(head)] or head.upper() == "CORE:"[: len(head)]
+
+
+class CitationStreamFilter:
+    """逐段餵入串流文字，回傳已移除檢索標記、可安全顯示的新增片段。
+
+    只保留尚未確定的尾段：可能是標記開頭的未閉合 `[`（上限
+    _MAX_PENDING_MARKER_CHARS 字）與結尾空白，其餘立即送出，每段只掃描尾段。
+    串流結束時呼叫 flush() 取回剩餘文字；最終完整文字仍以 strip_citations() 為準。
+    """
+
+    def __init__(self) -> None:
+        self._pending = ""
+        self._started = False
+
+    def feed(self, chunk: str) -> str:
+        self._pending += chunk
+        hold = self._hold_index(self._pending)
+        safe, self._pending = self._pending[:hold], self._pending[hold:]
+        return self._clean(safe)
+
+    def flush(self) -> str:
+        rest, self._pending = self._pending, ""
+        return self._clean(rest).rstrip()
+
+    @staticmethod
+    def _hold_index(pending: str) -> int:
+        # `]` 之前的 `[` 都已閉合；之後第一個仍可能是標記的 `[` 起算保留
+        search_from = pending.rfind("]") + 1
+        hold = len(pending)
+        open_idx = pending.find("[", search_from)
+        while open_idx != -1:
+            if _may_start_marker(pending[open_idx:]):
+                if len(pending) - open_idx <= _MAX_PENDING_MARKER_CHARS:
+                    hold = open_idx
+                break
+            open_idx = pending.find("[", open_idx + 1)
+        # 標記前的空白會被 CITE_MARKER_PATTERN 一併移除，先保留
+        return len(pending[:hold].rstrip())
+
+    def _clean(self, text: str) -> str:
+        cleaned = CITE_MARKER_PATTERN.sub("", strip_core_markup(text))
+        if not self._started:
+            cleaned = cleaned.lstrip()
+            self._started = bool(cleaned)
+        return cleaned
+
+
 # 餵給模型的歷史滑動視窗上限（則數，非輪數）。
 # 客戶情境本就不需長對話，此上限純為防呆：避免惡意狂灌訊息把 token 撐爆 / 拖慢回應。
 # MongoDB 仍儲存完整歷史，這裡只限制「每次請求帶給 Gemini」的筆數。
@@ -9,9 +9,14 @@ Base Agent - 共用的 Gemini chat session 管理邏輯
 """
 
 import asyncio
+import concurrent.futures
+import itertools
 import logging
+import threading
 import time
 from collections import OrderedDict
+from collections.abc import AsyncIterator
+from operator import itemgetter
 from typing import Any, cast
 
 from google.genai import types
@@ -20,6 +25,7 @@ import app.services.gemini_service as _gemini_service
 from app.models.session import Session
 from app.routers.general.stores import resolve_key_index_for_store
 from app.services.agent_utils import (
+    CitationStreamFilter,
     build_chat_history,
     extract_response_text,
     normalize_language,
@@ -31,6 +37,9 @@ from app.services.rag.service import get_rag_pipeline
 logger = logging.getLogger(__name__)
 
 _CHAT_SESSION_CACHE_MAX = 128
+# 串流 chunk 暫存上限；consumer 跟不上時 worker thread 會等待
+_STREAM_QUEUE_SIZE = 16
+_STREAM_PUT_POLL_SEC = 0.1
 
 
 class BaseAgent:
@@ -244,7 +253,7 @@ class BaseAgent:
         if session.chat_history:
             history = build_chat_history(session.chat_history)
         if history:
-            logger.info("恢復/重建 chat session (%s): %d 筆 (session=%s...)", model_to_use, len(history), sid[:8])
+            logger.info("恢復/重建 chat session (%s): %d 筆 (session=%.8s...)", model_to_use, len(history), sid)
 
         config = self._make_chat_config(session)
 
@@ -371,6 +380,23 @@ class BaseAgent:
     async def _run_tool_loop(self, chat_session, enriched: str, session: Session, user_message: str):
         """Send enriched message with forced tool call, handle function calling loop.
         Returns (response, citations)."""
+        async for event in self._iter_tool_loop(chat_session, enriched, session, user_message):
+            pass
+        return event["response"], event["citations"]
+
+    async def _iter_tool_loop(
+        self,
+        chat_session,
+        enriched: str,
+        session: Session,
+        user_message: str,
+        stream: bool = False,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """chat() / chat_stream() 共用的 function calling loop。
+
+        stream=True 時答覆段改用 send_message_stream，逐段產出 {"delta": str}；
+        最後一律產出 {"response", "response_text", "citations"}（串流時 response 為 None）。
+        """
         from app.services.gemini_service import gemini_with_retry, run_sync
 
         force_config = self._get_force_tool_config(session)
@@ -382,44 +408,148 @@ class BaseAgent:
             session,
         )
 
+        text_filter = CitationStreamFilter()
+        response_text: str | None = None
         citations: list[dict] | None = None
         for _ in range(self._MAX_TOOL_ROUNDS):
             fc_parts = self._find_function_calls(response)
             if not fc_parts:
                 break
 
-            results = await asyncio.gather(
-                *[self._dispatch_tool_call(fc_part, user_message, session) for fc_part in fc_parts]
-            )
-
-            response_parts = []
-            for tool_name, tool_result, raw_citations in results:
-                citations = self._merge_citations(citations, raw_citations or [])
-                response_parts.append(f"[{tool_name}]\n{tool_result}")
-
-            answer_prompt = self._build_rag_answer_prompt(
-                session,
-                user_message,
-                "\n\n---\n\n".join(response_parts),
+            answer_prompt, citations = await self._build_answer_prompt_from_tool_calls(
+                fc_parts, user_message, session, citations,
             )
             text_only_config = self._get_text_only_config(session)
-            response = await run_sync(
-                gemini_with_retry,
-                lambda prompt=answer_prompt: chat_session.send_message(
-                    prompt,
-                    config=text_only_config,
-                ),
-            )
-            self._replace_internal_tool_history(
+            if stream:
+                chunks: list[str] = []
+                async for chunk in self._stream_send(chat_session, answer_prompt, text_only_config):
+                    chunks.append(chunk)
+                    delta = text_filter.feed(chunk)
+                    if delta:
+                        yield {"delta": delta}
+                response, response_text = None, "".join(chunks)
+            else:
+                response = await run_sync(
+                    gemini_with_retry,
+                    lambda prompt=answer_prompt: chat_session.send_message(
+                        prompt,
+                        config=text_only_config,
+                    ),
+                )
+                response_text = extract_response_text(response)
+            self._replace_internal_tool_history_text(
                 chat_session,
                 history_start,
                 user_message,
-                response,
+                response_text,
             )
             break
 
+        if response_text is None:
+            response_text = extract_response_text(response)
+            if stream:
+                delta = text_filter.feed(response_text)
+                if delta:
+                    yield {"delta": delta}
+        if stream:
+            delta = text_filter.flush()
+            if delta:
+                yield {"delta": delta}
+
         self._clean_enriched_history(chat_session, user_message)
-        return response, citations
+        yield {"response": response, "response_text": response_text, "citations": citations}
+
+    async def _build_answer_prompt_from_tool_calls(
+        self,
+        fc_parts: list,
+        user_message: str,
+        session: Session,
+        citations: list[dict] | None,
+    ) -> tuple[str, list[dict] | None]:
+        """Run the requested tools concurrently and fold their results into the answer prompt."""
+        results = await asyncio.gather(
+            *[self._dispatch_tool_call(fc_part, user_message, session) for fc_part in fc_parts]
+        )
+
+        response_parts = []
+        for tool_name, tool_result, raw_citations in results:
+            citations = self._merge_citations(citations, raw_citations or [])
+            response_parts.append(f"[{tool_name}]\n{tool_result}")
+
+        answer_prompt = self._build_rag_answer_prompt(
+            session,
+            user_message,
+            "\n\n---\n\n".join(response_parts),
+        )
+        return answer_prompt, citations
+
+    async def _stream_send(self, chat_session, prompt: str, config) -> AsyncIterator[str]:
+        """Relay `send_message_stream` chunk texts from a worker thread to the event loop.
+
+        The queue is bounded so a slow consumer back-pressures the worker; when the
+        consumer stops early (client disconnect, cancellation) the worker notices
+        `stopped`, closes the upstream iterator and exits.
+        """
+        from app.services.gemini_service import gemini_with_retry
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_STREAM_QUEUE_SIZE)
+        stopped = threading.Event()
+        done = object()
+
+        def _put(item) -> bool:
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            while True:
+                try:
+                    future.result(timeout=_STREAM_PUT_POLL_SEC)
+                    return True
+                except concurrent.futures.TimeoutError:
+                    if stopped.is_set():
+                        future.cancel()
+                        return False
+
+        def _open_stream():
+            # 503 在第一個 chunk 前就會拋出；取到第一個 chunk 才算送出成功，之前可安全重試
+            chunks = iter(chat_session.send_message_stream(prompt, config=config))
+            return chunks, next(chunks, None)
+
+        def _pump():
+            chunks = None
+            try:
+                chunks, first = gemini_with_retry(_open_stream)
+                for chunk in itertools.chain(() if first is None else (first,), chunks):
+                    if stopped.is_set():
+                        break
+                    text = extract_response_text(chunk)
+                    if text and not _put(text):
+                        break
+            except Exception as e:
+                if not stopped.is_set():
+                    _put(e)
+            finally:
+                if stopped.is_set():
+                    # consumer 已離開：關閉上游串流，不再等 Gemini 把剩下的 chunk 送完
+                    close = getattr(chunks, "close", None)
+                    if close is not None:
+                        try:
+                            close()
+                        except Exception:
+                            logger.debug("Failed to close upstream stream", exc_info=True)
+                else:
+                    _put(done)
+
+        pump = loop.run_in_executor(None, _pump)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+            await pump
+        finally:
+            stopped.set()
 
     # --- Function-calling and RAG helpers ---
 
@@ -444,11 +574,11 @@ class BaseAgent:
         tool_args = dict(fc_part.function_call.args) if fc_part.function_call.args else {}
 
         if tool_name != "search_knowledge":
-            logger.info(f"[Tool Call] {tool_name}({tool_args})")
+            logger.info("[Tool Call] %s(%s)", tool_name, tool_args)
             return tool_name, f"Unknown tool: {tool_name}", None
 
         queries = self._extract_search_queries(tool_args, fallback=user_message)
-        logger.info(f"[Tool Call] search_knowledge(queries={queries})")
+        logger.info("[Tool Call] search_knowledge(queries=%s)", queries)
 
         sub_results = await asyncio.gather(
             *[self._execute_rag_tool(query, user_message, session) for query in queries]
@@ -571,7 +701,7 @@ class BaseAgent:
             {**doc, "_rrf_score": scores_by_text[text]}
             for text, doc in best_doc_by_text.items()
         ]
-        return sorted(scored_docs, key=lambda c: c["_rrf_score"], reverse=True)[:cap]
+        return sorted(scored_docs, key=itemgetter("_rrf_score"), reverse=True)[:cap]
 
     @staticmethod
     def _chat_history_len(chat_session) -> int | None:
@@ -597,18 +727,18 @@ class BaseAgent:
             f"{q_label} {user_message}"
         )
 
-    def _replace_internal_tool_history(
+    def _replace_internal_tool_history_text(
         self,
         chat_session,
         history_start: int | None,
         user_message: str,
-        response,
+        response_text: str,
     ) -> None:
         history = getattr(chat_session, "_curated_history", None)
         if not isinstance(history, list) or history_start is None:
             return
 
-        final_text = strip_citations(extract_response_text(response))
+        final_text = strip_citations(response_text)
         del history[history_start:]
         if final_text:
             self._append_to_chat_history(chat_session, user_message, final_text)
@@ -675,31 +805,90 @@ class BaseAgent:
             enriched = f"{self._get_session_state(session)}\n\n{q_label} {user_message}"
             
             t0 = time.time()
-            logger.info(f"[{self.__class__.__name__}] 訊息: {user_message[:50]}...")
+            logger.info("[%s] 訊息: %.50s...", self.__class__.__name__, user_message)
             
             # 使用基底類別提供的 tool loop 進行 RAG
             response, citations = await self._run_tool_loop(chat_session, enriched, session, user_message)
             
-            logger.info(f"[{self.__class__.__name__}] 流程總耗時: {(time.time()-t0)*1000:.0f}ms")
-
-            # 處理中間數據
-            citations, extra_meta = self._preprocess_chat_data(session, citations)
-
-            # 提取文字與同步 DB
-            final_text = strip_citations(extract_response_text(response))
-            final_text = final_text or self._get_chat_fallback_message(session.language)
-            self._sync_history_to_db_background(session_id, user_message, final_text, citations)
-
-            # 組裝結果
-            result = {
-                "message": final_text,
-                "session": session.model_dump(),
-                "tool_calls": [],
-                "citations": citations,
-            }
-            result.update(self._post_process_chat_result(session, final_text, citations, extra_meta))
-            return result
+            logger.info("[%s] 流程總耗時: %.0fms", self.__class__.__name__, (time.time() - t0) * 1000)
+
+            return self._finalize_chat_result(
+                session, user_message, extract_response_text(response), citations,
+            )
 
         except Exception as e:
-            logger.error(f"[{self.__class__.__name__}] chat failed: {e}", exc_info=True)
+            logger.error("[%s] chat failed: %s", self.__class__.__name__, e, exc_info=True)
             return {"error": str(e), "message": f"抱歉，發生錯誤：{str(e)}"}
+
+    async def chat_stream(
+        self, session_id: str, user_message: str, model: str | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        串流版 chat()：RAG 工具呼叫照常一次完成，答覆段改用 send_message_stream，
+        逐段產出 {"delta": str}（已移除檢索標記），最後產出 {"result": dict}，
+        內容與 chat() 的回傳值相同。
+        """
+        try:
+            from app.services.gemini_service import client as _gemini_client
+            if not _gemini_client:
+                yield {"result": {"error": "Gemini client not initialized", "message": "系統未正確初始化，請檢查 API Key 設定。"}}
+                return
+
+            session = await _gemini_service.run_sync(self._session_manager.get_session, session_id)
+            if not session:
+                yield {"result": {"error": "Session not found", "message": "找不到對話記錄，請重新開始。"}}
+                return
+
+            chat_session = self._get_or_create_chat_session(session, model=model)
+            q_label = self._get_question_label(session.language)
+            enriched = f"{self._get_session_state(session)}\n\n{q_label} {user_message}"
+
+            t0 = time.time()
+            logger.info("[%s] 串流訊息: %.50s...", self.__class__.__name__, user_message)
+
+            final: dict[str, Any] = {}
+            async for event in self._iter_tool_loop(
+                chat_session, enriched, session, user_message, stream=True,
+            ):
+                if "delta" in event:
+                    yield event
+                else:
+                    final = event
+
+            logger.info("[%s] 串流總耗時: %.0fms", self.__class__.__name__, (time.time() - t0) * 1000)
+
+            yield {
+                "result": self._finalize_chat_result(
+                    session, user_message, final["response_text"], final["citations"],
+                )
+            }
+
+        except Exception as e:
+            logger.error("[%s] chat_stream failed: %s", self.__class__.__name__, e, exc_info=True)
+            yield {"result": {"error": str(e), "message": f"抱歉，發生錯誤：{str(e)}"}}
+
+    def _finalize_chat_result(
+        self,
+        session: Session,
+        user_message: str,
+        response_text: str,
+        citations: list[dict] | None,
+    ) -> dict[str, Any]:
+        """處理引用、同步歷史至 DB，並組裝 chat()/chat_stream() 共用的結果 dict。"""
+        # 處理中間數據
+        citations, extra_meta = self._preprocess_chat_data(session, citations)
+
+        # 提取文字與同步 DB
+        final_text = strip_citations(response_text)
+        final_text = final_text or self._get_chat_fallback_message(session.language)
+        self._sync_history_to_db_background(session.session_id, user_message, final_text, citations)
+
+        # 組裝結果
+        result = {
+            "message": final_text,
+            "session": session.model_dump(),
+            "tool_calls": [],
+            "citations": citations,
+        }
+        result.update(self._post_process_chat_result(session, final_text, citations, extra_meta))
+        return result
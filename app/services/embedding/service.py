@@ -1,5 +1,6 @@
 import logging
 import os
+import threading
 from typing import List, Optional, Union
 
 import httpx
@@ -30,6 +31,8 @@ class EmbeddingService:
             raise EmbeddingEncodingError(
                 "EMBEDDING_SERVICE_URL is not set; the embedding service is required."
             )
+        self._client: Optional[httpx.Client] = None
+        self._client_lock = threading.Lock()
 
     @classmethod
     def get_instance(cls) -> 'EmbeddingService':
@@ -39,12 +42,28 @@ class EmbeddingService:
 
     @classmethod
     def release(cls) -> bool:
-        """Drop the cached instance. No process-local model to tear down."""
+        """Drop the cached instance and close its HTTP connection pool."""
         if cls._instance is None:
             return False
+        cls._instance.close()
         cls._instance = None
         return True
 
+    def close(self) -> None:
+        with self._client_lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+
+    def _http_client(self) -> httpx.Client:
+        client = self._client
+        if client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = httpx.Client(timeout=_REMOTE_TIMEOUT_S)
+                client = self._client
+        return client
+
     def encode(
         self,
         texts: Union[str, List[str]],
@@ -63,15 +82,15 @@ class EmbeddingService:
         url = f"{self.service_url.rstrip('/')}/embed"
         vectors: List[List[float]] = []
         try:
-            with httpx.Client(timeout=_REMOTE_TIMEOUT_S) as client:
-                for start in range(0, len(texts), _REMOTE_CHUNK_SIZE):
-                    batch = texts[start:start + _REMOTE_CHUNK_SIZE]
-                    resp = client.post(
-                        url,
-                        json={"texts": batch, "input_type": input_type},
-                    )
-                    resp.raise_for_status()
-                    vectors.extend(resp.json()["vectors"])
+            client = self._http_client()
+            for start in range(0, len(texts), _REMOTE_CHUNK_SIZE):
+                batch = texts[start:start + _REMOTE_CHUNK_SIZE]
+                resp = client.post(
+                    url,
+                    json={"texts": batch, "input_type": input_type},
+                )
+                resp.raise_for_status()
+                vectors.extend(resp.json()["vectors"])
         except (httpx.HTTPError, KeyError, ValueError) as e:
             logger.error(f"Remote encoding failed: {e}")
             raise EmbeddingEncodingError(f"Failed to encode texts: {e}")
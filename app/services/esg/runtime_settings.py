@@ -71,11 +71,13 @@ def load_runtime_settings_from_prompt_manager(
     prompt_manager,
     prompt_id: Optional[str] = None,
     store_name: str = ESG_STORE_NAME,
+    store_prompts=None,
 ) -> EsgRuntimeSettings:
     return _runtime_settings_repo.load_from_prompt_manager(
         prompt_manager,
         prompt_id,
         store_name=store_name,
+        store_prompts=store_prompts,
     )
 
 
@@ -84,10 +86,14 @@ def save_runtime_settings_to_prompt_manager(
     settings: EsgRuntimeSettings,
     prompt_id: Optional[str] = None,
     store_name: str = ESG_STORE_NAME,
+    store_prompts=None,
+    persist: bool = True,
 ) -> str:
     return _runtime_settings_repo.save_to_prompt_manager(
         prompt_manager,
         settings,
         prompt_id,
         store_name=store_name,
+        store_prompts=store_prompts,
+        persist=persist,
     )
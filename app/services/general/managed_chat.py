@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import logging
-from collections.abc import Callable, Mapping
+from collections.abc import AsyncIterator, Callable, Mapping
 from copy import deepcopy
 from dataclasses import dataclass
 from typing import Any
@@ -20,10 +20,11 @@ from app.schemas.chat import (
 )
 from app.services.general.quiz_helpers import (
     _get_or_rebuild_session,
-    build_session_state,
     is_quiz_start_intent,
+    log_quiz_turn,
 )
 from app.services.general.quiz_runtime import execute_quiz_start, handle_quiz_message
+from app.services.gemini_service import run_sync
 from app.services.quiz.config import QuizFlowConfig
 
 
@@ -61,9 +62,9 @@ class ManagedChatService:
         if request.previous_session_id:
             self.config.agent.remove_session(request.previous_session_id)
             logger.info(
-                "Cleaned up previous %s chat session: %s...",
+                "Cleaned up previous %s chat session: %.8s...",
                 self.config.app,
-                request.previous_session_id[:8],
+                request.previous_session_id,
             )
 
         session = session_manager.create_session(language=request.language)
@@ -77,30 +78,78 @@ class ManagedChatService:
         )
 
     async def send_message(self, request: ChatRequest) -> ChatResponse:
+        session, early_response, turn_number = await self._prepare_turn(request)
+        if early_response is not None:
+            return early_response
+
+        result = await self.config.agent.chat(
+            session_id=request.session_id,
+            user_message=request.message,
+        )
+        return await self._complete_agent_turn(request, session, result, turn_number)
+
+    async def stream_message(self, request: ChatRequest) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        """Streaming variant of send_message yielding ``(event, payload)`` pairs.
+
+        Quiz/rule-driven turns produce a single ``done`` event; LLM turns emit
+        ``delta`` events as tokens arrive, then ``done`` with the full ChatResponse.
+        """
+        session, early_response, turn_number = await self._prepare_turn(request)
+        if early_response is not None:
+            yield "done", early_response.model_dump()
+            return
+
+        result: dict[str, Any] | None = None
+        async for event in self.config.agent.chat_stream(
+            session_id=request.session_id,
+            user_message=request.message,
+        ):
+            if "delta" in event:
+                yield "delta", {"delta": event["delta"]}
+            else:
+                result = event["result"]
+
+        if result is None:
+            result = {"error": "empty stream", "message": ""}
+        response = await self._complete_agent_turn(request, session, result, turn_number)
+        yield "done", response.model_dump()
+
+    async def _prepare_turn(
+        self, request: ChatRequest
+    ) -> tuple[Any, ChatResponse | None, int | None]:
+        """Load/rollback the session and handle quiz turns that bypass the LLM.
+
+        Returns ``(session, early_response, turn_number)``; ``turn_number`` is the
+        regenerated turn when rollback already truncated the logs, else None.
+        """
         session_manager = self.config.session_manager_getter()
         conversation_logger = self.config.conversation_logger_getter()
-        session = _get_or_rebuild_session(request.session_id, self.config.quiz)
+        session = await run_sync(_get_or_rebuild_session, request.session_id, self.config.quiz)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
 
         preserved_selected_questions = (
             deepcopy(session.selected_questions) if session.selected_questions else None
         )
+        turn_number: int | None = None
 
         if request.turn_number is not None:
-            deleted_count = conversation_logger.delete_turns_from(
+            deleted_count = await run_sync(
+                conversation_logger.delete_turns_from,
                 request.session_id,
                 request.turn_number,
             )
             if deleted_count > 0:
-                all_logs = conversation_logger.get_session_logs(request.session_id)
-                logs = [
-                    log
-                    for log in all_logs
-                    if log.get("mode") == self.config.quiz.mode
-                ]
+                # 只從尾端截斷，新一輪即為 request.turn_number
+                turn_number = request.turn_number
+                logs = await run_sync(
+                    conversation_logger.get_session_logs,
+                    request.session_id,
+                    mode=self.config.quiz.mode,
+                )
                 if logs:
-                    session = session_manager.rebuild_session_from_logs(
+                    session = await run_sync(
+                        session_manager.rebuild_session_from_logs,
                         request.session_id,
                         logs,
                     )
@@ -119,7 +168,7 @@ class ManagedChatService:
                     session.quiz_result_id = None
                     session.quiz_result = None
                     session.chat_history = []
-                    session = session_manager.update_session(session)
+                    session = await run_sync(session_manager.update_session, session)
 
                 if logs and session and preserved_selected_questions:
                     session.selected_questions = preserved_selected_questions
@@ -130,7 +179,7 @@ class ManagedChatService:
                             ]
                         else:
                             session.current_question = None
-                    session = session_manager.update_session(session)
+                    session = await run_sync(session_manager.update_session, session)
 
                 self.config.agent.remove_session(request.session_id)
 
@@ -140,7 +189,7 @@ class ManagedChatService:
             config=self.config.quiz,
         )
         if quiz_result:
-            return quiz_result
+            return session, quiz_result, None
 
         intent_kwargs = {}
         if self.config.quiz.keywords:
@@ -151,9 +200,10 @@ class ManagedChatService:
         if should_start_quiz and session.step.value in ("DONE", "WELCOME"):
             if session.step.value == "DONE":
                 session.step = SessionStep.WELCOME
-                session_manager.update_session(session)
+                await run_sync(session_manager.update_session, session)
             if request.turn_number:
-                conversation_logger.delete_turns_from(
+                await run_sync(
+                    conversation_logger.delete_turns_from,
                     request.session_id,
                     request.turn_number,
                 )
@@ -162,29 +212,29 @@ class ManagedChatService:
                 user_message=request.message,
                 config=self.config.quiz,
             )
-            return self._attach_tts(quiz_response, session.language)
-
-        result = await self.config.agent.chat(
-            session_id=request.session_id,
-            user_message=request.message,
-        )
-
-        if request.turn_number:
-            conversation_logger.delete_turns_from(
-                request.session_id,
-                request.turn_number,
-            )
-
-        log_result = conversation_logger.log_conversation(
+            return session, self._attach_tts(quiz_response, session.language), None
+
+        return session, None, turn_number
+
+    async def _complete_agent_turn(
+        self,
+        request: ChatRequest,
+        session: Any,
+        result: dict[str, Any],
+        turn_number: int | None,
+    ) -> ChatResponse:
+        # _prepare_turn 已截斷 rollback 之後的紀錄，這裡直接寫入新一輪
+        final_turn_number = await log_quiz_turn(
+            self.config.conversation_logger_getter(),
             session_id=request.session_id,
             user_message=request.message,
             agent_response=result["message"],
-            tool_calls=result.get("tool_calls", []),
-            session_state=build_session_state(session),
+            session=session,
             mode=self.config.quiz.mode,
+            tool_calls=result.get("tool_calls", []),
             citations=result.get("citations"),
+            turn_number=turn_number,
         )
-        final_turn_number = log_result[1] if log_result else None
 
-        response = ChatResponse(**result, turn_number=final_turn_number)
+        response = ChatResponse.model_construct(**result, turn_number=final_turn_number)
         return self._attach_tts(response, session.language)
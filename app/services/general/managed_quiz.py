@@ -11,6 +11,7 @@ from app.services.general.quiz_helpers import (
     _pause_quiz_and_respond,
 )
 from app.services.general.quiz_runtime import execute_quiz_start
+from app.services.gemini_service import run_sync
 from app.services.quiz.config import QuizFlowConfig
 
 
@@ -22,14 +23,14 @@ class ManagedQuizService:
 
     async def start(self, session_id: str) -> ChatResponse:
         session_manager = self.config.session_manager_getter()
-        session = session_manager.get_session(session_id)
+        session = await run_sync(session_manager.get_session, session_id)
         if session and session.step.value == "DONE":
             session.step = SessionStep.WELCOME
-            session_manager.update_session(session)
+            await run_sync(session_manager.update_session, session)
         return await execute_quiz_start(session_id, config=self.config)
 
     async def pause(self, session_id: str) -> ChatResponse:
-        session = _get_or_rebuild_session(session_id, self.config)
+        session = await run_sync(_get_or_rebuild_session, session_id, self.config)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
 
@@ -39,4 +40,4 @@ class ManagedQuizService:
             session=session,
             config=self.config,
         )
-        return ChatResponse(**response)
+        return ChatResponse.model_construct(**response)
@@ -1,11 +1,19 @@
 """Shared quiz intent, session, and answer-selection helpers."""
 
+import asyncio
 import logging
 import re
+import threading
+import time
+import weakref
+from difflib import SequenceMatcher
+from functools import lru_cache
 from typing import Any
 
 from app.models_config import QUIZ_HELPER_MODEL, fallback_chain
 from app.services.general.quiz_response import (
+    OPTION_LABELS,
+    SEQUENCE_TO_INDEX,
     build_quiz_response_fields,
     format_option_texts,
     resolve_quiz_copy,
@@ -16,6 +24,15 @@ from app.services.quiz.config import QuizFlowConfig
 
 logger = logging.getLogger(__name__)
 
+_JUDGE_CACHE_TTL_SECONDS = 5.0
+_JUDGE_CACHE_MAX = 1024
+_judge_cache: dict[tuple[str, str, str], tuple[float, str | None]] = {}
+_judge_inflight: dict[tuple[str, str, str], asyncio.Future] = {}
+
+# 過期 session 重建的 per-session 鎖：[lock, 等待/持有中的請求數]
+_rebuild_locks: dict[str, list] = {}
+_rebuild_locks_guard = threading.Lock()
+
 
 QUIZ_START_KEYWORDS = (
     "測驗",
@@ -62,16 +79,48 @@ QUIZ_NEGATIVE_KEYWORDS = (
 )
 
 
+@lru_cache(maxsize=64)
+def _keyword_pattern(keywords: tuple[str, ...]) -> re.Pattern[str] | None:
+    """Compile a keyword set into one alternation so matching is a single regex scan.
+
+    Keywords are case-folded here once, so admin-entered keywords such as
+    "Quiz" still match the folded message.
+    """
+    if not keywords:
+        return None
+    folded = dict.fromkeys(keyword.casefold() for keyword in keywords)
+    return re.compile("|".join(re.escape(keyword) for keyword in folded))
+
+
+def _contains_any_keyword(msg: str, keywords) -> bool:
+    pattern = _keyword_pattern(tuple(keywords))
+    return pattern is not None and pattern.search(msg) is not None
+
+
 def is_quiz_start_intent(
     message: str,
     start_keywords: tuple[str, ...] = QUIZ_START_KEYWORDS,
     negative_keywords: tuple[str, ...] = QUIZ_NEGATIVE_KEYWORDS,
 ) -> bool:
     """Detect quiz-start intent: has any start keyword and no rejection keyword."""
-    msg = (message or "").lower()
-    if not any(keyword in msg for keyword in start_keywords):
+    # 快取 key 用去頭尾空白並 casefold 後的文字，「開始測驗 」「開始測驗」共用同一筆
+    return _quiz_start_decision(
+        (message or "").strip().casefold(),
+        tuple(start_keywords),
+        tuple(negative_keywords),
+    )
+
+
+@lru_cache(maxsize=2048)
+def _quiz_start_decision(
+    msg: str,
+    start_keywords: tuple[str, ...],
+    negative_keywords: tuple[str, ...],
+) -> bool:
+    """純函式判斷結果依（訊息, 關鍵字組）快取；「開始」「測驗」這類重複訊息直接命中"""
+    if not _contains_any_keyword(msg, start_keywords):
         return False
-    return not any(keyword in msg for keyword in negative_keywords)
+    return not _contains_any_keyword(msg, negative_keywords)
 
 
 def build_session_state(session) -> dict:
@@ -80,34 +129,99 @@ def build_session_state(session) -> dict:
         "step": session.step.value,
         "answers_count": len(session.answers),
         "quiz_result_id": session.quiz_result_id,
-        "current_question_id": session.current_question.get("id") if session.current_question else None,
+        "current_question_id": session.current_question_id,
         "language": session.language,
         "selected_questions": session.selected_questions,
     }
 
 
+async def log_quiz_turn(
+    conversation_logger,
+    *,
+    session_id: str,
+    user_message: str,
+    agent_response: str,
+    session,
+    mode: str,
+    tool_calls: list | None = None,
+    rollback_from: int | None = None,
+    **extra,
+) -> int | None:
+    """寫入一回合對話 log（rollback 時先截斷該輪之後的紀錄），回傳 turn_number"""
+    log_kwargs = dict(
+        user_message=user_message,
+        agent_response=agent_response,
+        tool_calls=tool_calls or [],
+        session_state=build_session_state(session),
+        mode=mode,
+        **extra,
+    )
+    if rollback_from:
+        log_result = await run_sync(
+            conversation_logger.replace_turns_from, session_id, rollback_from, **log_kwargs
+        )
+    else:
+        log_result = await run_sync(conversation_logger.log_conversation, session_id=session_id, **log_kwargs)
+    return log_result[1] if log_result else None
+
+
+def _acquire_rebuild_lock(session_id: str) -> threading.Lock:
+    with _rebuild_locks_guard:
+        entry = _rebuild_locks.get(session_id)
+        if entry is None:
+            entry = _rebuild_locks[session_id] = [threading.Lock(), 0]
+        entry[1] += 1
+        return entry[0]
+
+
+def _release_rebuild_lock(session_id: str) -> None:
+    with _rebuild_locks_guard:
+        entry = _rebuild_locks.get(session_id)
+        if entry is not None:
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del _rebuild_locks[session_id]
+
+
 def _get_or_rebuild_session(session_id: str, config: QuizFlowConfig) -> Any | None:
-    """取得 session，若已過期則嘗試從 conversation logs 重建"""
+    """取得 session，若已過期則嘗試從 conversation logs 重建
+
+    會阻塞（讀 DB），請在 worker thread 呼叫。同一 session 的並發重建只做一次，
+    其餘請求等第一個重建完成後直接讀回已寫入 session manager 的結果。
+    """
     session_manager = config.session_manager_getter()
-    conversation_logger = config.conversation_logger_getter()
 
     session = session_manager.get_session(session_id)
     if session:
         return session
 
-    # 嘗試從 conversation logs 重建
-    logs = conversation_logger.get_session_logs(session_id)
-    filtered_logs = [log for log in logs if log.get("mode") == config.mode]
+    lock = _acquire_rebuild_lock(session_id)
+    try:
+        with lock:
+            session = session_manager.get_session(session_id)
+            if session:
+                return session
+            return _rebuild_session(session_id, config)
+    finally:
+        _release_rebuild_lock(session_id)
+
+
+def _rebuild_session(session_id: str, config: QuizFlowConfig) -> Any | None:
+    session_manager = config.session_manager_getter()
+    conversation_logger = config.conversation_logger_getter()
+
+    # 嘗試從 conversation logs 重建（成功後 rebuild_session_from_logs 會寫回 session manager）
+    filtered_logs = conversation_logger.get_session_logs(session_id, mode=config.mode)
     if not filtered_logs:
         return None
 
     session = session_manager.rebuild_session_from_logs(session_id, filtered_logs)
     if session and config.agent:
         logger.info(
-            "Rebuilt expired %s session from %d logs: %s...",
+            "Rebuilt expired %s session from %d logs: %.8s...",
             config.mode,
             len(filtered_logs),
-            session_id[:8],
+            session_id,
         )
         # 清除記憶體中的舊 LLM chat session（下次呼叫時會從 chat_history 自動重建）
         config.agent.remove_session(session_id)
@@ -126,7 +240,8 @@ async def _pause_quiz_and_respond(
     session_manager = config.session_manager_getter()
     conversation_logger = config.conversation_logger_getter()
 
-    updated_session = session_manager.pause_quiz(session_id)
+    # Redis/Mongo 讀寫都是同步 I/O，移到 worker thread 避免卡住 event loop
+    updated_session = await run_sync(session_manager.pause_quiz, session_id)
 
     # 用固定文案，不走 AI（避免 AI 從 chat history 撈出測驗中被忽略的問題來回答）
     lang = updated_session.language if updated_session else (session.language if session else "zh")
@@ -145,25 +260,21 @@ async def _pause_quiz_and_respond(
 
     # 同步到 chat history（讓 AI 恢復時知道測驗已暫停）
     if config.agent:
-        config.agent._sync_history_to_db(session_id, log_user_message, response_message)
-
-    if turn_number_hint:
-        conversation_logger.delete_turns_from(session_id, turn_number_hint)
+        await run_sync(config.agent._sync_history_to_db, session_id, log_user_message, response_message)
 
     effective_session = updated_session or session
     response_fields = build_quiz_response_fields(response_message, lang, config=config)
 
-    log_result = conversation_logger.log_conversation(
+    final_turn_number = await log_quiz_turn(
+        conversation_logger,
         session_id=session_id,
         user_message=log_user_message,
         agent_response=response_message,
-        tool_calls=[],
-        session_state=build_session_state(effective_session),
+        session=effective_session,
         mode=config.mode,
+        rollback_from=turn_number_hint,
     )
 
-    final_turn_number = log_result[1] if log_result else None
-
     return {
         **response_fields,
         "session": effective_session.model_dump(),
@@ -172,50 +283,156 @@ async def _pause_quiz_and_respond(
     }
 
 
-def _match_exact_label(msg_upper: str, labels: list[str]) -> str | None:
+# 一次掃描同時取出「獨立的 A-E 字母」與「1-5 數字」
+_CHOICE_TOKEN_PATTERN = re.compile(r"(?<![A-Z])[A-E](?![A-Z])|[1-5]")
+
+
+def _scan_choice_tokens(msg_upper: str) -> tuple[set[str], set[str]]:
+    """回傳訊息中出現的獨立字母選項與數字（各自去重）"""
+    letters: set[str] = set()
+    digits: set[str] = set()
+    for token in _CHOICE_TOKEN_PATTERN.findall(msg_upper):
+        (digits if token.isdigit() else letters).add(token)
+    return letters, digits
+
+
+def _match_exact_label(msg_upper: str, labels: list[str], letters: set[str]) -> str | None:
     """快速判斷：明確的 A-E"""
     if msg_upper in labels:
         return msg_upper
-    label_hits = [
-        label
-        for label in labels
-        if re.search(rf"(?<![A-Z]){label}(?![A-Z])", msg_upper)
-    ]
-    return label_hits[0] if len(label_hits) == 1 else None
+    label_hits = letters.intersection(labels)
+    return label_hits.pop() if len(label_hits) == 1 else None
 
 
-def _match_number_or_sequence(msg: str, options: list) -> str | None:
+def _match_number_or_sequence(msg: str, labels: list[str], digits: set[str]) -> str | None:
     """快速判斷：數字或中文序號"""
-    labels = list("ABCDE")[: len(options)]
-    number_map = {
-        "1": 0, "一": 0, "第一": 0,
-        "2": 1, "二": 1, "第二": 1,
-        "3": 2, "三": 2, "第三": 2,
-        "4": 3, "四": 3, "第四": 3,
-        "5": 4, "五": 4, "第五": 4,
-    }
-    if msg in number_map:
-        idx = number_map[msg]
-        return labels[idx] if idx < len(options) else None
+    if msg in SEQUENCE_TO_INDEX:
+        idx = SEQUENCE_TO_INDEX[msg]
+        return labels[idx] if idx < len(labels) else None
 
     if msg.isdigit():
         idx = int(msg) - 1
-        return labels[idx] if 0 <= idx < len(options) else None
+        return labels[idx] if 0 <= idx < len(labels) else None
 
-    digit_hits = [d for d in "12345"[:len(options)] if d in msg]
+    digit_hits = [d for d in digits if int(d) <= len(labels)]
     return labels[int(digit_hits[0]) - 1] if len(digit_hits) == 1 else None
 
 
-def _match_option_text(msg_lower: str, options: list) -> str | None:
+def _match_option_text(msg_lower: str, options: list, labels: list[str]) -> str | None:
     """快速判斷：包含選項文字"""
-    labels = list("ABCDE")[: len(options)]
-    for idx, opt in enumerate(options):
+    for label, opt in zip(labels, options):
         text = opt.get("text", "").lower()
         if text and text in msg_lower:
-            return labels[idx]
+            return label
     return None
 
 
+_FUZZY_MIN_OPTION_LEN = 3
+_FUZZY_MAX_MESSAGE_LEN = 120
+_FUZZY_SCORE_CUTOFF = 0.8
+
+
+def _partial_similarity(needle: str, haystack: str) -> float:
+    """needle 與 haystack 中等長片段的最佳相似度（0~1）。"""
+    width = len(needle)
+    if len(haystack) <= width:
+        return SequenceMatcher(None, needle, haystack).ratio()
+    matcher = SequenceMatcher(None, "", needle)
+    best = 0.0
+    for start in range(len(haystack) - width + 1):
+        matcher.set_seq1(haystack[start:start + width])
+        if matcher.real_quick_ratio() <= best or matcher.quick_ratio() <= best:
+            continue
+        best = max(best, matcher.ratio())
+        if best == 1.0:
+            break
+    return best
+
+
+def _match_option_text_fuzzy(msg_lower: str, options: list, labels: list[str]) -> str | None:
+    """快速判斷：近似選項文字（錯字、少字），唯一最高分且過門檻才採用"""
+    if len(msg_lower) > _FUZZY_MAX_MESSAGE_LEN:
+        return None
+    scored = []
+    for label, opt in zip(labels, options):
+        text = opt.get("text", "").lower()
+        if len(text) >= _FUZZY_MIN_OPTION_LEN:
+            scored.append((_partial_similarity(text, msg_lower), label))
+    if not scored:
+        return None
+    scored.sort(reverse=True)
+    best_score, best_label = scored[0]
+    if best_score < _FUZZY_SCORE_CUTOFF:
+        return None
+    if len(scored) > 1 and scored[1][0] >= _FUZZY_SCORE_CUTOFF:
+        return None
+    return best_label
+
+
+def _option_texts(options: list) -> tuple[str, ...]:
+    return tuple(
+        opt.get("text", "") if isinstance(opt, dict) else ""
+        for opt in options[: len(OPTION_LABELS)]
+    )
+
+
+@lru_cache(maxsize=512)
+def _rule_judge(msg: str, option_texts: tuple[str, ...]) -> tuple[str | None, str]:
+    """規則判斷（純函式，依訊息與選項文字快取）；回傳 (選項字母或 None, 命中的規則名稱)
+
+    「A」「1」這類重複出現的回覆直接命中快取，不再跑 regex 與近似比對。
+    """
+    msg_upper = msg.upper()
+    msg_lower = msg.lower()
+    options = [{"text": text} for text in option_texts]
+    labels = list(OPTION_LABELS[: len(option_texts)])
+
+    letters, digits = _scan_choice_tokens(msg_upper)
+
+    if (res := _match_exact_label(msg_upper, labels, letters)):
+        return res, "字母匹配"
+    if (res := _match_number_or_sequence(msg, labels, digits)):
+        return res, "數字/序號匹配"
+    if (res := _match_option_text(msg_lower, options, labels)):
+        return res, "選項文字匹配"
+    if (res := _match_option_text_fuzzy(msg_lower, options, labels)):
+        return res, "選項文字近似匹配"
+    return None, ""
+
+
+_OFF_TOPIC_MIN_LEN = 9
+_PAUSE_HINTS = ("中斷", "暫停", "停止", "結束", "退出", "不做", "不玩", "不測", "算了", "pause", "stop", "quit", "exit")
+# 序號 / 位置詞：「第一個可以嗎？」「最後那個吧？」是作答，不能當成離題提問
+_ORDINAL_PATTERN = re.compile(
+    "|".join(re.escape(key) for key in SEQUENCE_TO_INDEX)
+    + r"|[0-9０-９一二三四五六七八九十兩]|第|最後|最前|前面|後面|前者|後者"
+)
+
+
+@lru_cache(maxsize=512)
+def _is_off_topic_question(msg: str, option_texts: tuple[str, ...]) -> bool:
+    """明顯是提問而非作答（可直接視為 X，不送 LLM）；msg 需已 strip + casefold
+
+    條件全部成立才算：夠長、以問號結尾、不含英數（可能是選項代號）、
+    不含序號 / 中文數字 / 位置詞、不含暫停意圖，且與任一選項文字沒有共同片段。
+    """
+    if len(msg) < _OFF_TOPIC_MIN_LEN or not msg.endswith(("?", "？")):
+        return False
+    if any(c.isascii() and c.isalnum() for c in msg):
+        return False
+    if _ORDINAL_PATTERN.search(msg):
+        return False
+    if any(hint in msg for hint in _PAUSE_HINTS):
+        return False
+    for text in option_texts:
+        text = text.casefold()
+        if not text:
+            continue
+        if text in msg or any(text[i:i + 2] in msg for i in range(len(text) - 1)):
+            return False
+    return True
+
+
 async def _judge_user_choice(user_message: str, question: dict) -> str | None:
     """
     先用規則判斷，判不出時用 LLM 判斷使用者選擇哪個選項
@@ -224,61 +441,197 @@ async def _judge_user_choice(user_message: str, question: dict) -> str | None:
         "A"~"E" 或 None（無法判斷）
     """
     msg = user_message.strip()
-    msg_upper = msg.upper()
-    msg_lower = msg.lower()
     options = question.get("options", []) if isinstance(question, dict) else []
-    labels = list("ABCDE")[: len(options)]
+    labels = list(OPTION_LABELS[: len(options)])
 
-    if (res := _match_exact_label(msg_upper, labels)):
-        logger.info(f"[規則判斷] 字母匹配: '{user_message}' -> {res}")
+    option_texts = _option_texts(options)
+    res, rule = _rule_judge(msg, option_texts)
+    if res:
+        logger.info("[規則判斷] %s: '%s' -> %s", rule, user_message, res)
         return res
 
-    if (res := _match_number_or_sequence(msg, options)):
-        logger.info(f"[規則判斷] 數字/序號匹配: '{user_message}' -> {res}")
-        return res
+    if _is_off_topic_question(msg.casefold(), option_texts):
+        logger.info("[規則判斷] 非作答提問，略過 LLM: '%s'", user_message)
+        return None
 
-    if (res := _match_option_text(msg_lower, options)):
-        logger.info(f"[規則判斷] 選項文字匹配: '{user_message}' -> {res}")
-        return res
+    key = (str(question.get("id", "")), question.get("text", ""), msg)
+    cached = _judge_cache.get(key)
+    if cached and time.monotonic() - cached[0] < _JUDGE_CACHE_TTL_SECONDS:
+        logger.info("[LLM判斷] 使用近期結果: '%s' -> %s", user_message, cached[1])
+        return cached[1]
+
+    # Single-flight：同一題、同一句回覆（連點、重送）共用同一次 LLM 呼叫
+    future = _judge_inflight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(_judge_with_llm(user_message, question, options, labels))
+        _judge_inflight[key] = future
+        future.add_done_callback(lambda done, done_key=key: _remember_judgement(done_key, done))
+    return await asyncio.shield(future)
+
+
+def _remember_judgement(key: tuple[str, str, str], future: asyncio.Future) -> None:
+    _judge_inflight.pop(key, None)
+    if future.cancelled() or future.exception() is not None:
+        return
+    now = time.monotonic()
+    if len(_judge_cache) >= _JUDGE_CACHE_MAX:
+        for stale_key in [k for k, (ts, _) in _judge_cache.items() if now - ts >= _JUDGE_CACHE_TTL_SECONDS]:
+            del _judge_cache[stale_key]
+        if len(_judge_cache) >= _JUDGE_CACHE_MAX:
+            _judge_cache.clear()
+    _judge_cache[key] = (now, future.result())
+
+
+_JUDGE_BATCH_WINDOW_SECONDS = 0.05
+_JUDGE_BATCH_MAX = 16
+_JUDGE_RULES = """規則：
+- 如果使用者明確說要暫停/中斷/停止/結束/退出測驗（如「暫停」「中斷」「不做了」「退出」） → 回覆 PAUSE
+- 如果使用者在問產品問題或閒聊，但沒說要退出測驗 → 回覆 X（不是 PAUSE）
+- 如果使用者明確選擇或傾向某選項（即使在解釋理由） → 回覆該選項的字母
+- 如果無法判斷 → 回覆 X"""
+_BATCH_ANSWER_LINE = re.compile(r"^\s*(\d+)\s*[:：.)、]\s*([A-Za-z]+)")
 
-    logger.info(f"[LLM判斷] 規則無法判定，呼叫 LLM: '{user_message}'")
-    try:
-        client = get_default_client()
 
-        prompt = f"""判斷使用者意圖：作答、或是想暫停/中斷測驗。
+def _build_judge_prompt(user_message: str, question: dict, options: list) -> str:
+    return f"""判斷使用者意圖：作答、或是想暫停/中斷測驗。
 
 題目：{question.get('text', '')}
 {format_option_texts(options)}
 
 使用者回覆：「{user_message}」
 
-規則：
-- 如果使用者明確說要暫停/中斷/停止/結束/退出測驗（如「暫停」「中斷」「不做了」「退出」） → 回覆 PAUSE
-- 如果使用者在問產品問題或閒聊，但沒說要退出測驗 → 回覆 X（不是 PAUSE）
-- 如果使用者明確選擇或傾向某選項（即使在解釋理由） → 回覆該選項的字母
-- 如果無法判斷 → 回覆 X
+{_JUDGE_RULES}
 
 只回覆：A 至 E、PAUSE 或 X"""
 
-        response = await run_sync(
-            gemini_with_fallback,
-            lambda m: gemini_with_retry(
-                lambda: client.models.generate_content(model=m, contents=prompt)
-            ),
-            fallback_chain(QUIZ_HELPER_MODEL, client),
-        )
 
-        result = response.text.strip().upper()
+def _build_batch_judge_prompt(items: list[tuple[str, dict, list]]) -> str:
+    sections = [
+        f"[{index}]\n題目：{question.get('text', '')}\n{format_option_texts(options)}\n使用者回覆：「{user_message}」"
+        for index, (user_message, question, options) in enumerate(items, start=1)
+    ]
+    body = "\n\n".join(sections)
+    return f"""以下有 {len(items)} 則測驗作答，逐一判斷使用者意圖：作答、或是想暫停/中斷測驗。
 
-        if result in labels:
-            logger.info(f"[LLM判斷] 成功: '{user_message}' -> {result}")
-            return result
-        if result == "PAUSE":
-            logger.info(f"[LLM判斷] 暫停測驗: '{user_message}' -> PAUSE")
-            return "PAUSE"
-        logger.info(f"[LLM判斷] 失敗/無法判斷: '{user_message}' -> {result}")
-        return None
+{body}
 
-    except Exception as e:
-        logger.error(f"LLM 判斷失敗: {e}")
-        return None
+{_JUDGE_RULES}
+
+每則一行，格式為「編號: 答案」（例如 1: A），答案只能是 A 至 E、PAUSE 或 X。"""
+
+
+def _interpret_judgement(raw: str, user_message: str, labels: list[str]) -> str | None:
+    result = raw.strip().upper()
+    if result in labels:
+        logger.info("[LLM判斷] 成功: '%s' -> %s", user_message, result)
+        return result
+    if result == "PAUSE":
+        logger.info("[LLM判斷] 暫停測驗: '%s' -> PAUSE", user_message)
+        return "PAUSE"
+    logger.info("[LLM判斷] 失敗/無法判斷: '%s' -> %s", user_message, result)
+    return None
+
+
+async def _generate_judgement_text(prompt: str) -> str:
+    client = get_default_client()
+    response = await run_sync(
+        gemini_with_fallback,
+        lambda m: gemini_with_retry(
+            lambda: client.models.generate_content(model=m, contents=prompt)
+        ),
+        fallback_chain(QUIZ_HELPER_MODEL, client),
+    )
+    return response.text or ""
+
+
+class _JudgeBatcher:
+    """收集短時間窗內的 LLM 判斷請求，合併成一次 Gemini 呼叫。
+
+    閒置時（無排隊、無進行中的呼叫）請求立即送出；忙碌時才開 _JUDGE_BATCH_WINDOW_SECONDS
+    的窗，窗內（或滿 _JUDGE_BATCH_MAX 筆）的請求共用同一個 prompt，單筆時沿用單題 prompt。
+    每個 event loop 各自一個 batcher（見 _get_judge_batcher）。
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self._pending: list[tuple[str, dict, list, list[str], asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def judge(
+        self,
+        user_message: str,
+        question: dict,
+        options: list,
+        labels: list[str],
+    ) -> str | None:
+        future = self._loop.create_future()
+        idle = not self._pending and not self._tasks
+        self._pending.append((user_message, question, options, labels, future))
+        if idle or len(self._pending) >= _JUDGE_BATCH_MAX:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(_JUDGE_BATCH_WINDOW_SECONDS, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = self._loop.create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: list[tuple[str, dict, list, list[str], asyncio.Future]]) -> None:
+        try:
+            if len(batch) == 1:
+                user_message, question, options, _, _ = batch[0]
+                raw_answers = {1: await _generate_judgement_text(
+                    _build_judge_prompt(user_message, question, options)
+                )}
+            else:
+                logger.info("[LLM判斷] 合併 %d 筆判斷為單次呼叫", len(batch))
+                text = await _generate_judgement_text(
+                    _build_batch_judge_prompt([(m, q, o) for m, q, o, _, _ in batch])
+                )
+                raw_answers = {}
+                for line in text.splitlines():
+                    match = _BATCH_ANSWER_LINE.match(line)
+                    if match:
+                        raw_answers.setdefault(int(match.group(1)), match.group(2))
+        except Exception as e:
+            logger.error("LLM 判斷失敗: %s", e)
+            raw_answers = {}
+
+        for index, (user_message, _, _, labels, future) in enumerate(batch, start=1):
+            if future.done():
+                continue
+            future.set_result(
+                _interpret_judgement(raw_answers.get(index, "X"), user_message, labels)
+            )
+
+
+_judge_batchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _JudgeBatcher]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_judge_batcher() -> _JudgeBatcher:
+    loop = asyncio.get_running_loop()
+    batcher = _judge_batchers.get(loop)
+    if batcher is None:
+        batcher = _judge_batchers[loop] = _JudgeBatcher(loop)
+    return batcher
+
+
+async def _judge_with_llm(
+    user_message: str,
+    question: dict,
+    options: list,
+    labels: list[str],
+) -> str | None:
+    """呼叫 LLM 判斷作答選項或暫停意圖（經 micro-batch 合併）"""
+    logger.info("[LLM判斷] 規則無法判定，呼叫 LLM: '%s'", user_message)
+    return await _get_judge_batcher().judge(user_message, question, options, labels)
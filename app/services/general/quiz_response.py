@@ -6,6 +6,7 @@ and services share one formatting path.
 
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Any
 
 from app.services.quiz.config import QuizFlowConfig
@@ -17,19 +18,41 @@ QUIZ_OPENING = {
 }
 
 
+OPTION_LABELS = "ABCDE"
+
+# 數字 / 中文序號 → 選項索引
+SEQUENCE_TO_INDEX = {
+    "1": 0, "一": 0, "第一": 0,
+    "2": 1, "二": 1, "第二": 1,
+    "3": 2, "三": 2, "第三": 2,
+    "4": 3, "四": 3, "第四": 3,
+    "5": 4, "五": 4, "第五": 4,
+}
+
+
+def _option_text_key(options: list[dict[str, Any]]) -> tuple[str, ...]:
+    return tuple(option.get("text", "") for option in options[: len(OPTION_LABELS)])
+
+
+@lru_cache(maxsize=256)
+def _labelled_option_texts(texts: tuple[str, ...]) -> tuple[str, ...]:
+    return tuple(f"{label}. {text}" for label, text in zip(OPTION_LABELS, texts))
+
+
+@lru_cache(maxsize=256)
+def _formatted_option_texts(texts: tuple[str, ...]) -> str:
+    return "\n".join(_labelled_option_texts(texts))
+
+
 def label_option_texts(options: list[dict[str, Any]]) -> list[str]:
     """Return labelled option strings, e.g. ['A. 簡約', 'B. 可愛']."""
-    labels = "ABCDE"
-    return [
-        f"{labels[i]}. {option.get('text', '')}"
-        for i, option in enumerate(options)
-        if i < len(labels)
-    ]
+    # 題目在測驗過程中會重複顯示，以選項文字為 key 快取組好的字串
+    return list(_labelled_option_texts(_option_text_key(options)))
 
 
 def format_option_texts(options: list[dict[str, Any]]) -> str:
     """Format options as a newline-separated string for display in messages."""
-    return "\n".join(label_option_texts(options))
+    return _formatted_option_texts(_option_text_key(options))
 
 
 def extract_option_texts(question: dict[str, Any] | None) -> list[str] | None:
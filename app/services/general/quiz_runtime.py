@@ -3,16 +3,18 @@
 from __future__ import annotations
 
 import logging
+from operator import itemgetter
 from typing import Any
 
 from fastapi import HTTPException
 
 from app.routers.tts_utils import attach_tts_message_id
 from app.schemas.chat import ChatResponse
+from app.services.gemini_service import run_sync
 from app.services.general.quiz_helpers import (
     _judge_user_choice,
     _pause_quiz_and_respond,
-    build_session_state,
+    log_quiz_turn,
 )
 from app.services.general.quiz_response import (
     QUIZ_OPENING,
@@ -62,7 +64,7 @@ async def _pause_quiz(
         session=session,
         config=config,
     )
-    return _attach_tts(ChatResponse(**response), session.language, config)
+    return _attach_tts(ChatResponse.model_construct(**response), session.language, config)
 
 
 async def execute_quiz_start(
@@ -74,7 +76,7 @@ async def execute_quiz_start(
     """Start a quiz for both direct API and keyword-triggered chat flow."""
     session_manager = config.session_manager_getter()
     conversation_logger = config.conversation_logger_getter()
-    session = session_manager.get_session(session_id)
+    session = await run_sync(session_manager.get_session, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
@@ -88,21 +90,20 @@ async def execute_quiz_start(
             _ALREADY_DONE_COPY.get(language, _ALREADY_DONE_COPY["zh"]),
         )
 
-        log_result = conversation_logger.log_conversation(
+        final_turn_number = await log_quiz_turn(
+            conversation_logger,
             session_id=session_id,
             user_message=user_message,
             agent_response=response_message,
-            tool_calls=[],
-            session_state=build_session_state(session),
+            session=session,
             mode=config.mode,
         )
-        final_turn_number = log_result[1] if log_result else None
         response_fields = build_quiz_response_fields(
             response_message,
             language,
             config=config,
         )
-        return ChatResponse(
+        return ChatResponse.model_construct(
             **response_fields,
             session=session.model_dump(),
             tool_calls=[],
@@ -111,7 +112,9 @@ async def execute_quiz_start(
 
     executor = ToolExecutor(config)
     tool_result = await executor.execute("start_quiz", {"session_id": session_id})
-    updated_session = session_manager.get_session(session_id)
+    updated_session = tool_result.pop("_updated_session", None) or await run_sync(
+        session_manager.get_session, session_id
+    )
 
     if not tool_result.get("success"):
         error_message = tool_result.get("error", "start_quiz failed")
@@ -121,7 +124,7 @@ async def execute_quiz_start(
             fallback_language,
             config=config,
         )
-        return ChatResponse(
+        return ChatResponse.model_construct(
             **response_fields,
             session=updated_session.model_dump() if updated_session else session.model_dump(),
             tool_calls=[],
@@ -146,24 +149,24 @@ async def execute_quiz_start(
         prefix=opening,
         config=config,
     )
-    tool_args = {"session_id": session_id}
-    log_tool_call = {"tool": "start_quiz", "args": tool_args, "result": tool_result}
+    response_tool_call = {"tool": "start_quiz", "args": {"session_id": session_id}}
+    log_tool_call = {**response_tool_call, "result": tool_result}
 
-    log_result = conversation_logger.log_conversation(
+    final_turn_number = await log_quiz_turn(
+        conversation_logger,
         session_id=session_id,
         user_message=user_message,
         agent_response=response_fields["message"],
         tool_calls=[log_tool_call],
-        session_state=build_session_state(active_session),
+        session=active_session,
         mode=config.mode,
     )
-    final_turn_number = log_result[1] if log_result else None
 
-    return ChatResponse(
+    return ChatResponse.model_construct(
         **response_fields,
         options=extract_option_texts(question),
         session=active_session.model_dump(),
-        tool_calls=[{"tool": "start_quiz", "args": tool_args}],
+        tool_calls=[response_tool_call],
         turn_number=final_turn_number,
     )
 
@@ -182,7 +185,8 @@ async def handle_quiz_message(
     conversation_logger = config.conversation_logger_getter()
 
     question = session.current_question
-    total_questions = get_total_questions(
+    # 進行中的測驗以已抽出的題目數為準，免去每回合查題庫
+    total_questions = len(session.selected_questions or []) or get_total_questions(
         session.language,
         store_name=config.store_name,
     )
@@ -192,14 +196,14 @@ async def handle_quiz_message(
         return await _pause_quiz(session, request, config)
 
     logger.info(
-        "[測驗進度] 第 %d/%d 題 | 題目: %s...",
+        "[測驗進度] 第 %d/%d 題 | 題目: %.30s...",
         current_q_num,
         total_questions,
-        question.get("text", "")[:30],
+        question.get("text", ""),
     )
 
     user_choice = await _judge_user_choice(request.message, question)
-    logger.info(f"[答題判斷] 使用者回答: '{request.message}' -> 判定選項: {user_choice}")
+    logger.info("[答題判斷] 使用者回答: '%s' -> 判定選項: %s", request.message, user_choice)
 
     if user_choice == "PAUSE":
         return await _pause_quiz(session, request, config)
@@ -216,29 +220,29 @@ async def handle_quiz_message(
         updated_session = tool_result.pop(
             "_updated_session",
             None,
-        ) or session_manager.get_session(request.session_id)
-        tool_calls = [
-            {
-                "tool": "submit_answer",
-                "args": {"user_choice": user_choice},
-                "result": tool_result,
-            }
-        ]
+        ) or await run_sync(session_manager.get_session, request.session_id)
+        # 回應用的 tool_calls 與寫入 log 的版本共用 args，只差在不帶 result
+        response_tool_call = {
+            "tool": "submit_answer",
+            "args": {"user_choice": user_choice},
+        }
+        tool_calls = [{**response_tool_call, "result": tool_result}]
         logger.info(
             "[答題結果] 選項: %s | 已答: %d/%d 題",
             user_choice,
             len(updated_session.answers),
             total_questions,
         )
-        if updated_session.quiz_scores:
+        if updated_session.quiz_scores and logger.isEnabledFor(logging.INFO):
             scores_str = " | ".join(
                 f"{key}:{value}"
                 for key, value in sorted(
                     updated_session.quiz_scores.items(),
-                    key=lambda item: -item[1],
+                    key=itemgetter(1),
+                    reverse=True,
                 )
             )
-            logger.info(f"[當前分數] {scores_str}")
+            logger.info("[當前分數] %s", scores_str)
 
         is_complete = tool_result.get("is_complete")
         next_q = tool_result.get("next_question") if not is_complete else None
@@ -256,7 +260,7 @@ async def handle_quiz_message(
             updated_session.chat_history.append(
                 {"role": "assistant", "content": response_message}
             )
-            session_manager.update_session(updated_session)
+            await run_sync(session_manager.update_session, updated_session)
         else:
             q_num = len(updated_session.answers) + 1
             response_fields = build_quiz_question_fields(
@@ -267,27 +271,24 @@ async def handle_quiz_message(
             )
             response_message = response_fields["message"]
 
-        log_result = conversation_logger.log_conversation(
+        final_turn_number = await log_quiz_turn(
+            conversation_logger,
             session_id=request.session_id,
             user_message=request.message,
             agent_response=response_message,
             tool_calls=tool_calls,
-            session_state=build_session_state(updated_session),
+            session=updated_session,
             mode=config.mode,
         )
-        final_turn_number = log_result[1] if log_result else None
-        logger.info(f"QUIZ 作答成功: {request.message} -> {user_choice}")
+        logger.info("QUIZ 作答成功: %s -> %s", request.message, user_choice)
 
         quiz_result = tool_result.get("quiz_result") or {}
-        response_payload = ChatResponse(
+        response_payload = ChatResponse.model_construct(
             **response_fields,
             options=extract_option_texts(next_q),
             quiz_result_id=quiz_result.get("quiz_id") if is_complete else None,
             session=updated_session.model_dump(),
-            tool_calls=[
-                {key: value for key, value in call.items() if key != "result"}
-                for call in tool_calls
-            ],
+            tool_calls=[response_tool_call],
             turn_number=final_turn_number,
         )
         return _attach_tts(response_payload, updated_session.language, config)
@@ -308,22 +309,19 @@ async def handle_quiz_message(
     )
     response_message = response_fields["message"]
 
-    logger.info(f"QUIZ 無法判斷選項，hardcode 提示: {request.message}")
+    logger.info("QUIZ 無法判斷選項，hardcode 提示: %s", request.message)
 
-    if request.turn_number:
-        conversation_logger.delete_turns_from(request.session_id, request.turn_number)
-
-    log_result = conversation_logger.log_conversation(
+    final_turn_number = await log_quiz_turn(
+        conversation_logger,
         session_id=request.session_id,
         user_message=request.message,
         agent_response=response_message,
-        tool_calls=[],
-        session_state=build_session_state(session),
+        session=session,
         mode=config.mode,
+        rollback_from=request.turn_number,
     )
-    final_turn_number = log_result[1] if log_result else None
 
-    response_payload = ChatResponse(
+    response_payload = ChatResponse.model_construct(
         **response_fields,
         options=extract_option_texts(question),
         session=session.model_dump(),
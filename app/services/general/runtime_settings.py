@@ -34,6 +34,7 @@ def load_runtime_settings_from_prompt_manager(
     prompt_manager,
     prompt_id: Optional[str] = None,
     store_name: Optional[str] = None,
+    store_prompts=None,
 ) -> GeneralRuntimeSettings:
     """Load runtime settings.
 
@@ -84,11 +84,13 @@ def load_runtime_settings_from_prompt_manager(
     prompt_manager,
     prompt_id: Optional[str] = None,
     store_name: str = HCIOT_STORE_NAME,
+    store_prompts=None,
 ) -> HciotRuntimeSettings:
     return _runtime_settings_repo.load_from_prompt_manager(
         prompt_manager,
         prompt_id,
         store_name=store_name,
+        store_prompts=store_prompts,
     )
 
 
@@ -97,10 +99,14 @@ def save_runtime_settings_to_prompt_manager(
     settings: HciotRuntimeSettings,
     prompt_id: Optional[str] = None,
     store_name: str = HCIOT_STORE_NAME,
+    store_prompts=None,
+    persist: bool = True,
 ) -> str:
     return _runtime_settings_repo.save_to_prompt_manager(
         prompt_manager,
         settings,
         prompt_id,
         store_name=store_name,
+        store_prompts=store_prompts,
+        persist=persist,
     )
@@ -11,10 +11,9 @@ import mimetypes
 import os
 from pathlib import Path
 
+from app.routers.knowledge_utils import EDITABLE_EXTENSIONS
 from app.services.jti.knowledge_store import get_jti_knowledge_store
 
-EDITABLE_EXTENSIONS = {".txt", ".md", ".csv", ".json", ".yaml", ".yml", ".docx"}
-
 
 def migrate_knowledge() -> int:
     root = Path(os.getenv("KB_ROOT", "data/knowledge"))
@@ -37,10 +36,14 @@ def migrate_knowledge() -> int:
             continue
 
         print(f"[Migrate] language={language}")
-        for file_path in sorted(lang_dir.iterdir()):
-            if not file_path.is_file() or file_path.name.startswith("."):
-                continue
-
+        # scandir 的 DirEntry.is_file() 直接用列目錄時取得的型別，不必每個檔案再 stat 一次
+        with os.scandir(lang_dir) as entries:
+            file_paths = sorted(
+                Path(entry.path)
+                for entry in entries
+                if entry.is_file() and not entry.name.startswith(".")
+            )
+        for file_path in file_paths:
             total_files += 1
             data = file_path.read_bytes()
             ext = file_path.suffix.lower()
@@ -61,12 +61,15 @@ def get_default_runtime_settings() -> JtiRuntimeSettings:
     return JtiRuntimeSettings()
 
 
+_DEFAULT_PERSONA_PAIR = {
+    "zh": PERSONA.get("zh", ""),
+    "en": PERSONA.get("en", PERSONA.get("zh", "")),
+}
+
+
 def _default_persona_pair() -> Dict[str, str]:
-    zh = PERSONA.get("zh", "")
-    return {
-        "zh": zh,
-        "en": PERSONA.get("en", zh),
-    }
+    # 會被寫進 profile，回傳 copy 避免共用同一個 dict
+    return dict(_DEFAULT_PERSONA_PAIR)
 
 
 _runtime_settings_repo = RuntimeSettingsRepo[JtiRuntimeSettings](
@@ -89,12 +92,14 @@ def load_runtime_settings_from_prompt_manager(
     prompt_manager,
     prompt_id: Optional[str] = None,
     store_name: str = JTI_STORE_NAME,
+    store_prompts=None,
 ) -> JtiRuntimeSettings:
     """Load effective runtime settings from PromptManager."""
     return _runtime_settings_repo.load_from_prompt_manager(
         prompt_manager,
         prompt_id,
         store_name=store_name,
+        store_prompts=store_prompts,
     )
 
 
@@ -103,6 +108,8 @@ def save_runtime_settings_to_prompt_manager(
     settings: JtiRuntimeSettings,
     prompt_id: Optional[str] = None,
     store_name: str = JTI_STORE_NAME,
+    store_prompts=None,
+    persist: bool = True,
 ) -> str:
     """Persist runtime settings in PromptManager under JTI store document."""
     return _runtime_settings_repo.save_to_prompt_manager(
@@ -110,4 +117,6 @@ def save_runtime_settings_to_prompt_manager(
         settings,
         prompt_id,
         store_name=store_name,
+        store_prompts=store_prompts,
+        persist=persist,
     )
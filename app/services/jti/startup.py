@@ -31,12 +31,9 @@ def _init_jti_default_prompt(prompt_manager) -> None:
         return
 
     for store_name in JTI_STORES:
-        prompts = prompt_manager.list_prompts(store_name)
-        has_old_default = any(p.id == SYSTEM_DEFAULT_PROMPT_ID for p in prompts)
-
-        if has_old_default:
+        store_prompts = prompt_manager.get_store_prompts(store_name)
+        if store_prompts.find_prompt(SYSTEM_DEFAULT_PROMPT_ID):
             # 移除舊的 system_default，預設人物設定改為從程式碼讀取
-            store_prompts = prompt_manager.get_store_prompts(store_name)
             store_prompts.prompts = [
                 p for p in store_prompts.prompts if p.id != SYSTEM_DEFAULT_PROMPT_ID
             ]
@@ -9,15 +9,36 @@
 
 import json
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 是選用加速
+    orjson = None
+
 _TZ_TAIPEI = timezone(timedelta(hours=8))
 
+# JSONL 讀取用的解析函式：有 orjson 時用它（較快、配置較少），否則退回標準 json
+_loads_line = orjson.loads if orjson is not None else json.loads
+
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class _SessionSummaryAcc:
+    """get_session_summaries 每個 session 的單次掃描累加器。"""
+
+    first_key: tuple
+    first_doc: Dict
+    last_ts: Optional[str]
+    count: int
+    language_key: tuple
+    language: Optional[str]
+
+
 class ConversationLogger:
     """對話日誌記錄器 (檔案/記憶體備份版本)"""
 
@@ -29,7 +50,7 @@ class ConversationLogger:
         """
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
-        logger.info(f"ConversationLogger initialized: {self.log_dir}")
+        logger.info("ConversationLogger initialized: %s", self.log_dir)
 
     def _get_log_paths(self, session_id: str, timestamp: Optional[datetime] = None) -> tuple[Path, Path]:
         """Find or create log paths (jsonl and txt) for a session."""
@@ -63,8 +84,8 @@ class ConversationLogger:
             timestamp = datetime.now(_TZ_TAIPEI)
 
             # 讀取已存在的對話以決定下一輪 turn_number
-            logs = self.get_session_logs(session_id)
             if turn_number is None:
+                logs = self.get_session_logs(session_id)
                 max_turn = max((log.get("turn_number", 0) for log in logs), default=0)
                 turn_number = max_turn + 1
 
@@ -117,11 +138,11 @@ class ConversationLogger:
             return (str(turn_number), turn_number)
 
         except Exception as e:
-            logger.error(f"Failed to log conversation: {e}", exc_info=True)
+            logger.error("Failed to log conversation: %s", e, exc_info=True)
             return None
 
-    def get_session_logs(self, session_id: str) -> List[Dict]:
-        """取得特定 session 的所有日誌"""
+    def get_session_logs(self, session_id: str, mode: Optional[str] = None) -> List[Dict]:
+        """取得特定 session 的所有日誌；指定 mode 時只回傳該模式的紀錄"""
         log_file, _ = self._get_log_paths(session_id)
         if not log_file.exists():
             return []
@@ -131,9 +152,11 @@ class ConversationLogger:
             with open(log_file, "r", encoding="utf-8") as f:
                 for line in f:
                     if line.strip():
-                        logs.append(json.loads(line))
+                        doc = _loads_line(line)
+                        if mode is None or doc.get("mode") == mode:
+                            logs.append(doc)
         except Exception as e:
-            logger.error(f"Failed to read session logs: {e}")
+            logger.error("Failed to read session logs: %s", e)
         return sorted(logs, key=lambda x: x.get("turn_number", 0))
 
     def get_session_logs_by_mode(self, mode: str) -> List[Dict]:
@@ -144,13 +167,19 @@ class ConversationLogger:
                 with open(log_file, "r", encoding="utf-8") as f:
                     for line in f:
                         if line.strip():
-                            doc = json.loads(line)
+                            doc = _loads_line(line)
                             if doc.get("mode") == mode:
                                 logs.append(doc)
         except Exception as e:
-            logger.error(f"Failed to get session logs by mode: {e}")
+            logger.error("Failed to get session logs by mode: %s", e)
         return sorted(logs, key=lambda x: x.get("timestamp", ""), reverse=True)
 
+    def get_grouped_session_logs_by_mode(self, mode: str, limit: Optional[int] = None) -> List[Dict]:
+        """按模式取得依 session 分組的對話紀錄（格式同 group_conversations_by_session）"""
+        from app.utils import group_conversations_by_session
+
+        return group_conversations_by_session(self.get_session_logs_by_mode(mode), limit=limit)
+
     def delete_session_logs(self, session_id: str) -> int:
         """刪除特定 session 的所有對話紀錄"""
         log_file, readable_log_file = self._get_log_paths(session_id)
@@ -164,9 +193,9 @@ class ConversationLogger:
             log_file.unlink()
             if readable_log_file.exists():
                 readable_log_file.unlink()
-            logger.info(f"Deleted {count} conversation logs for session {session_id[:8]}...")
+            logger.info("Deleted %s conversation logs for session %.8s...", count, session_id)
         except Exception as e:
-            logger.error(f"Failed to delete session logs: {e}")
+            logger.error("Failed to delete session logs: %s", e)
             return 0
         return count
 
@@ -190,12 +219,21 @@ class ConversationLogger:
                     with open(log_file, "w", encoding="utf-8") as f:
                         for entry in keep_logs:
                             f.write(json.dumps(entry, ensure_ascii=False) + "\n")
-                logger.info(f"Deleted {deleted_count} turns (>= #{from_turn_number}) for session {session_id[:8]}...")
+                logger.info("Deleted %s turns (>= #%s) for session %.8s...", deleted_count, from_turn_number, session_id)
             return deleted_count
         except Exception as e:
-            logger.error(f"Failed to delete turns from session {session_id}: {e}")
+            logger.error("Failed to delete turns from session %s: %s", session_id, e)
             return 0
 
+    def replace_turns_from(self, session_id: str, from_turn_number: int, **log_kwargs) -> Optional[tuple[str, int]]:
+        """重新生成：刪除 from_turn_number 起的紀錄並寫入新的一輪（有刪到時沿用該輪次，免再讀一次檔）"""
+        deleted_count = self.delete_turns_from(session_id, from_turn_number)
+        return self.log_conversation(
+            session_id=session_id,
+            turn_number=from_turn_number if deleted_count else None,
+            **log_kwargs,
+        )
+
     def list_sessions(self) -> List[str]:
         """列出所有有日誌的 session"""
         return sorted(f.name.split("_")[-1].replace(".jsonl", "") for f in self.log_dir.glob("*.jsonl"))
@@ -235,6 +273,25 @@ class ConversationLogger:
                             return False
         return True
 
+    def _collect_session_actives(self, query: Dict[str, Any], earliest: bool = False) -> Dict[str, str]:
+        """遍歷所有紀錄，邊讀邊按 session_id 取得最新（earliest 時為最早）時間（不保留整批 doc）"""
+        session_actives: Dict[str, str] = {}
+        for log_file in self.log_dir.glob("*.jsonl"):
+            with open(log_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    doc = _loads_line(line)
+                    sid = doc.get("session_id")
+                    if not sid or not self._matches_query(doc, query):
+                        continue
+                    ts_str = doc.get("timestamp", "")
+                    if sid not in session_actives or (
+                        ts_str < session_actives[sid] if earliest else ts_str > session_actives[sid]
+                    ):
+                        session_actives[sid] = ts_str
+        return session_actives
+
     def get_paginated_session_ids(
         self,
         query: Dict[str, Any],
@@ -243,27 +300,10 @@ class ConversationLogger:
     ) -> tuple[List[str], int]:
         """分頁取得符合條件的 session_ids"""
         try:
-            # 遍歷所有紀錄
-            all_logs = []
-            for log_file in self.log_dir.glob("*.jsonl"):
-                with open(log_file, "r", encoding="utf-8") as f:
-                    for line in f:
-                        if line.strip():
-                            doc = json.loads(line)
-                            if self._matches_query(doc, query):
-                                all_logs.append(doc)
-
-            # 按 session_id 分組，並取得最新時間
-            session_actives = {}
-            for doc in all_logs:
-                sid = doc.get("session_id")
-                ts_str = doc.get("timestamp", "")
-                if sid:
-                    if sid not in session_actives or ts_str > session_actives[sid]:
-                        session_actives[sid] = ts_str
+            session_actives = self._collect_session_actives(query)
 
-            # 按最新活動時間排序
-            sorted_sessions = sorted(session_actives.keys(), key=lambda s: session_actives[s], reverse=True)
+            # 按最新活動時間排序（key 直接取 dict 的 bound method，不經 lambda）
+            sorted_sessions = sorted(session_actives, key=session_actives.__getitem__, reverse=True)
             total_sessions = len(sorted_sessions)
 
             # 分頁
@@ -273,11 +313,42 @@ class ConversationLogger:
             return paginated, total_sessions
 
         except Exception as e:
-            logger.error(f"Failed to get paginated session ids: {e}")
+            logger.error("Failed to get paginated session ids: %s", e)
             return [], 0
 
-    def get_logs_for_sessions(self, session_ids: List[str]) -> List[Dict]:
-        """取得指定 session_ids 的所有對話紀錄"""
+    def get_session_ids_after(
+        self,
+        query: Dict[str, Any],
+        after: Optional[tuple[str, str]] = None,
+        page_size: int = 10,
+    ) -> tuple[List[str], Optional[tuple[str, str]]]:
+        """以 (last_active, session_id) 游標取得下一頁 session_ids"""
+        try:
+            keys = sorted(
+                ((ts, sid) for sid, ts in self._collect_session_actives(query).items()),
+                reverse=True,
+            )
+            if after is not None:
+                keys = [key for key in keys if key < after]
+            page = keys[:page_size]
+            next_after = page[-1] if len(keys) > page_size else None
+            return [sid for _, sid in page], next_after
+
+        except Exception as e:
+            logger.error("Failed to get session ids after cursor: %s", e)
+            return [], None
+
+    def get_export_session_ids(self, query: Dict[str, Any]) -> List[str]:
+        """取得符合條件的全部 session_ids（首則訊息時間倒序，同時間依 session_id 倒序）"""
+        first_times = self._collect_session_actives(query, earliest=True)
+        return [sid for _, sid in sorted(((ts, sid) for sid, ts in first_times.items()), reverse=True)]
+
+    def get_logs_for_sessions(
+        self,
+        session_ids: List[str],
+        mode: Optional[str] = None,
+    ) -> List[Dict]:
+        """取得指定 session_ids 的所有對話紀錄；指定 mode 時只回傳該模式的紀錄"""
         if not session_ids:
             return []
 
@@ -288,11 +359,13 @@ class ConversationLogger:
                 with open(log_file, "r", encoding="utf-8") as f:
                     for line in f:
                         if line.strip():
-                            doc = json.loads(line)
-                            if doc.get("session_id") in sid_set:
+                            doc = _loads_line(line)
+                            if doc.get("session_id") in sid_set and (
+                                mode is None or doc.get("mode") == mode
+                            ):
                                 logs.append(doc)
         except Exception as e:
-            logger.error(f"Failed to get logs for sessions: {e}")
+            logger.error("Failed to get logs for sessions: %s", e)
         return sorted(logs, key=lambda x: (x.get("session_id", ""), x.get("turn_number", 0)))
 
     def get_session_summaries(
@@ -304,32 +377,47 @@ class ConversationLogger:
         if not session_ids:
             return []
 
-        logs = [
-            doc
-            for doc in self.get_logs_for_sessions(session_ids)
-            if self._matches_query(doc, query or {})
-        ]
-        summaries: dict[str, dict] = {}
-        for doc in sorted(logs, key=lambda item: (item.get("session_id", ""), item.get("turn_number", 0), item.get("timestamp", ""))):
+        # 單次掃描、每個 session 只留幾個欄位的累加器，不必先排序整批紀錄。
+        accumulators: dict[str, _SessionSummaryAcc] = {}
+        for doc in self.get_logs_for_sessions(session_ids):
             sid = doc.get("session_id")
-            if not sid:
+            if not sid or not self._matches_query(doc, query or {}):
                 continue
+            order_key = (doc.get("turn_number", 0), doc.get("timestamp", ""))
             ts = doc.get("timestamp")
             language = doc.get("session_snapshot", {}).get("language")
-            if sid not in summaries:
-                preview = doc.get("user_message")
-                summaries[sid] = {
-                    "session_id": sid,
-                    "first_message_time": ts,
-                    "last_message_time": ts,
-                    "message_count": 0,
-                    "preview": preview[:100] if isinstance(preview, str) and preview else None,
-                    "language": language or None,
-                }
-            if ts and (not summaries[sid]["last_message_time"] or ts > summaries[sid]["last_message_time"]):
-                summaries[sid]["last_message_time"] = ts
-            if language and not summaries[sid].get("language"):
-                summaries[sid]["language"] = language
-            summaries[sid]["message_count"] += 1
-
-        return [summaries[sid] for sid in session_ids if sid in summaries]
+            acc = accumulators.get(sid)
+            if acc is None:
+                accumulators[sid] = _SessionSummaryAcc(
+                    first_key=order_key,
+                    first_doc=doc,
+                    last_ts=ts or None,
+                    count=1,
+                    language_key=order_key,
+                    language=language or None,
+                )
+                continue
+            if order_key < acc.first_key:
+                acc.first_key, acc.first_doc = order_key, doc
+            if ts and (not acc.last_ts or ts > acc.last_ts):
+                acc.last_ts = ts
+            acc.count += 1
+            if language and (not acc.language or order_key < acc.language_key):
+                acc.language_key, acc.language = order_key, language
+
+        summaries = []
+        for sid in session_ids:
+            acc = accumulators.get(sid)
+            if acc is None:
+                continue
+            first_ts = acc.first_doc.get("timestamp")
+            preview = acc.first_doc.get("user_message")
+            summaries.append({
+                "session_id": sid,
+                "first_message_time": first_ts,
+                "last_message_time": acc.last_ts or first_ts,
+                "message_count": acc.count,
+                "preview": preview[:100] if isinstance(preview, str) and preview else None,
+                "language": acc.language,
+            })
+        return summaries
@@ -15,6 +15,17 @@ from app.services.mongo_client import get_mongo_db
 
 logger = logging.getLogger(__name__)
 
+# 匯出需要的欄位（ConversationItem 契約 + citations / image_id / store_name）
+EXPORT_LOG_PROJECTION = {
+    field: 1
+    for field in (
+        "session_id", "mode", "turn_number", "timestamp", "responded_at",
+        "user_message", "agent_response", "tool_calls", "session_snapshot",
+        "error", "citations", "image_id", "store_name",
+    )
+}
+EXPORT_FETCH_BATCH_SIZE = 200
+
 
 class MongoConversationLogger:
     """MongoDB 對話日誌記錄器"""
@@ -63,6 +74,7 @@ class MongoConversationLogger:
         citations: Optional[List[Dict]] = None,
         image_id: Optional[str] = None,
         store_name: Optional[str] = None,
+        turn_number: Optional[int] = None,
     ) -> Optional[str]:
         """記錄一次對話
 
@@ -74,6 +86,7 @@ class MongoConversationLogger:
             session_state: Session 狀態快照
             error: 錯誤訊息（如果有）
             mode: 模式 ("jti" / "general" / "hciot")
+            turn_number: 已知輪次時直接使用（省一次查詢最大輪次）
 
         Returns:
             (document_id, turn_number) 的 tuple，若失敗返回 None
@@ -82,20 +95,22 @@ class MongoConversationLogger:
             raise ValueError("mode is required")
 
         try:
-            # 獲取該 session 現有的對話輪次
-            last_turn = self.conversations_collection.find_one(
-                {"session_id": session_id},
-                sort=[("turn_number", -1)]
-            )
-            turn_number = (last_turn["turn_number"] + 1) if last_turn else 1
-
-            # 構建日誌記錄
+            if turn_number is None:
+                # 獲取該 session 現有的對話輪次
+                last_turn = self.conversations_collection.find_one(
+                    {"session_id": session_id},
+                    sort=[("turn_number", -1)]
+                )
+                turn_number = (last_turn["turn_number"] + 1) if last_turn else 1
+
+            # 構建日誌記錄（同一筆紀錄共用一次取得的時間）
+            now = datetime.now()
             log_entry = {
                 "session_id": session_id,
                 "mode": mode,
                 "turn_number": turn_number,
-                "timestamp": datetime.now(),
-                "responded_at": responded_at or datetime.now(),
+                "timestamp": now,
+                "responded_at": responded_at or now,
                 "user_message": user_message,
                 "agent_response": agent_response,
                 "tool_calls": tool_calls or [],
@@ -120,25 +135,29 @@ class MongoConversationLogger:
             return (str(result.inserted_id), turn_number)
 
         except Exception as e:
-            logger.error(f"Failed to log conversation to MongoDB: {e}")
+            logger.error("Failed to log conversation to MongoDB: %s", e)
             return None
 
     def get_session_logs(
         self,
         session_id: str,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        mode: Optional[str] = None,
     ) -> List[Dict]:
         """取得特定 session 的所有日誌
 
         Args:
             session_id: Session ID
             limit: 最多返回筆數（None = 全部）
+            mode: 只取指定模式的日誌（None = 全部）
 
         Returns:
             日誌記錄列表
         """
         try:
             query = {"session_id": session_id}
+            if mode is not None:
+                query["mode"] = mode
 
             cursor = self.conversations_collection.find(query).sort("turn_number", 1)
             if limit:
@@ -147,7 +166,7 @@ class MongoConversationLogger:
             return self._serialize_docs(list(cursor))
 
         except Exception as e:
-            logger.error(f"Failed to get session logs from MongoDB: {e}")
+            logger.error("Failed to get session logs from MongoDB: %s", e)
             return []
 
     def get_session_logs_by_mode(self, mode: str) -> List[Dict]:
@@ -167,9 +186,53 @@ class MongoConversationLogger:
             return self._serialize_docs(docs)
 
         except Exception as e:
-            logger.error(f"Failed to get logs by mode: {e}")
+            logger.error("Failed to get logs by mode: %s", e)
             return []
 
+    def get_grouped_session_logs_by_mode(self, mode: str, limit: Optional[int] = None) -> List[Dict]:
+        """按模式取得依 session 分組的對話紀錄
+
+        回傳格式同 app.utils.group_conversations_by_session：每個 session 含
+        session_id / conversations（turn_number 升序）/ first_message_time / total，
+        並依 first_message_time 倒序；limit 限制回傳的 session 數。
+
+        aggregation 只算每個 session 的 first_message_time / total（不 $push 整份紀錄，
+        長 session 不會撞到單一文件 16 MB 上限），再分批以 find + projection 撈對話。
+        失敗直接拋出，由 router 回 500，避免回傳空的匯出檔。
+        """
+        pipeline: List[Dict[str, Any]] = [
+            {"$match": {"mode": mode}},
+            {
+                "$group": {
+                    "_id": "$session_id",
+                    "first_message_time": {"$min": "$timestamp"},
+                    "total": {"$sum": 1},
+                }
+            },
+            {"$sort": {"first_message_time": -1, "_id": -1}},
+        ]
+        if limit is not None:
+            pipeline.append({"$limit": limit})
+
+        sessions: Dict[str, Dict] = {}
+        for doc in self.conversations_collection.aggregate(pipeline, allowDiskUse=True):
+            sessions[doc["_id"]] = {
+                "session_id": doc["_id"],
+                "conversations": [],
+                "first_message_time": self._serialize_datetime(doc.get("first_message_time")),
+                "total": doc.get("total", 0),
+            }
+
+        session_ids = list(sessions)
+        for start in range(0, len(session_ids), EXPORT_FETCH_BATCH_SIZE):
+            cursor = self.conversations_collection.find(
+                {"mode": mode, "session_id": {"$in": session_ids[start:start + EXPORT_FETCH_BATCH_SIZE]}},
+                EXPORT_LOG_PROJECTION,
+            ).sort([("session_id", 1), ("turn_number", 1), ("timestamp", 1)])
+            for doc in cursor:
+                sessions[doc["session_id"]]["conversations"].append(self._serialize_doc(doc))
+        return list(sessions.values())
+
     def list_sessions(self) -> List[str]:
         """列出所有有對話紀錄的 session
 
@@ -186,7 +249,7 @@ class MongoConversationLogger:
             return sessions
 
         except Exception as e:
-            logger.error(f"Failed to list sessions: {e}")
+            logger.error("Failed to list sessions: %s", e)
             return []
 
     def get_paginated_session_ids(
@@ -235,24 +298,111 @@ class MongoConversationLogger:
             return session_ids, total_sessions
 
         except Exception as e:
-            logger.error(f"Failed to get paginated session ids: {e}")
+            logger.error("Failed to get paginated session ids: %s", e)
             return [], 0
 
-    def get_logs_for_sessions(self, session_ids: List[str]) -> List[Dict]:
-        """取得指定 session_ids 的所有對話紀錄"""
+    def get_session_ids_after(
+        self,
+        query: Dict[str, Any],
+        after: Optional[tuple[str, str]] = None,
+        page_size: int = 10,
+    ) -> tuple[List[str], Optional[tuple[str, str]]]:
+        """以游標取得下一頁 session_ids（最後活動時間倒序）
+
+        與 get_paginated_session_ids 同序，但不 $group 整個 query 範圍：沿
+        (mode, timestamp) 索引由游標時間往舊的方向掃紀錄，每個 session 第一次
+        出現時的 timestamp 即其游標以前的最後活動時間；若該 session 在游標之後
+        還有紀錄（已在前頁出現），以一次 find_one 排除。湊滿一頁（多一筆判斷
+        下一頁）且後續紀錄時間已早於最後一筆即停止，掃描量只與這一頁的時間窗有關。
+
+        Args:
+            query: MongoDB 查詢條件
+            after: 上一頁最後一筆的 (last_active ISO 字串, session_id)；None 為第一頁
+            page_size: 每頁數量
+
+        Returns:
+            (session_ids, next_after)；沒有下一頁時 next_after 為 None
+        """
+        try:
+            walk_query = query
+            cursor_time = cursor_id = None
+            if after is not None:
+                cursor_time, cursor_id = datetime.fromisoformat(after[0]), after[1]
+                walk_query = {"$and": [query, {"timestamp": {"$lte": cursor_time}}]}
+
+            seen: set = set()
+            found: List[tuple] = []
+            logs = self.conversations_collection.find(
+                walk_query, {"_id": 0, "session_id": 1, "timestamp": 1}
+            ).sort("timestamp", -1)
+            for log in logs:
+                session_id, timestamp = log["session_id"], log["timestamp"]
+                # 已湊滿且時間早於最後一筆：之後不可能再有同時間的 session
+                if len(found) > page_size and timestamp < found[-1][0]:
+                    break
+                if session_id in seen:
+                    continue
+                seen.add(session_id)
+                if cursor_time is not None:
+                    if timestamp == cursor_time and session_id >= cursor_id:
+                        continue
+                    newer = self.conversations_collection.find_one(
+                        {"$and": [query, {"session_id": session_id, "timestamp": {"$gt": cursor_time}}]},
+                        {"_id": 1},
+                    )
+                    if newer is not None:
+                        continue
+                found.append((timestamp, session_id))
+
+            # 同時間依 session_id 倒序，多取一筆判斷是否還有下一頁
+            found.sort(reverse=True)
+            page = found[:page_size]
+            session_ids = [session_id for _, session_id in page]
+            next_after = None
+            if len(found) > page_size:
+                last_active, last_id = page[-1]
+                next_after = (self._serialize_datetime(last_active), last_id)
+
+            return session_ids, next_after
+
+        except Exception as e:
+            logger.error("Failed to get session ids after cursor: %s", e)
+            return [], None
+
+    def get_export_session_ids(self, query: Dict[str, Any]) -> List[str]:
+        """取得符合條件的全部 session_ids（首則訊息時間倒序，同時間依 session_id 倒序）
+
+        串流匯出開始前取一次作為快照，之後依快照分批撈紀錄；匯出期間有 session
+        新增對話也不會被跳過或重複輸出。失敗直接拋出，由 router 回 500。
+        """
+        pipeline = [
+            {"$match": query},
+            {"$group": {"_id": "$session_id", "first_message_time": {"$min": "$timestamp"}}},
+            {"$sort": {"first_message_time": -1, "_id": -1}},
+            {"$project": {"_id": 1}},
+        ]
+        return [doc["_id"] for doc in self.conversations_collection.aggregate(pipeline, allowDiskUse=True)]
+
+    def get_logs_for_sessions(
+        self,
+        session_ids: List[str],
+        mode: Optional[str] = None,
+    ) -> List[Dict]:
+        """取得指定 session_ids 的所有對話紀錄；指定 mode 時只回傳該模式的紀錄"""
         if not session_ids:
             return []
 
         try:
+            query: Dict[str, Any] = {"session_id": {"$in": session_ids}}
+            if mode is not None:
+                query["mode"] = mode
             docs = list(
-                self.conversations_collection.find(
-                    {"session_id": {"$in": session_ids}}
-                ).sort("turn_number", 1)
+                self.conversations_collection.find(query).sort("turn_number", 1)
             )
             return self._serialize_docs(docs)
 
         except Exception as e:
-            logger.error(f"Failed to get logs for sessions: {e}")
+            logger.error("Failed to get logs for sessions: %s", e)
             return []
 
     def get_session_summaries(
@@ -297,7 +447,7 @@ class MongoConversationLogger:
             return [summaries_by_id[sid] for sid in session_ids if sid in summaries_by_id]
 
         except Exception as e:
-            logger.error(f"Failed to get session summaries: {e}")
+            logger.error("Failed to get session summaries: %s", e)
             return []
 
     def get_statistics(self) -> Dict[str, Any]:
@@ -341,7 +491,7 @@ class MongoConversationLogger:
             }
 
         except Exception as e:
-            logger.error(f"Failed to get statistics: {e}")
+            logger.error("Failed to get statistics: %s", e)
             return {}
 
     def get_conversations_by_date_range(
@@ -378,7 +528,7 @@ class MongoConversationLogger:
             return self._serialize_docs(docs)
 
         except Exception as e:
-            logger.error(f"Failed to get conversations by date range: {e}")
+            logger.error("Failed to get conversations by date range: %s", e)
             return []
 
     def get_tool_call_statistics(self) -> Dict[str, Any]:
@@ -413,7 +563,7 @@ class MongoConversationLogger:
             }
 
         except Exception as e:
-            logger.error(f"Failed to get tool call statistics: {e}")
+            logger.error("Failed to get tool call statistics: %s", e)
             return {}
 
     def delete_turns_from(self, session_id: str, from_turn_number: int) -> int:
@@ -438,9 +588,22 @@ class MongoConversationLogger:
             )
             return deleted_count
         except Exception as e:
-            logger.error(f"Failed to delete turns from session {session_id}: {e}")
+            logger.error("Failed to delete turns from session %s: %s", session_id, e)
             return 0
 
+    def replace_turns_from(self, session_id: str, from_turn_number: int, **log_kwargs) -> Optional[tuple]:
+        """重新生成：刪除 from_turn_number 起的紀錄並寫入新的一輪
+
+        輪次只會從尾端截斷，有刪到紀錄時新一輪必為 from_turn_number，
+        可省去 log_conversation 再查一次最大輪次。
+        """
+        deleted_count = self.delete_turns_from(session_id, from_turn_number)
+        return self.log_conversation(
+            session_id=session_id,
+            turn_number=from_turn_number if deleted_count else None,
+            **log_kwargs,
+        )
+
     def get_turn(self, session_id: str, turn_number: int) -> Optional[Dict]:
         """取得指定 session 的特定輪次紀錄
 
@@ -460,7 +623,7 @@ class MongoConversationLogger:
                 self._serialize_doc(doc)
             return doc
         except Exception as e:
-            logger.error(f"Failed to get turn {turn_number} for session {session_id}: {e}")
+            logger.error("Failed to get turn %s for session %s: %s", turn_number, session_id, e)
             return None
 
     def delete_session_logs(self, session_id: str) -> int:
@@ -477,11 +640,11 @@ class MongoConversationLogger:
                 "session_id": session_id
             })
             deleted_count = result.deleted_count
-            logger.info(f"Deleted {deleted_count} conversation logs for session {session_id[:8]}...")
+            logger.info("Deleted %s conversation logs for session %.8s...", deleted_count, session_id)
             return deleted_count
 
         except Exception as e:
-            logger.error(f"Failed to delete session logs: {e}")
+            logger.error("Failed to delete session logs: %s", e)
             return 0
 
     def delete_old_logs(self, days: int = 30) -> int:
@@ -500,9 +663,9 @@ class MongoConversationLogger:
             })
 
             deleted_count = result.deleted_count
-            logger.info(f"Deleted {deleted_count} old conversation logs")
+            logger.info("Deleted %s old conversation logs", deleted_count)
             return deleted_count
 
         except Exception as e:
-            logger.error(f"Failed to delete old logs: {e}")
+            logger.error("Failed to delete old logs: %s", e)
             return 0
@@ -176,7 +176,7 @@ class BackfillService:
         try:
             topic = get_hciot_topic_store(language).get_topic(topic_id)
         except Exception as e:
-            logger.warning(f"[Backfill] Failed to load HCIoT topic labels for {topic_id}/{language}: {e}")
+            logger.warning("[Backfill] Failed to load HCIoT topic labels for %s/%s: %s", topic_id, language, e)
             return topic_info
 
         if not topic:
@@ -296,10 +296,10 @@ class BackfillService:
         try:
             items = list(self._get_files_and_data(source_type, language))
         except Exception as e:
-            logger.error(f"[Backfill] Failed to list files for {source_type}/{language}: {e}")
+            logger.error("[Backfill] Failed to list files for %s/%s: %s", source_type, language, e)
             return
 
-        logger.debug(f"[Backfill] Scanning {len(items)} files in {source_type}/{language}...")
+        logger.debug("[Backfill] Scanning %d files in %s/%s...", len(items), source_type, language)
 
         # Batch-fetch existing fingerprints once so unchanged files skip via an
         # in-memory check rather than a per-file LanceDB query (the dominant
@@ -333,7 +333,7 @@ class BackfillService:
         try:
             indexed = self.lancedb_store.list_file_ids(full_source_type, language)
         except Exception as e:
-            logger.error(f"[Backfill] Failed to list file ids from LanceDB for test pruning: {e}")
+            logger.error("[Backfill] Failed to list file ids from LanceDB for test pruning: %s", e)
             indexed = set()
 
         test_orphans = {
@@ -342,7 +342,7 @@ class BackfillService:
         }
 
         if test_orphans:
-            logger.info(f"[Backfill] Proactively pruning {len(test_orphans)} test/qa orphans in {source_type}/{language}")
+            logger.info("[Backfill] Proactively pruning %d test/qa orphans in %s/%s", len(test_orphans), source_type, language)
             for orphan in test_orphans:
                 self.delete_from_rag(source_type, orphan, language=language)
 
@@ -354,7 +354,7 @@ class BackfillService:
         orphans = indexed - live_files
         if not orphans:
             return
-        logger.info(f"[Backfill] Pruning {len(orphans)} orphan file_ids in {source_type}/{language}")
+        logger.info("[Backfill] Pruning %d orphan file_ids in %s/%s", len(orphans), source_type, language)
         for orphan in orphans:
             self.delete_from_rag(source_type, orphan, language=language)
 
@@ -364,8 +364,8 @@ class BackfillService:
         try:
             self.lancedb_store.delete_by_file(filename, full_source_type, source_language=language)
         except Exception as e:
-            logger.error(f"[RAG] Failed to delete {filename} from LanceDB: {e}")
-        logger.info(f"[RAG] Removed {filename} from {full_source_type}")
+            logger.error("[RAG] Failed to delete %s from LanceDB: %s", filename, e)
+        logger.info("[RAG] Removed %s from %s", filename, full_source_type)
 
     def index_single_file(
         self,
@@ -393,7 +393,7 @@ class BackfillService:
         # stale/missing entry here only costs a lock+query, never correctness.
         if not force and known_fingerprints is not None:
             if known_fingerprints.get(filename) == fingerprint:
-                logger.debug(f"[RAG] Skipping {filename} (fingerprint unchanged, batch)")
+                logger.debug("[RAG] Skipping %s (fingerprint unchanged, batch)", filename)
                 return
 
         # Serialize per (file, source_type, language) so concurrent callers
@@ -405,7 +405,7 @@ class BackfillService:
             if not force:
                 existing_fp = self.lancedb_store.get_file_fingerprint(filename, full_source_type, language)
                 if existing_fp == fingerprint:
-                    logger.debug(f"[RAG] Skipping {filename} (fingerprint unchanged)")
+                    logger.debug("[RAG] Skipping %s (fingerprint unchanged)", filename)
                     return
 
             self._index_single_file_locked(
@@ -487,9 +487,9 @@ class BackfillService:
                 filename, full_source_type, language, records
             )
             
-            logger.debug(f"[RAG] Indexed {filename} ({len(records)} chunks)")
+            logger.debug("[RAG] Indexed %s (%d chunks)", filename, len(records))
         except Exception as e:
-            logger.error(f"[RAG] Failed to index {filename}: {e}")
+            logger.error("[RAG] Failed to index %s: %s", filename, e)
 
 
 _backfill_service: Optional[BackfillService] = None
@@ -8,6 +8,9 @@ logger = logging.getLogger(__name__)
 # Chinese: ~1 char ≈ 1 token; English: ~4 chars ≈ 1 token
 _CJK_RANGE = re.compile(r'[\u4e00-\u9fff\u3400-\u4dbf]')
 
+_WHITESPACE_RUN = re.compile(r'\s+')
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[。！？；.!?;])\s*')
+
 
 def _estimate_tokens(text: str) -> int:
     """Estimate token count for mixed Chinese/English text.
@@ -42,10 +45,10 @@ class SemanticChunker:
             return []
 
         # Normalize whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _WHITESPACE_RUN.sub(' ', text).strip()
 
         # Split into sentences (supports Chinese and English punctuation)
-        sentences = re.split(r'(?<=[。！？；.!?;])\s*', text)
+        sentences = _SENTENCE_BOUNDARY.split(text)
         sentences = [s.strip() for s in sentences if s.strip()]
 
         chunks: List[str] = []
@@ -59,7 +59,7 @@ class RAGPipeline:
                 t0,
             )
         except Exception as e:
-            logger.error(f"[RAG Pipeline] Retrieval failed: {e}")
+            logger.error("[RAG Pipeline] Retrieval failed: %s", e)
             return None, None
 
     def _search_and_format(
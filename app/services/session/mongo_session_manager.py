@@ -7,7 +7,6 @@ MongoDB Session 管理服務
 3. 支持查詢和分析
 """
 
-import json
 import logging
 import os
 from datetime import datetime
@@ -184,7 +183,7 @@ def _resolve_rebuilt_current_question(
         if not selected_questions
         else f"selected_questions ({len(selected_questions)}) < current_q_index ({current_q_index})"
     )
-    logger.warning(f"Rebuilding session {session_id[:8]}...: {reason}, degrading to WELCOME")
+    logger.warning("Rebuilding session %.8s...: %s, degrading to WELCOME", session_id, reason)
     return "WELCOME", None
 
 
@@ -234,10 +233,8 @@ class MongoSessionManager(SessionStateMixin):
             cached = self.cache.get(key)
             if not cached:
                 return None
-            if isinstance(cached, bytes):
-                cached = cached.decode("utf-8")
-            payload = json.loads(cached)
-            return Session(**payload)
+            # Pydantic 直接解析 JSON（bytes/str 皆可），不經中介 dict
+            return Session.model_validate_json(cached)
         except Exception as exc:
             logger.warning("Ignoring invalid Redis session cache for %s: %s", session_id, exc)
             try:
@@ -257,7 +254,7 @@ class MongoSessionManager(SessionStateMixin):
                 else compute_expires_at(session.step, datetime.now())
             )
             ttl = _cache_ttl_seconds(expiry)
-            payload = json.dumps(session.model_dump(mode="json"), ensure_ascii=False)
+            payload = session.model_dump_json()
             self.cache.set(self._cache_key(session.session_id), payload, ex=ttl)
         except Exception as exc:
             logger.warning(
@@ -284,7 +281,7 @@ class MongoSessionManager(SessionStateMixin):
         """
         session = Session(language=language)
         self._upsert_session(session)
-        logger.info(f"Created session (persisted): {session.session_id}")
+        logger.info("Created session (persisted): %s", session.session_id)
         return session
 
     def _upsert_session(self, session: Session) -> None:
@@ -304,16 +301,60 @@ class MongoSessionManager(SessionStateMixin):
 
             doc = self.sessions_collection.find_one({"session_id": session_id})
             if doc is None:
-                logger.warning(f"Session not found in MongoDB: {session_id}")
+                logger.warning("Session not found in MongoDB: %s", session_id)
                 return None
             session = self._doc_to_session(doc)
             if session is not None:
                 self._cache_set(session, doc.get("expires_at"))
             return session
         except Exception as e:
-            logger.error(f"Failed to get session from MongoDB: {e}")
+            logger.error("Failed to get session from MongoDB: %s", e)
             return None
 
+    def _cache_get_many(self, session_ids: List[str]) -> Dict[str, Session]:
+        """以單次 MGET 批次讀 Redis 快取；壞掉的項目視為 miss。"""
+        if self.cache is None or not session_ids:
+            return {}
+
+        try:
+            payloads = self.cache.mget([self._cache_key(sid) for sid in session_ids])
+        except Exception as exc:
+            logger.warning("Failed to batch-read Redis session cache: %s", exc)
+            return {}
+
+        sessions: Dict[str, Session] = {}
+        for session_id, cached in zip(session_ids, payloads):
+            if not cached:
+                continue
+            try:
+                sessions[session_id] = Session.model_validate_json(cached)
+            except Exception as exc:
+                logger.warning("Ignoring invalid Redis session cache for %s: %s", session_id, exc)
+        return sessions
+
+    def get_sessions(self, session_ids: List[str]) -> Dict[str, Session]:
+        """批次取得 sessions：一次 Redis MGET + 一次 `$in` 查詢補 miss。
+
+        找不到的 session_id 不會出現在回傳 dict 中。
+        """
+        unique_ids = list(dict.fromkeys(sid for sid in session_ids if sid))
+        sessions = self._cache_get_many(unique_ids)
+        missing = [sid for sid in unique_ids if sid not in sessions]
+        if not missing:
+            return sessions
+
+        try:
+            docs = self.sessions_collection.find({"session_id": {"$in": missing}})
+            for doc in docs:
+                session = self._doc_to_session(doc)
+                if session is None:
+                    continue
+                sessions[session.session_id] = session
+                self._cache_set(session, doc.get("expires_at"))
+        except Exception as e:
+            logger.error("Failed to get sessions from MongoDB: %s", e)
+        return sessions
+
     def update_session(self, session: Session) -> Session:
         """Update session in MongoDB.
 
@@ -323,10 +364,10 @@ class MongoSessionManager(SessionStateMixin):
         try:
             session.update_timestamp()
             self._upsert_session(session)
-            logger.info(f"Updated session: {session.session_id}, step={session.step.value}")
+            logger.info("Updated session: %s, step=%s", session.session_id, session.step.value)
             return session
         except Exception as e:
-            logger.error(f"Failed to update session: {e}")
+            logger.error("Failed to update session: %s", e)
             raise
 
     def delete_session(self, session_id: str) -> bool:
@@ -336,14 +377,14 @@ class MongoSessionManager(SessionStateMixin):
             self._cache_delete(session_id)
 
             if result.deleted_count > 0:
-                logger.info(f"Deleted session from MongoDB: {session_id}")
+                logger.info("Deleted session from MongoDB: %s", session_id)
                 return True
             else:
-                logger.warning(f"Session not found for deletion: {session_id}")
+                logger.warning("Session not found for deletion: %s", session_id)
                 return False
 
         except Exception as e:
-            logger.error(f"Failed to delete session from MongoDB: {e}")
+            logger.error("Failed to delete session from MongoDB: %s", e)
             return False
 
     def rebuild_session_from_logs(self, session_id: str, logs: List[Dict]) -> Optional[Session]:
@@ -403,7 +444,7 @@ class MongoSessionManager(SessionStateMixin):
             return session
 
         except Exception as e:
-            logger.error(f"Failed to rebuild session from logs: {e}", exc_info=True)
+            logger.error("Failed to rebuild session from logs: %s", e, exc_info=True)
             return None
 
     # === 輔助方法 ===
@@ -421,7 +462,7 @@ class MongoSessionManager(SessionStateMixin):
         try:
             return Session(**cleaned)
         except Exception as e:
-            logger.warning(f"Failed to parse session: {e}")
+            logger.warning("Failed to parse session: %s", e)
             return None
 
     def _find_sessions(self, query: dict) -> List[Session]:
@@ -430,7 +471,7 @@ class MongoSessionManager(SessionStateMixin):
             docs = self.sessions_collection.find(query)
             return [s for doc in docs if (s := self._doc_to_session(doc))]
         except Exception as e:
-            logger.error(f"Failed to find sessions: {e}")
+            logger.error("Failed to find sessions: %s", e)
             return []
 
     def get_all_sessions(self) -> List[Session]:
@@ -480,5 +521,5 @@ class MongoSessionManager(SessionStateMixin):
             }
 
         except Exception as e:
-            logger.error(f"Failed to get statistics: {e}")
+            logger.error("Failed to get statistics: %s", e)
             return {}
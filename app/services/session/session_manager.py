@@ -26,7 +26,7 @@ class SessionManager(SessionStateMixin):
         """建立新 session"""
         session = Session(language=language)
         self._sessions[session.session_id] = session
-        logger.info(f"Created session: {session.session_id} (language={language})")
+        logger.info("Created session: %s (language=%s)", session.session_id, language)
         return session
 
     def get_session(self, session_id: str) -> Optional[Session]:
@@ -34,14 +34,22 @@ class SessionManager(SessionStateMixin):
         session = self._sessions.get(session_id)
         if session is not None:
             return session
-        logger.warning(f"Session not found: {session_id}")
+        logger.warning("Session not found: %s", session_id)
         return None
 
+    def get_sessions(self, session_ids: List[str]) -> Dict[str, Session]:
+        """批次取得 sessions；找不到的 session_id 不會出現在回傳 dict 中。"""
+        return {
+            session_id: session
+            for session_id in session_ids
+            if (session := self._sessions.get(session_id)) is not None
+        }
+
     def update_session(self, session: Session) -> Session:
         """更新 session"""
         session.update_timestamp()
         self._sessions[session.session_id] = session
-        logger.info(f"Updated session: {session.session_id}, step={session.step}")
+        logger.info("Updated session: %s, step=%s", session.session_id, session.step)
         return session
 
     def delete_session(self, session_id: str) -> bool:
@@ -49,7 +57,7 @@ class SessionManager(SessionStateMixin):
         session = self._sessions.pop(session_id, None)
         if session is None:
             return False
-        logger.info(f"Deleted session: {session_id}")
+        logger.info("Deleted session: %s", session_id)
         return True
 
     def rebuild_session_from_logs(self, session_id: str, logs: List[Dict]) -> Optional[Session]:
@@ -10,6 +10,7 @@ import time
 import urllib.error
 import urllib.request
 import uuid
+from operator import itemgetter
 from pathlib import Path
 from typing import Any
 
@@ -200,6 +201,6 @@ class TtsJobManager:
                 self._remove_job_files(job_id)
 
         if len(live_jobs) > self.max_jobs:
-            live_jobs.sort(key=lambda x: x[1])
+            live_jobs.sort(key=itemgetter(1))
             for job_id, _ in live_jobs[: len(live_jobs) - self.max_jobs]:
                 self._remove_job_files(job_id)
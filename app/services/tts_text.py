@@ -5,6 +5,7 @@ from __future__ import annotations
 import logging
 import os
 import re
+from functools import lru_cache
 from typing import Optional
 
 try:
@@ -37,6 +38,7 @@ _HOTLINE_PATTERN = re.compile(
 )
 _LIANG_PATTERN = re.compile(r"二([百千萬億])")
 _PHONE_PATTERN = re.compile(r"\(?\d+\)?[\-\s]?\d[\d\-\s]{4,}\d")
+_NON_DIGIT_PATTERN = re.compile(r"[^\d]")
 _YEAR_PATTERN = re.compile(r"(\d{4})年")
 _MIN_DIGITS = 3
 
@@ -50,6 +52,12 @@ def _to_simplified_chinese(text: str) -> str:
     return text
 
 
+@lru_cache(maxsize=1)
+def _normalize_client():
+    """Keep-alive client reused across normalize API calls."""
+    return _httpx.Client(timeout=5.0)
+
+
 def _normalize_via_api(text: str) -> Optional[str]:
     """Call the normalize API and return the simplified (digits+opencc) result.
 
@@ -59,10 +67,9 @@ def _normalize_via_api(text: str) -> Optional[str]:
     if not _NORMALIZE_API_URL or not _httpx:
         return None
     try:
-        response = _httpx.post(
+        response = _normalize_client().post(
             _NORMALIZE_API_URL,
             json={"text": text},
-            timeout=5.0,
         )
         response.raise_for_status()
         result = response.json().get("simplified")
@@ -156,7 +163,7 @@ def _replace_digit(match: re.Match) -> str:
 
 def _phone_to_digits(match: re.Match) -> str:
     """將電話號碼轉成逐位念法，例如 02-1234-5678 → 零二一二三四五六七八。"""
-    digits_only = re.sub(r"[^\d]", "", match.group())
+    digits_only = _NON_DIGIT_PATTERN.sub("", match.group())
     return "".join(_DIGIT_MAP[int(d)] for d in digits_only)
 
 
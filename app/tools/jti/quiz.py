@@ -94,7 +94,7 @@ def generate_random_quiz(language: str = "zh", store_name: str = JTI_STORE_NAME)
         return selected
 
     except Exception as e:
-        logger.error(f"Failed to generate random quiz: {e}")
+        logger.error("Failed to generate random quiz: %s", e)
         raise
 
 
@@ -109,10 +109,10 @@ def generate_quiz(language: str = "zh", store_name: str = JTI_STORE_NAME) -> Dic
             "total_questions": len(questions),
             "questions": questions,
         }
-        logger.info(f"Generated quiz ({store_name}, {language}), {len(questions)} questions")
+        logger.info("Generated quiz (%s, %s), %d questions", store_name, language, len(questions))
         return result
     except Exception as e:
-        logger.error(f"Failed to generate quiz: {e}")
+        logger.error("Failed to generate quiz: %s", e)
         raise
 
 
@@ -132,7 +132,7 @@ def get_question_from_selected(selected_questions: List[Dict], question_index: i
             return None
         return selected_questions[question_index]
     except Exception as e:
-        logger.error(f"Failed to get question from selected: {e}")
+        logger.error("Failed to get question from selected: %s", e)
         return None
 
 
@@ -182,7 +182,7 @@ def complete_selected_questions(
         return completed
 
     except Exception as e:
-        logger.error(f"Failed to complete selected questions: {e}")
+        logger.error("Failed to complete selected questions: %s", e)
         return selected_questions
 
 
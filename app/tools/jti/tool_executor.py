@@ -8,6 +8,11 @@ from typing import Dict, Any, Optional
 import logging
 from google.genai import types
 import app.deps as deps
+from app.services.general.quiz_response import (
+    OPTION_LABELS,
+    SEQUENCE_TO_INDEX,
+    format_option_texts,
+)
 from app.services.general.tts import get_managed_tts_job_manager
 from app.tools.jti.quiz import (
     generate_quiz,
@@ -38,31 +43,26 @@ class ToolExecutor:
     async def execute(self, tool_name: str, arguments: Dict[str, Any]) -> Dict:
         """執行 tool"""
         if tool_name not in self.tool_map:
-            logger.error(f"Unknown tool: {tool_name}")
+            logger.error("Unknown tool: %s", tool_name)
             return {"error": f"Unknown tool: {tool_name}"}
 
         try:
-            logger.info(f"Executing tool: {tool_name}, args: {arguments}")
+            logger.info("Executing tool: %s, args: %s", tool_name, arguments)
             result = await self.tool_map[tool_name](arguments)
-            logger.info(f"Tool result: {tool_name} -> success")
+            logger.info("Tool result: %s -> success", tool_name)
             return result
 
         except Exception as e:
-            logger.error(f"Tool execution failed: {tool_name}, error: {e}")
+            logger.error("Tool execution failed: %s, error: %s", tool_name, e)
             return {"error": str(e)}
 
     @staticmethod
     def _get_option_labels(options: list) -> list:
-        labels = "ABCDE"
-        return list(labels[: len(options)])
+        return list(OPTION_LABELS[: len(options)])
 
     @staticmethod
     def _format_options(options: list) -> str:
-        labels = ToolExecutor._get_option_labels(options)
-        return "\n".join(
-            f"{labels[i]}. {opt.get('text', '')}"
-            for i, opt in enumerate(options)
-        )
+        return format_option_texts(options)
 
     @staticmethod
     def _truncate_text(text: str, limit: int = 200) -> str:
@@ -99,15 +99,9 @@ class ToolExecutor:
         if normalized in labels:
             return options[labels.index(normalized)].get("id")
 
-        number_map = {
-            "1": 0, "一": 0, "第一": 0,
-            "2": 1, "二": 1, "第二": 1,
-            "3": 2, "三": 2, "第三": 2,
-            "4": 3, "四": 3, "第四": 3,
-            "5": 4, "五": 4, "第五": 4,
-        }
-        if normalized in number_map and number_map[normalized] < len(options):
-            return options[number_map[normalized]].get("id")
+        idx = SEQUENCE_TO_INDEX.get(normalized)
+        if idx is not None and idx < len(options):
+            return options[idx].get("id")
 
         if normalized.isdigit():
             idx = int(normalized) - 1
@@ -218,7 +212,7 @@ class ToolExecutor:
         question = selected_questions[0]
 
         # 保存當前題目到 session
-        session_manager.set_current_question(session_id, question)
+        updated_session = session_manager.set_current_question(session_id, question)
 
         # 根據語言生成訊息
         message = f"\n{self._format_question_text(question, 1, language)}"
@@ -228,7 +222,9 @@ class ToolExecutor:
             "message": message,
             "current_question": question,
             "total_questions": total_questions,
-            "progress": 0
+            "progress": 0,
+            # 呼叫端直接沿用寫入後的 session，免再查一次
+            "_updated_session": updated_session,
         }
 
     async def _execute_get_question(self, args: Dict) -> Dict:
@@ -311,7 +307,7 @@ class ToolExecutor:
         total_questions = get_total_questions(session.language, store_name=store_name)
         is_complete = session.is_quiz_complete(total_questions)
 
-        logger.info(f"Answer submitted: Q{question_id}={option_id}, answered={len(session.answers)}/{total_questions}, complete={is_complete}")
+        logger.info("Answer submitted: Q%s=%s, answered=%d/%s, complete=%s", question_id, option_id, len(session.answers), total_questions, is_complete)
 
         result = {
             "success": True,
@@ -406,13 +402,15 @@ Format:
 - 選項前面必須保留字母編號（例如 A. B.），且要和題目提供的一致
 - 不要說「好的，謝謝您的回答」
 - 評論要簡短，不要超過 10 個字"""
-            session_manager.set_current_question(session_id, next_question)
+            updated_session = session_manager.set_current_question(session_id, next_question)
         else:
             # 完成測驗，立即計算測驗結果
             logger.info("測驗完成，自動執行 calculate_quiz_result")
             session_manager.set_current_question(session_id, None)
 
             quiz_result = await self._execute_calculate_quiz_result({"session_id": session_id})
+            # 結果計算會另外寫入 session，需重新讀取
+            updated_session = session_manager.get_session(session_id)
 
             if "error" in quiz_result:
                 result["message"] = f"測驗完成，但計算結果時發生錯誤：{quiz_result['error']}"
@@ -432,7 +430,7 @@ Format:
                         "注意：不要重複任何測驗題目，只需宣布結果。"
                     )
 
-        result["_updated_session"] = session_manager.get_session(session_id)
+        result["_updated_session"] = updated_session
         return result
 
     async def _execute_calculate_quiz_result(self, args: Dict) -> Dict:
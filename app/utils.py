@@ -2,9 +2,41 @@
 共用工具函數
 """
 
+import base64
+import binascii
+import heapq
+import json
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
 from datetime import datetime
 from math import ceil
-from typing import Optional
+from typing import Any, Optional, TypeVar
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from app.schemas.chat import ConversationItem, ConversationSessionGroup, ConversationToolCall
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 是選用加速
+    orjson = None
+
+ExportResponseT = TypeVar("ExportResponseT", bound=BaseModel)
+
+
+class FastJSONResponse(JSONResponse):
+    """以 orjson 序列化的 JSONResponse（未安裝 orjson 時退回標準 json）。
+
+    用於沒有 response_model 的大型 dict/list 回應（如 simple 匯出）；有
+    response_model 的端點 FastAPI 已直接以 Pydantic 序列化，不需要這個類別。
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
 
 
 DEFAULT_HISTORY_PAGE_SIZE = 20
@@ -21,16 +53,73 @@ def normalize_history_pagination(
     return page, page_size
 
 
+def encode_history_cursor(after: tuple[str, str]) -> str:
+    """將 (last_active ISO 字串, session_id) 編成不透明的分頁游標。"""
+    last_active, session_id = after
+    payload = json.dumps({"ts": last_active, "id": session_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_history_cursor(cursor: str) -> Optional[tuple[str, str]]:
+    """解回 encode_history_cursor() 的游標；空字串代表游標分頁的第一頁。
+
+    格式錯誤時丟 HTTPException(400)。
+    """
+    if not cursor:
+        return None
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        last_active, session_id = data["ts"], data["id"]
+        if not isinstance(last_active, str) or not isinstance(session_id, str):
+            raise TypeError("cursor fields must be strings")
+        datetime.fromisoformat(last_active)
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid history cursor") from e
+    return last_active, session_id
+
+
+def load_history_page(
+    conversation_logger,
+    query: dict,
+    *,
+    page: int,
+    page_size: int,
+    cursor: Optional[str] = None,
+) -> tuple[list[dict], Optional[int], Optional[str]]:
+    """取得一頁 session 摘要，回傳 (sessions, total_sessions, next_cursor)。
+
+    cursor 為 None 時走頁碼分頁（含總數）；有給 cursor（空字串為第一頁）時改用
+    get_session_ids_after 的範圍條件，不做 skip 也不算總數，total_sessions 為 None。
+    """
+    if cursor is None:
+        session_ids, total_sessions = conversation_logger.get_paginated_session_ids(
+            query=query, page=page, page_size=page_size
+        )
+        next_cursor = None
+    else:
+        session_ids, next_after = conversation_logger.get_session_ids_after(
+            query, after=decode_history_cursor(cursor), page_size=page_size
+        )
+        total_sessions = None
+        next_cursor = encode_history_cursor(next_after) if next_after else None
+    sessions = conversation_logger.get_session_summaries(session_ids, query=query)
+    return sessions, total_sessions, next_cursor
+
+
 def build_history_summary_response(
     *,
     mode: str,
     sessions: list[dict],
-    total_sessions: int,
-    page: int,
+    total_sessions: Optional[int],
+    page: Optional[int],
     page_size: int,
+    next_cursor: Optional[str] = None,
     extra: Optional[dict] = None,
 ) -> dict:
-    """Build the shared summary-only conversation history list payload."""
+    """Build the shared summary-only conversation history list payload.
+
+    Cursor pages pass total_sessions=None/page=None; total_pages is then omitted too.
+    """
     payload = {
         "mode": mode,
         "sessions": sessions,
@@ -38,8 +127,11 @@ def build_history_summary_response(
         "total_sessions": total_sessions,
         "page": page,
         "page_size": page_size,
-        "total_pages": ceil(total_sessions / page_size) if total_sessions else 0,
+        "total_pages": None,
+        "next_cursor": next_cursor,
     }
+    if total_sessions is not None:
+        payload["total_pages"] = ceil(total_sessions / page_size) if total_sessions else 0
     if extra:
         payload.update(extra)
     return payload
@@ -58,11 +150,14 @@ def export_sessions_by_ids(
     first_message_time desc.
     """
     session_id_list = [sid.strip() for sid in session_ids.split(",") if sid.strip()]
+    # 一次 $in 查詢取回所有 session 的紀錄，再依 session 分組（取代逐一 get_session_logs）
+    logs_by_session: defaultdict[str, list[dict]] = defaultdict(list)
+    for log in logger.get_logs_for_sessions(session_id_list, mode=mode):
+        logs_by_session[log.get("session_id")].append(log)
     sessions: list[dict] = []
     total_conversations = 0
     for session_id in session_id_list:
-        conversations = logger.get_session_logs(session_id)
-        conversations = [c for c in conversations if c.get("mode") == mode]
+        conversations = logs_by_session.get(session_id, [])
         if store_filter is not None:
             conversations = [
                 c for c in conversations
@@ -76,7 +171,7 @@ def export_sessions_by_ids(
                 "total": len(conversations),
             })
             total_conversations += len(conversations)
-    sessions.sort(key=lambda x: x["first_message_time"] or "", reverse=True)
+    sessions.sort(key=_first_message_time_key, reverse=True)
     return sessions, total_conversations
 
 
@@ -100,9 +195,18 @@ def build_date_query(
     return query
 
 
-def group_conversations_by_session(conversations: list) -> list:
+def _conversation_order_key(conversation: dict) -> tuple:
+    return (conversation.get("turn_number") or 0, conversation.get("timestamp") or "")
+
+
+def _first_message_time_key(session: dict) -> str:
+    return session["first_message_time"] or ""
+
+
+def group_conversations_by_session(conversations: list, limit: Optional[int] = None) -> list:
     """
     將對話列表按 session_id 分組，回傳按時間倒序排列的 session 列表。
+    指定 limit 時只回傳最新的 limit 個 session（heap 取 top-K，不排序全部）。
 
     每個 session 包含:
     - session_id: str
@@ -110,31 +214,162 @@ def group_conversations_by_session(conversations: list) -> list:
     - first_message_time: str | None
     - total: int
     """
-    sessions = {}
+    buckets: defaultdict[str, list] = defaultdict(list)
     for conv in conversations:
-        sid = conv.get("session_id")
-        if sid not in sessions:
-            sessions[sid] = {
-                "session_id": sid,
-                "conversations": [],
-                "first_message_time": None,
-                "total": 0
-            }
-        sessions[sid]["conversations"].append(conv)
-        sessions[sid]["total"] += 1
+        buckets[conv.get("session_id")].append(conv)
+
+    session_list = []
+    for sid, session_conversations in buckets.items():
+        # 每個 session 內的對話按 turn_number 升序排列（確保正確時序）
+        session_conversations.sort(key=_conversation_order_key)
+        session_list.append({
+            "session_id": sid,
+            "conversations": session_conversations,
+            # first_message_time 取最早的 timestamp
+            "first_message_time": session_conversations[0].get("timestamp"),
+            "total": len(session_conversations),
+        })
+
+    if limit is not None:
+        return heapq.nlargest(limit, session_list, key=_first_message_time_key)
+    session_list.sort(key=_first_message_time_key, reverse=True)
+    return session_list
+
 
-    # 每個 session 內的對話按 turn_number 升序排列（確保正確時序）
-    for s in sessions.values():
-        s["conversations"].sort(
-            key=lambda c: (c.get("turn_number") or 0, c.get("timestamp") or "")
+def export_sessions_by_mode(
+    conversation_logger,
+    mode: str,
+    session_manager=None,
+    language: Optional[str] = None,
+    limit: Optional[int] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+) -> tuple[list[dict], int]:
+    """匯出指定 mode 的對話，回傳 (grouped sessions, total_conversations)。
+
+    未指定語言與日期時由 logger 直接回傳分組結果（Mongo 以 aggregation 分組排序）；
+    其餘情況收集 iter_export_sessions 的結果，與串流匯出用同一套過濾與 limit。
+    limit 限制回傳最新的 session 數，total_conversations 只計回傳的部分。
+    """
+    if not language and not (date_from or date_to):
+        sessions = conversation_logger.get_grouped_session_logs_by_mode(mode, limit=limit)
+    else:
+        sessions = list(iter_export_sessions(
+            conversation_logger,
+            build_date_query(mode, date_from, date_to),
+            session_manager,
+            language,
+            limit=limit,
+        ))
+    return sessions, count_session_conversations(sessions)
+
+
+EXPORT_STREAM_PAGE_SIZE = 200
+
+
+def iter_export_sessions(
+    conversation_logger,
+    query: dict,
+    session_manager=None,
+    language: Optional[str] = None,
+    page_size: int = EXPORT_STREAM_PAGE_SIZE,
+    limit: Optional[int] = None,
+) -> Iterator[dict]:
+    """逐批產出分組後的匯出 session，記憶體只保留一批的對話紀錄。
+
+    開始前先以 get_export_session_ids 取一次 session_ids 快照（首則訊息時間倒序），
+    之後依快照分批撈紀錄，不再以會隨新對話改變的最後活動時間翻頁：匯出期間有
+    session 新增對話也不會被跳過或重複輸出。先依語言過濾再取最新的 limit 個
+    session；非串流匯出（export_sessions_by_mode）也走這裡，兩者結果相同。
+    """
+    session_ids = conversation_logger.get_export_session_ids(query)
+    if limit is not None and not language:
+        # 不需過濾時快照即結果，只撈前 limit 個 session 的紀錄
+        session_ids = session_ids[:limit]
+    remaining = limit
+    for start in range(0, len(session_ids), page_size):
+        batch = session_ids[start:start + page_size]
+        conversations = conversation_logger.get_logs_for_sessions(batch, mode=query.get("mode"))
+        conversations = filter_conversations_by_session_language(conversations, session_manager, language)
+        grouped = {
+            session["session_id"]: session
+            for session in group_conversations_by_session(conversations)
+        }
+        for session_id in batch:
+            if session_id not in grouped:
+                continue
+            yield grouped[session_id]
+            if remaining is not None:
+                remaining -= 1
+                if remaining == 0:
+                    return
+
+
+def iter_ndjson(items: Iterable[Any]) -> Iterator[bytes]:
+    """將每個項目編碼為一行 JSON（NDJSON）。"""
+    for item in items:
+        if orjson is not None:
+            yield orjson.dumps(item, option=orjson.OPT_NON_STR_KEYS) + b"\n"
+        else:
+            yield (json.dumps(item, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+def stream_export_response(
+    conversation_logger,
+    mode: str,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    session_manager=None,
+    language: Optional[str] = None,
+    simple: bool = False,
+    limit: Optional[int] = None,
+) -> StreamingResponse:
+    """以 NDJSON 串流匯出指定 mode 的對話，每行一個 session（simple 時為簡化格式）。
+
+    limit 只匯出首則訊息時間最新的 N 個 session，與非串流匯出相同。
+    """
+    sessions: Iterable[dict] = iter_export_sessions(
+        conversation_logger,
+        build_date_query(mode, date_from, date_to),
+        session_manager,
+        language,
+        limit=limit,
+    )
+    if simple:
+        sessions = (
+            item
+            for session in sessions
+            for item in simplified_conversation_sessions([session])
         )
-        # first_message_time 取最早的 timestamp
-        if s["conversations"]:
-            s["first_message_time"] = s["conversations"][0].get("timestamp")
+    return StreamingResponse(iter_ndjson(sessions), media_type="application/x-ndjson")
+
+
+def conversation_item(log: dict) -> ConversationItem:
+    """以 model_construct 包裝自家 conversation log，略過逐欄驗證。"""
+    tool_calls = [
+        ConversationToolCall.model_construct(**call) if isinstance(call, dict) else call
+        for call in log.get("tool_calls") or []
+    ]
+    return ConversationItem.model_construct(**{**log, "tool_calls": tool_calls})
 
-    session_list = list(sessions.values())
-    session_list.sort(key=lambda x: x["first_message_time"] or "", reverse=True)
-    return session_list
+
+def conversation_session_group(session: dict) -> ConversationSessionGroup:
+    return ConversationSessionGroup.model_construct(
+        session_id=session["session_id"],
+        conversations=[conversation_item(log) for log in session["conversations"]],
+        first_message_time=session.get("first_message_time"),
+        total=session["total"],
+    )
+
+
+def construct_export_response(response_model: type[ExportResponseT], result: dict) -> ExportResponseT:
+    """將匯出結果 dict 轉為 response model；資料來自自家 log，不再逐筆驗證。
+
+    FastAPI 遇到同型別的 model instance 不會重新驗證，可省去每筆對話的驗證成本。
+    """
+    return response_model.model_construct(
+        **{**result, "sessions": [conversation_session_group(s) for s in result["sessions"]]}
+    )
 
 
 def simplified_conversation_sessions(sessions: list[dict]) -> list[dict]:
@@ -157,6 +392,23 @@ def simplified_conversation_sessions(sessions: list[dict]) -> list[dict]:
     return simplified
 
 
+def get_session_languages(session_manager, session_ids) -> dict[str, str | None]:
+    """Look up persisted languages for many sessions in one batch when supported."""
+    unique_ids = list(dict.fromkeys(session_ids))
+    get_sessions = getattr(session_manager, "get_sessions", None)
+    if get_sessions is not None:
+        sessions = get_sessions(unique_ids)
+    else:
+        sessions = {
+            session_id: session_manager.get_session(session_id)
+            for session_id in unique_ids
+        }
+    return {
+        session_id: session.language if (session := sessions.get(session_id)) else None
+        for session_id in unique_ids
+    }
+
+
 def filter_export_sessions_by_language(
     sessions: list[dict],
     session_manager,
@@ -166,12 +418,13 @@ def filter_export_sessions_by_language(
     if not language:
         return sessions
 
-    filtered = []
-    for session in sessions:
-        session_doc = session_manager.get_session(session.get("session_id"))
-        if session_doc and session_doc.language == language:
-            filtered.append(session)
-    return filtered
+    languages = get_session_languages(
+        session_manager, [session.get("session_id") for session in sessions]
+    )
+    return [
+        session for session in sessions
+        if languages.get(session.get("session_id")) == language
+    ]
 
 
 def filter_session_ids_by_language(
@@ -183,12 +436,8 @@ def filter_session_ids_by_language(
     if not language:
         return session_ids
 
-    filtered = []
-    for session_id in session_ids:
-        session_doc = session_manager.get_session(session_id)
-        if session_doc and session_doc.language == language:
-            filtered.append(session_id)
-    return filtered
+    languages = get_session_languages(session_manager, session_ids)
+    return [session_id for session_id in session_ids if languages.get(session_id) == language]
 
 
 def filter_conversations_by_session_language(
@@ -196,10 +445,22 @@ def filter_conversations_by_session_language(
     session_manager,
     language: Optional[str],
 ) -> list[dict]:
-    """Filter raw conversation docs by session language, caching session lookups."""
+    """Filter raw conversation docs by session language, batching session lookups."""
     if not language:
         return conversations
 
+    # 先找出需要查 session 的 id（log 沒帶 snapshot 語言且尚未見過），一次批次查完
+    seen: set = set()
+    lookup_ids = []
+    for conversation in conversations:
+        session_id = conversation.get("session_id")
+        if conversation.get("session_snapshot", {}).get("language"):
+            seen.add(session_id)
+        elif session_id not in seen:
+            seen.add(session_id)
+            lookup_ids.append(session_id)
+    persisted = get_session_languages(session_manager, lookup_ids) if lookup_ids else {}
+
     filtered = []
     language_by_session: dict[str, str | None] = {}
     for conversation in conversations:
@@ -208,8 +469,7 @@ def filter_conversations_by_session_language(
         if log_language:
             language_by_session[session_id] = log_language
         elif session_id not in language_by_session:
-            session_doc = session_manager.get_session(session_id)
-            language_by_session[session_id] = session_doc.language if session_doc else None
+            language_by_session[session_id] = persisted.get(session_id)
 
         if language_by_session.get(session_id) == language:
             filtered.append(conversation)
@@ -261,7 +521,7 @@ def group_conversations_as_summary(conversations: list) -> list:
         sessions[sid]["message_count"] += 1
 
     session_list = list(sessions.values())
-    session_list.sort(key=lambda x: x["first_message_time"] or "", reverse=True)
+    session_list.sort(key=_first_message_time_key, reverse=True)
     return session_list
 
 
@@ -1,6 +1,38 @@
 #!/bin/sh
 set -e
 
+# 容器可用 CPU 數：nproc 只看 affinity，看不到 --cpus 之類的 cgroup 配額。
+# 有配額時取 ceil(quota / period) 與 nproc 的較小值（v2: cpu.max；v1: cfs_quota_us）。
+# CGROUP_ROOT 僅供測試覆寫。
+container_cpus() {
+    cgroup_root="${CGROUP_ROOT:-/sys/fs/cgroup}"
+    cpus="$(nproc)"
+    quota=""
+    period=""
+    if [ -r "$cgroup_root/cpu.max" ]; then
+        read -r quota period < "$cgroup_root/cpu.max"
+    elif [ -r "$cgroup_root/cpu/cpu.cfs_quota_us" ] && [ -r "$cgroup_root/cpu/cpu.cfs_period_us" ]; then
+        quota="$(cat "$cgroup_root/cpu/cpu.cfs_quota_us")"
+        period="$(cat "$cgroup_root/cpu/cpu.cfs_period_us")"
+    fi
+    # "max" / -1 代表無配額；讀不到檔案時兩者皆空
+    case "$quota:$period" in
+        :*|*:|*[!0-9:]*) ;;
+        *)
+            if [ "$period" -gt 0 ]; then
+                limit=$(( (quota + period - 1) / period ))
+                if [ "$limit" -lt "$cpus" ]; then
+                    cpus="$limit"
+                fi
+            fi
+            ;;
+    esac
+    if [ "$cpus" -lt 1 ]; then
+        cpus=1
+    fi
+    echo "$cpus"
+}
+
 # 未帶 command（$# = 0）時用 MODE 推導；有帶就尊重呼叫端覆寫。
 if [ "$#" -eq 0 ]; then
     PORT="${BACKEND_PORT:-${PORT:-8008}}"
@@ -12,12 +44,16 @@ if [ "$#" -eq 0 ]; then
             set -- uvicorn app.main:app --host 0.0.0.0 --port "$PORT" --reload
             ;;
         prod)
-            # 預設單 worker：session 的 _pending lazy-write 為 process 內記憶體，多 worker 會跨 process
-            # 失憶（/chat/start 與 /chat/message 打到不同 worker → 404）。待 session 狀態改為共享
-            # (寫 Mongo / TTL) 後，可在 .env 設 UVICORN_WORKERS=2 恢復多 worker。
+            # session 狀態已寫入 Mongo / Redis，多 worker 之間共享，不需依 session_id 黏 worker。
+            # UVICORN_WORKERS=auto 時依容器可用 CPU 數起 worker；請求多半在等 LLM / DB，event loop
+            # 用 uvloop + httptools（uvicorn[standard] 提供）。
             WORKERS="${UVICORN_WORKERS:-2}"
+            if [ "$WORKERS" = "auto" ]; then
+                WORKERS="$(container_cpus)"
+            fi
             echo "[entrypoint] MODE=prod → uvicorn --workers $WORKERS (port $PORT)" >&2
-            set -- uvicorn app.main:app --host 0.0.0.0 --port "$PORT" --workers "$WORKERS"
+            set -- uvicorn app.main:app --host 0.0.0.0 --port "$PORT" --workers "$WORKERS" \
+                --loop uvloop --http httptools
             ;;
         *)
             echo "[entrypoint] MODE must be 'dev' or 'prod' (got '$MODE')" >&2
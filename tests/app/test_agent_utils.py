@@ -1,9 +1,22 @@
 import unittest
 
-from app.services.agent_utils import strip_citations, strip_core_markup
+from app.services import agent_utils
+from app.services.agent_utils import (
+    CitationStreamFilter,
+    normalize_language,
+    strip_citations,
+    strip_core_markup,
+)
 
 
 class TestAgentUtils(unittest.TestCase):
+    def test_normalize_language_fast_path_and_fallback(self):
+        for value, expected in [
+            ("zh", "zh"), ("en", "en"), ("EN", "en"), ("en-US", "en"),
+            (" En-gb ", "en"), ("ja", "zh"), ("", "zh"), (None, "zh"),
+        ]:
+            self.assertEqual(normalize_language(value), expected, value)
+
     def test_strip_core_markup_removes_wrapper_but_keeps_content(self):
         self.assertEqual(
             strip_core_markup("before [CORE: important fact] after"),
@@ -22,6 +35,31 @@ class TestAgentUtils(unittest.TestCase):
             "What is heated tobacco 加熱菸跟紙菸一樣皆含有菸草。",
         )
 
+    def test_citation_stream_filter_holds_only_possible_markers(self):
+        text_filter = CitationStreamFilter()
+
+        self.assertEqual(text_filter.feed("見 [附件"), "見 [附件")
+        self.assertEqual(text_filter.feed(" A 與 [ci"), " A 與")
+        self.assertEqual(text_filter.feed("te: doc] [CO"), "")
+        self.assertEqual(text_filter.feed("RE: 重點]。 "), " 重點。")
+        self.assertEqual(text_filter.flush(), "")
+
+    def test_citation_stream_filter_flushes_unclosed_marker(self):
+        text_filter = CitationStreamFilter()
+
+        self.assertEqual(text_filter.feed("答案 [cite: doc"), "答案")
+        self.assertEqual(text_filter.flush(), " [cite: doc")
+
+    def test_citation_stream_filter_releases_marker_over_length_cap(self):
+        original = agent_utils._MAX_PENDING_MARKER_CHARS
+        agent_utils._MAX_PENDING_MARKER_CHARS = 10
+        try:
+            text_filter = CitationStreamFilter()
+            self.assertEqual(text_filter.feed("a [cite: "), "a")
+            self.assertEqual(text_filter.feed("0123456789"), " [cite: 0123456789")
+        finally:
+            agent_utils._MAX_PENDING_MARKER_CHARS = original
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -14,7 +14,12 @@ def _write_executable(path: Path, content: str) -> None:
     path.chmod(0o755)
 
 
-def _run_entrypoint(tmp_path: Path, env: dict[str, str] | None = None, args: list[str] | None = None):
+def _run_entrypoint(
+    tmp_path: Path,
+    env: dict[str, str] | None = None,
+    args: list[str] | None = None,
+    nproc: int | None = None,
+):
     # Use a world-readable /tmp dir rather than the pytest tmp_path fixture: the
     # entrypoint runs via `sh` and needs the fake-bin dir on PATH to be traversable
     # even when tmp_path is created mode 0o700.
@@ -24,6 +29,8 @@ def _run_entrypoint(tmp_path: Path, env: dict[str, str] | None = None, args: lis
     try:
         _write_executable(fake_bin / "uvicorn", "#!/bin/sh\nprintf '%s\\n' \"$@\"\n")
         _write_executable(fake_bin / "custom-cmd", "#!/bin/sh\nprintf 'custom:%s\\n' \"$@\"\n")
+        if nproc is not None:
+            _write_executable(fake_bin / "nproc", f"#!/bin/sh\necho {nproc}\n")
 
         run_env = os.environ.copy()
         run_env.pop("MODE", None)
@@ -71,6 +78,10 @@ def test_prod_mode_uses_two_workers(tmp_path: Path):
         "8008",
         "--workers",
         "2",
+        "--loop",
+        "uvloop",
+        "--http",
+        "httptools",
     ]
 
 
@@ -78,7 +89,53 @@ def test_unset_mode_defaults_to_prod(tmp_path: Path):
     result = _run_entrypoint(tmp_path)
 
     assert result.returncode == 0
-    assert result.stdout.splitlines()[-2:] == ["--workers", "2"]
+    args = result.stdout.splitlines()
+    assert args[args.index("--workers") + 1] == "2"
+
+
+def test_auto_workers_follow_cpu_count(tmp_path: Path):
+    result = _run_entrypoint(
+        tmp_path,
+        {"MODE": "prod", "UVICORN_WORKERS": "auto", "CGROUP_ROOT": str(tmp_path)},
+    )
+
+    assert result.returncode == 0
+    args = result.stdout.splitlines()
+    assert args[args.index("--workers") + 1] == str(len(os.sched_getaffinity(0)))
+
+
+def _auto_workers(tmp_path: Path, files: dict[str, str]) -> str:
+    cgroup_root = Path(f"/tmp/fake_cgroup_{uuid.uuid4().hex}")
+    try:
+        for name, content in files.items():
+            path = cgroup_root / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        cgroup_root.chmod(0o755)
+        result = _run_entrypoint(
+            tmp_path,
+            {"MODE": "prod", "UVICORN_WORKERS": "auto", "CGROUP_ROOT": str(cgroup_root)},
+            nproc=8,
+        )
+    finally:
+        shutil.rmtree(cgroup_root, ignore_errors=True)
+
+    assert result.returncode == 0
+    args = result.stdout.splitlines()
+    return args[args.index("--workers") + 1]
+
+
+def test_auto_workers_respect_cgroup_v2_quota(tmp_path: Path):
+    assert _auto_workers(tmp_path, {"cpu.max": "150000 100000\n"}) == "2"
+    assert _auto_workers(tmp_path, {"cpu.max": "50000 100000\n"}) == "1"
+    assert _auto_workers(tmp_path, {"cpu.max": "max 100000\n"}) == "8"
+
+
+def test_auto_workers_respect_cgroup_v1_quota(tmp_path: Path):
+    period = {"cpu/cpu.cfs_period_us": "100000\n"}
+    assert _auto_workers(tmp_path, {"cpu/cpu.cfs_quota_us": "250000\n", **period}) == "3"
+    assert _auto_workers(tmp_path, {"cpu/cpu.cfs_quota_us": "-1\n", **period}) == "8"
+    assert _auto_workers(tmp_path, {"cpu/cpu.cfs_quota_us": "2000000\n", **period}) == "8"
 
 
 def test_invalid_mode_fails_fast(tmp_path: Path):
@@ -77,6 +77,7 @@ def test_jti_chat_and_quiz_route_contract_is_unchanged() -> None:
         ("POST", "/api/jti/tts"),
         ("POST", "/api/jti/chat/start"),
         ("POST", "/api/jti/chat/message"),
+        ("POST", "/api/jti/chat/message/stream"),
         ("GET", "/api/jti/history"),
         ("GET", "/api/jti/history/export"),
         ("GET", "/api/jti-admin/conversations"),
@@ -459,3 +459,41 @@ def test_update_file_content_rejects_qa_csv_without_answer_column():
     saved = fake_store.get_file("zh", "legacy.csv")
     assert saved is not None
     assert saved["data"].decode("utf-8-sig") == "index,q,a,img\n1,舊題,舊答,\n"
+
+
+def test_file_content_and_download_answer_matching_etag_with_304():
+    client, fake_store, _ = _make_upload_context()
+    fake_store.insert_file(
+        language="zh",
+        filename="notes.txt",
+        data="衛教說明".encode("utf-8"),
+        display_name="notes.txt",
+        content_type="text/plain",
+        editable=True,
+    )
+
+    with mock.patch("app.routers.hciot.knowledge.get_hciot_knowledge_store", return_value=fake_store):
+        for path in (
+            "/api/hciot-admin/knowledge/files/notes.txt/content?language=zh",
+            "/api/hciot-admin/knowledge/files/notes.txt/download?language=zh",
+        ):
+            first = client.get(path)
+            etag = first.headers["etag"]
+            assert first.status_code == 200
+            assert first.headers["cache-control"] == "private, no-cache"
+
+            cached = client.get(path, headers={"If-None-Match": etag})
+            assert cached.status_code == 304
+            assert cached.content == b""
+
+            stale = client.get(path, headers={"If-None-Match": '"stale"'})
+            assert stale.status_code == 200
+
+        fake_store.update_file_content("zh", "notes.txt", b"updated")
+        changed = client.get(
+            "/api/hciot-admin/knowledge/files/notes.txt/content?language=zh",
+            headers={"If-None-Match": etag},
+        )
+
+    assert changed.status_code == 200
+    assert changed.json()["content"] == "updated"
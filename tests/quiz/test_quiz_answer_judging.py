@@ -0,0 +1,174 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from app.services.general import quiz_helpers
+
+
+QUESTION = {
+    "id": "q1",
+    "text": "你喜歡哪種風格？",
+    "options": [{"id": "a", "text": "簡約"}, {"id": "b", "text": "可愛"}],
+}
+
+
+class TestJudgeUserChoice(unittest.TestCase):
+    def setUp(self):
+        quiz_helpers._judge_cache.clear()
+        quiz_helpers._judge_inflight.clear()
+
+    def test_rule_match_skips_llm(self):
+        with patch.object(quiz_helpers, "_judge_with_llm") as judge:
+            self.assertEqual(asyncio.run(quiz_helpers._judge_user_choice("b", QUESTION)), "B")
+            self.assertEqual(asyncio.run(quiz_helpers._judge_user_choice("第一", QUESTION)), "A")
+            self.assertEqual(asyncio.run(quiz_helpers._judge_user_choice("我選可愛的", QUESTION)), "B")
+        judge.assert_not_called()
+
+    def test_repeated_rule_replies_reuse_cached_judgement(self):
+        quiz_helpers._rule_judge.cache_clear()
+        with patch.object(quiz_helpers, "_scan_choice_tokens", wraps=quiz_helpers._scan_choice_tokens) as scan:
+            for _ in range(3):
+                self.assertEqual(asyncio.run(quiz_helpers._judge_user_choice(" 2 ", QUESTION)), "B")
+        self.assertEqual(scan.call_count, 1)
+
+    def test_ambiguous_or_out_of_range_tokens_are_not_rule_matched(self):
+        labels = ["A", "B"]
+        for message in ["A和B", "1跟2", "3", "12"]:
+            letters, digits = quiz_helpers._scan_choice_tokens(message.upper())
+            self.assertIsNone(quiz_helpers._match_exact_label(message.upper(), labels, letters))
+            self.assertIsNone(quiz_helpers._match_number_or_sequence(message, labels, digits))
+
+    def test_near_miss_option_text_is_fuzzy_matched(self):
+        question = {
+            "id": "q2",
+            "text": "Pick a style",
+            "options": [{"text": "Colorful and bold"}, {"text": "Minimal and clean"}],
+        }
+        with patch.object(quiz_helpers, "_judge_with_llm") as judge:
+            self.assertEqual(
+                asyncio.run(quiz_helpers._judge_user_choice("I want the colorfull and bold one", question)),
+                "A",
+            )
+            self.assertEqual(asyncio.run(quiz_helpers._judge_user_choice("minimal n clean", question)), "B")
+        judge.assert_not_called()
+
+    def test_fuzzy_match_rejects_short_or_unrelated_text(self):
+        labels = ["A", "B"]
+        self.assertIsNone(quiz_helpers._match_option_text_fuzzy("可受", QUESTION["options"], labels))
+        options = [{"text": "colorful and bold"}, {"text": "minimal and clean"}]
+        self.assertIsNone(quiz_helpers._match_option_text_fuzzy("hello there", options, labels))
+
+    def test_off_topic_question_skips_llm(self):
+        with patch.object(quiz_helpers, "_judge_with_llm") as judge:
+            self.assertIsNone(asyncio.run(quiz_helpers._judge_user_choice("有什麼顏色可以選擇呢？", QUESTION)))
+        judge.assert_not_called()
+
+    def test_off_topic_cache_is_keyed_on_normalised_text(self):
+        quiz_helpers._is_off_topic_question.cache_clear()
+        with patch.object(quiz_helpers, "_judge_with_llm") as judge:
+            for message in ("有什麼顏色可以選擇呢？", "  有什麼顏色可以選擇呢？ "):
+                self.assertIsNone(asyncio.run(quiz_helpers._judge_user_choice(message, QUESTION)))
+        judge.assert_not_called()
+        info = quiz_helpers._is_off_topic_question.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 1))
+
+    def test_questions_that_may_answer_or_pause_still_reach_llm(self):
+        for message in ["可以先暫停一下測驗嗎？", "比較可愛的那種可以嗎？", "What colours are there?"]:
+            self.assertFalse(
+                quiz_helpers._is_off_topic_question(message, quiz_helpers._option_texts(QUESTION["options"])),
+                message,
+            )
+
+    def test_ordinal_answers_phrased_as_questions_reach_llm(self):
+        messages = [
+            "我想選第一個可以嗎？",
+            "選最後一個那個可以嗎？",
+            "我比較喜歡第三種耶可以嗎？",
+            "我覺得第二個比較適合我吧？",
+        ]
+        option_texts = quiz_helpers._option_texts(QUESTION["options"])
+        for message in messages:
+            self.assertFalse(quiz_helpers._is_off_topic_question(message, option_texts), message)
+
+        async def fake_judge(user_message, question, options, labels):
+            return "A"
+
+        with patch.object(quiz_helpers, "_judge_with_llm", side_effect=fake_judge) as judge:
+            for message in messages:
+                self.assertEqual(asyncio.run(quiz_helpers._judge_user_choice(message, QUESTION)), "A", message)
+        self.assertEqual(judge.call_count, len(messages))
+
+    def test_concurrent_duplicate_replies_share_one_llm_call(self):
+        calls = []
+
+        async def fake_judge(user_message, question, options, labels):
+            calls.append(user_message)
+            await asyncio.sleep(0.01)
+            return "A"
+
+        async def run_twice():
+            return await asyncio.gather(
+                quiz_helpers._judge_user_choice("嗯…看心情吧", QUESTION),
+                quiz_helpers._judge_user_choice("嗯…看心情吧", QUESTION),
+            )
+
+        with patch.object(quiz_helpers, "_judge_with_llm", side_effect=fake_judge):
+            self.assertEqual(asyncio.run(run_twice()), ["A", "A"])
+            # 短時間內重送直接命中快取
+            self.assertEqual(asyncio.run(quiz_helpers._judge_user_choice("嗯…看心情吧", QUESTION)), "A")
+
+        self.assertEqual(calls, ["嗯…看心情吧"])
+        self.assertEqual(quiz_helpers._judge_inflight, {})
+
+    def test_concurrent_distinct_replies_are_batched_behind_the_first_call(self):
+        prompts = []
+
+        async def fake_generate(prompt):
+            prompts.append(prompt)
+            await asyncio.sleep(0)
+            return "a" if len(prompts) == 1 else "1: B\n2: PAUSE"
+
+        async def run_all():
+            return await asyncio.gather(
+                quiz_helpers._judge_user_choice("應該是前面那個", QUESTION),
+                quiz_helpers._judge_user_choice("後面那個吧", QUESTION),
+                quiz_helpers._judge_user_choice("我先不做了", QUESTION),
+            )
+
+        with patch.object(quiz_helpers, "_generate_judgement_text", side_effect=fake_generate):
+            self.assertEqual(asyncio.run(run_all()), ["A", "B", "PAUSE"])
+
+        self.assertEqual(len(prompts), 2)
+        self.assertIn("只回覆：A 至 E、PAUSE 或 X", prompts[0])
+        self.assertIn("[2]", prompts[1])
+
+    def test_idle_batcher_dispatches_without_waiting_for_window(self):
+        loop_times = []
+
+        async def fake_generate(prompt):
+            loop_times.append(asyncio.get_running_loop().time())
+            return "b"
+
+        async def run_one():
+            start = asyncio.get_running_loop().time()
+            result = await quiz_helpers._judge_user_choice("後面那個吧", QUESTION)
+            return result, start
+
+        with patch.object(quiz_helpers, "_JUDGE_BATCH_WINDOW_SECONDS", 10), \
+                patch.object(quiz_helpers, "_generate_judgement_text", side_effect=fake_generate):
+            result, start = asyncio.run(run_one())
+
+        self.assertEqual(result, "B")
+        self.assertLess(loop_times[0] - start, 1)
+
+    def test_single_reply_uses_single_question_prompt(self):
+        async def fake_generate(prompt):
+            self.assertIn("只回覆：A 至 E、PAUSE 或 X", prompt)
+            return "b"
+
+        with patch.object(quiz_helpers, "_generate_judgement_text", side_effect=fake_generate):
+            self.assertEqual(asyncio.run(quiz_helpers._judge_user_choice("後面那個吧", QUESTION)), "B")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+from app.services.general import quiz_helpers
+from app.services.general.quiz_helpers import is_quiz_start_intent
+
+
+class TestQuizStartIntent(unittest.TestCase):
+    def test_start_keyword_triggers_quiz(self):
+        self.assertTrue(is_quiz_start_intent("我想玩心理測驗"))
+        self.assertTrue(is_quiz_start_intent("Start Quiz please"))
+
+    def test_negative_keyword_blocks_start(self):
+        self.assertFalse(is_quiz_start_intent("我不想做測驗"))
+        self.assertFalse(is_quiz_start_intent("skip the quiz"))
+
+    def test_custom_keyword_lists_are_supported(self):
+        self.assertTrue(is_quiz_start_intent("來玩遊戲", start_keywords=["遊戲"], negative_keywords=[]))
+        self.assertFalse(is_quiz_start_intent("測驗", start_keywords=[], negative_keywords=[]))
+
+    def test_configured_keywords_are_case_insensitive(self):
+        self.assertTrue(is_quiz_start_intent("let's QUIZ", start_keywords=["Quiz"], negative_keywords=["Skip"]))
+        self.assertFalse(is_quiz_start_intent("skip quiz", start_keywords=["Quiz"], negative_keywords=["Skip"]))
+
+    def test_keywords_are_matched_literally(self):
+        self.assertTrue(is_quiz_start_intent("a+b?", start_keywords=("a+b?",), negative_keywords=()))
+        self.assertFalse(is_quiz_start_intent("aab", start_keywords=("a+b",), negative_keywords=()))
+
+    def test_repeated_messages_reuse_cached_decision(self):
+        quiz_helpers._quiz_start_decision.cache_clear()
+        for _ in range(3):
+            self.assertTrue(is_quiz_start_intent("開始測驗", start_keywords=["測驗"], negative_keywords=[]))
+        info = quiz_helpers._quiz_start_decision.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 2))
+
+    def test_whitespace_and_case_variants_share_cached_decision(self):
+        quiz_helpers._quiz_start_decision.cache_clear()
+        for message in ("Quiz", "  quiz ", "QUIZ\n"):
+            self.assertTrue(is_quiz_start_intent(message, start_keywords=["quiz"], negative_keywords=[]))
+        info = quiz_helpers._quiz_start_decision.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
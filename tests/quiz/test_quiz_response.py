@@ -0,0 +1,28 @@
+import unittest
+
+from app.services.general.quiz_response import (
+    extract_option_texts,
+    format_option_texts,
+    label_option_texts,
+)
+
+
+class TestQuizOptionFormatting(unittest.TestCase):
+    def test_options_are_labelled_in_order(self):
+        options = [{"text": "簡約"}, {"text": "可愛"}, {}]
+        self.assertEqual(label_option_texts(options), ["A. 簡約", "B. 可愛", "C. "])
+        self.assertEqual(format_option_texts(options), "A. 簡約\nB. 可愛\nC. ")
+
+    def test_cached_labels_are_returned_as_fresh_lists(self):
+        question = {"options": [{"text": "紅"}, {"text": "藍"}]}
+        first = extract_option_texts(question)
+        first.append("mutated")
+        self.assertEqual(extract_option_texts(question), ["A. 紅", "B. 藍"])
+
+    def test_options_beyond_available_labels_are_dropped(self):
+        options = [{"text": str(index)} for index in range(7)]
+        self.assertEqual(len(label_option_texts(options)), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
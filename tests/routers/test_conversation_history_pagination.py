@@ -1,4 +1,5 @@
 import asyncio
+from types import SimpleNamespace
 
 from tests.support.app_test_support import install_app_import_mocks
 
@@ -13,6 +14,7 @@ class SummaryLogger:
     def __init__(self, total_sessions=45):
         self.total_sessions = total_sessions
         self.paginated_calls = []
+        self.cursor_calls = []
         self.summary_calls = []
         self.full_logs_calls = []
 
@@ -41,16 +43,20 @@ class SummaryLogger:
             },
         ]
 
-    def get_logs_for_sessions(self, session_ids):
+    def get_session_ids_after(self, query, after=None, page_size=10):
+        self.cursor_calls.append({"query": query, "after": after, "page_size": page_size})
+        return ["session-a", "session-b"], ("2026-06-01T09:01:00", "session-b")
+
+    def get_logs_for_sessions(self, session_ids, mode=None):
         self.full_logs_calls.append(list(session_ids))
         raise AssertionError("history list must not load full conversation logs")
 
-    def get_session_logs(self, session_id):
+    def get_session_logs(self, session_id, mode=None):
         return [
             {
                 "_id": "log-1",
                 "session_id": session_id,
-                "mode": "jti",
+                "mode": mode or "jti",
                 "turn_number": 1,
                 "timestamp": "2026-06-01T10:00:00",
                 "user_message": "hello",
@@ -133,6 +139,43 @@ def test_general_history_list_uses_store_filter_with_summary_pagination(monkeypa
     assert payload["total_conversations"] == 4
 
 
+def test_jti_history_list_cursor_mode_skips_offset_and_total(monkeypatch):
+    from app.utils import decode_history_cursor, encode_history_cursor
+
+    logger = SummaryLogger()
+    monkeypatch.setattr(jti_chat, "_get_conversation_logger", lambda: logger)
+
+    first = asyncio.run(jti_chat.get_conversations(page_size=2, cursor=""))
+    second = asyncio.run(
+        jti_chat.get_conversations(page_size=2, cursor=first["next_cursor"])
+    )
+
+    assert logger.paginated_calls == []
+    assert [call["after"] for call in logger.cursor_calls] == [
+        None,
+        ("2026-06-01T09:01:00", "session-b"),
+    ]
+    assert first["total_sessions"] is None
+    assert first["page"] is None
+    assert decode_history_cursor(first["next_cursor"]) == ("2026-06-01T09:01:00", "session-b")
+    assert second["sessions"][0]["session_id"] == "session-a"
+    assert encode_history_cursor(("2026-06-01T09:01:00", "session-b")) == first["next_cursor"]
+
+
+def test_history_list_rejects_malformed_cursor(monkeypatch):
+    import pytest
+    from fastapi import HTTPException
+
+    logger = SummaryLogger()
+    monkeypatch.setattr(jti_chat, "_get_conversation_logger", lambda: logger)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(jti_chat.get_conversations(cursor="not-a-cursor"))
+
+    assert exc_info.value.status_code == 400
+    assert logger.cursor_calls == []
+
+
 def test_jti_history_detail_still_returns_full_conversations(monkeypatch):
     logger = SummaryLogger()
     monkeypatch.setattr(jti_chat, "_get_conversation_logger", lambda: logger)
@@ -144,3 +187,340 @@ def test_jti_history_detail_still_returns_full_conversations(monkeypatch):
     assert payload["session_id"] == "session-a"
     assert payload["total"] == 1
     assert payload["conversations"][0]["user_message"] == "hello"
+
+
+class PagedExportLogger:
+    def __init__(self, session_ids):
+        self.session_ids = session_ids
+        self.loaded_pages = []
+        self.snapshots = 0
+
+    def get_export_session_ids(self, query):
+        self.snapshots += 1
+        return list(self.session_ids)
+
+    def get_logs_for_sessions(self, session_ids, mode=None):
+        self.loaded_pages.append(list(session_ids))
+        return [
+            {
+                "session_id": sid,
+                "mode": "jti",
+                "turn_number": 1,
+                "timestamp": f"2026-06-01T10:0{index}:00",
+                "user_message": f"q-{sid}",
+                "agent_response": f"a-{sid}",
+                "session_snapshot": {"language": "zh"},
+            }
+            for index, sid in enumerate(session_ids)
+        ]
+
+
+def test_iter_export_sessions_loads_one_page_at_a_time():
+    from app.utils import iter_export_sessions
+
+    logger = PagedExportLogger(["s1", "s2", "s3"])
+    sessions = list(iter_export_sessions(logger, {"mode": "jti"}, page_size=2))
+
+    assert logger.loaded_pages == [["s1", "s2"], ["s3"]]
+    assert [s["session_id"] for s in sessions] == logger.session_ids
+    for page_size in (1, 3):
+        paged = list(iter_export_sessions(PagedExportLogger(["s1", "s2", "s3"]), {"mode": "jti"}, page_size=page_size))
+        assert [s["session_id"] for s in paged] == logger.session_ids
+
+
+def test_iter_export_sessions_pages_a_snapshot_taken_before_streaming():
+    from app.utils import iter_export_sessions
+
+    class ActiveLogger(PagedExportLogger):
+        def get_logs_for_sessions(self, session_ids, mode=None):
+            # 匯出途中有新 session 出現、排到最前面
+            self.session_ids.insert(0, f"new-{len(self.loaded_pages)}")
+            return super().get_logs_for_sessions(session_ids)
+
+    logger = ActiveLogger(["s1", "s2", "s3"])
+    sessions = list(iter_export_sessions(logger, {"mode": "jti"}, page_size=1))
+
+    assert [s["session_id"] for s in sessions] == ["s1", "s2", "s3"]
+    assert logger.snapshots == 1
+
+
+def test_jti_export_stream_returns_ndjson_lines(monkeypatch):
+    import json
+
+    logger = PagedExportLogger(["s1", "s2"])
+    monkeypatch.setattr(jti_chat, "_get_conversation_logger", lambda: logger)
+    monkeypatch.setattr(jti_chat, "_get_session_manager", lambda: None)
+
+    response = asyncio.run(jti_chat.export_conversations(simple=True, stream=True))
+
+    async def collect():
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    lines = asyncio.run(collect()).decode("utf-8").splitlines()
+    assert response.media_type == "application/x-ndjson"
+    assert [json.loads(line)["session_id"] for line in lines] == ["s1", "s2"]
+    assert json.loads(lines[0])["conversations"][0]["question"] == "q-s1"
+
+
+def test_export_stream_honours_limit(monkeypatch):
+    import json
+
+    logger = PagedExportLogger(["s1", "s2", "s3"])
+    monkeypatch.setattr(jti_chat, "_get_conversation_logger", lambda: logger)
+    monkeypatch.setattr(jti_chat, "_get_session_manager", lambda: None)
+
+    response = asyncio.run(jti_chat.export_conversations(stream=True, limit=2))
+
+    async def collect():
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    lines = asyncio.run(collect()).decode("utf-8").splitlines()
+    assert [json.loads(line)["session_id"] for line in lines] == ["s1", "s2"]
+    assert logger.loaded_pages == [["s1", "s2"]]
+
+
+def test_hciot_export_stream_uses_paged_ndjson(monkeypatch):
+    import json
+
+    logger = PagedExportLogger(["s1"])
+    monkeypatch.setattr(hciot_chat, "_get_conversation_logger", lambda: logger)
+    monkeypatch.setattr(hciot_chat, "_get_session_manager", lambda: None)
+
+    response = asyncio.run(hciot_chat.export_conversations(stream=True))
+
+    async def collect():
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    lines = asyncio.run(collect()).decode("utf-8").splitlines()
+    assert response.media_type == "application/x-ndjson"
+    assert [json.loads(line)["session_id"] for line in lines] == ["s1"]
+
+
+def test_group_conversations_by_session_orders_turns_and_sessions():
+    from app.utils import group_conversations_by_session
+
+    conversations = [
+        {"session_id": "old", "turn_number": 2, "timestamp": "2026-06-01T09:01:00"},
+        {"session_id": "new", "turn_number": 1, "timestamp": "2026-06-02T08:00:00"},
+        {"session_id": "old", "turn_number": 1, "timestamp": "2026-06-01T09:00:00"},
+    ]
+
+    sessions = group_conversations_by_session(conversations)
+
+    assert [s["session_id"] for s in sessions] == ["new", "old"]
+    assert [c["turn_number"] for c in sessions[1]["conversations"]] == [1, 2]
+    assert sessions[1]["first_message_time"] == "2026-06-01T09:00:00"
+    assert sessions[1]["total"] == 2
+
+
+def test_construct_export_response_serializes_trusted_logs_without_revalidation():
+    from pydantic import TypeAdapter
+
+    from app.schemas.chat import ConversationItem, ExportConversationsResponse
+    from app.utils import construct_export_response
+
+    result = {
+        "exported_at": "2026-06-01T10:00:00+08:00",
+        "mode": "jti",
+        "sessions": [
+            {
+                "session_id": "s1",
+                "first_message_time": "2026-06-01T10:00:00",
+                "total": 1,
+                "conversations": [
+                    {
+                        "_id": "log-1",
+                        "session_id": "s1",
+                        "mode": "jti",
+                        "turn_number": 1,
+                        "timestamp": "2026-06-01T10:00:00",
+                        "user_message": "hi",
+                        "agent_response": "hello",
+                        "tool_calls": [{"tool": "start_quiz", "args": {"session_id": "s1"}}],
+                    },
+                ],
+            },
+        ],
+        "total_conversations": 1,
+        "total_sessions": 1,
+    }
+
+    response = construct_export_response(ExportConversationsResponse, result)
+    adapter = TypeAdapter(ExportConversationsResponse)
+
+    assert adapter.validate_python(response) is response
+    assert isinstance(response.sessions[0].conversations[0], ConversationItem)
+    payload = adapter.dump_python(response, by_alias=True, exclude_none=True)
+    conversation = payload["sessions"][0]["conversations"][0]
+    assert conversation["_id"] == "log-1"
+    assert conversation["tool_calls"] == [
+        {"tool": "start_quiz", "args": {"session_id": "s1"}, "result": {}},
+    ]
+
+
+def test_history_routes_keep_fastapi_dump_json_fast_path():
+    from fastapi.datastructures import DefaultPlaceholder
+
+    routers = (
+        jti_chat.compat_history_router,
+        jti_chat.admin_history_router,
+        hciot_chat.compat_history_router,
+        hciot_chat.admin_history_router,
+        general_chat.router,
+    )
+    for router in routers:
+        for route in router.routes:
+            if getattr(route, "response_model", None) is None:
+                continue
+            # 自訂 response_class（例如 ORJSONResponse）會讓 FastAPI 放棄 Pydantic dump_json
+            assert isinstance(route.response_class, DefaultPlaceholder), route.path
+
+
+def test_group_conversations_by_session_limit_keeps_newest_sessions():
+    from app.utils import group_conversations_by_session
+
+    conversations = [
+        {"session_id": sid, "turn_number": 1, "timestamp": ts}
+        for sid, ts in [("old", "2026-06-01T08:00:00"), ("new", "2026-06-01T10:00:00"), ("mid", "2026-06-01T09:00:00")]
+    ]
+
+    sessions = group_conversations_by_session(conversations, limit=2)
+
+    assert [session["session_id"] for session in sessions] == ["new", "mid"]
+
+
+def test_export_limit_is_passed_to_grouped_logger(monkeypatch):
+    class GroupedLogger:
+        def __init__(self):
+            self.limits = []
+
+        def get_grouped_session_logs_by_mode(self, mode, limit=None):
+            self.limits.append(limit)
+            return []
+
+    logger = GroupedLogger()
+    monkeypatch.setattr(jti_chat, "_get_conversation_logger", lambda: logger)
+    monkeypatch.setattr(jti_chat, "_get_session_manager", lambda: None)
+
+    response = asyncio.run(jti_chat.export_conversations(limit=5))
+
+    assert logger.limits == [5]
+    assert response.total_sessions == 0
+
+
+def test_history_summary_rows_validate_into_slotted_dataclass():
+    from pydantic import TypeAdapter
+
+    from app.schemas.chat import ConversationSessionSummary, ConversationsGroupedResponse
+
+    adapter = TypeAdapter(ConversationsGroupedResponse)
+    payload = adapter.validate_python({
+        "mode": "jti",
+        "sessions": [{"session_id": "s1", "message_count": 2, "language": "zh"}],
+        "total_conversations": 2,
+        "total_sessions": 1,
+        "page": 1,
+        "page_size": 20,
+        "total_pages": 1,
+    })
+
+    row = payload.sessions[0]
+    assert isinstance(row, ConversationSessionSummary)
+    assert not hasattr(row, "__dict__")
+    assert adapter.dump_python(payload, exclude_none=True)["sessions"] == [
+        {"session_id": "s1", "message_count": 2, "language": "zh"},
+    ]
+
+
+class BatchSessionManager:
+    def __init__(self, languages):
+        self.languages = languages
+        self.batches = []
+
+    def get_sessions(self, session_ids):
+        self.batches.append(list(session_ids))
+        return {
+            session_id: SimpleNamespace(language=self.languages[session_id])
+            for session_id in session_ids
+            if session_id in self.languages
+        }
+
+    def get_session(self, session_id):
+        raise AssertionError("language filters should use the batch lookup")
+
+
+def test_language_filters_resolve_sessions_in_one_batch():
+    from app.utils import (
+        filter_conversations_by_session_language,
+        filter_export_sessions_by_language,
+        filter_session_ids_by_language,
+    )
+
+    manager = BatchSessionManager({"s1": "zh", "s2": "en"})
+    assert filter_session_ids_by_language(["s1", "s2", "s3"], manager, "zh") == ["s1"]
+    assert filter_export_sessions_by_language(
+        [{"session_id": "s2"}, {"session_id": "s1"}], manager, "en"
+    ) == [{"session_id": "s2"}]
+
+    conversations = [
+        {"session_id": "s1"},
+        {"session_id": "s2", "session_snapshot": {"language": "zh"}},
+        {"session_id": "s1"},
+        {"session_id": "s3"},
+    ]
+    filtered = filter_conversations_by_session_language(conversations, manager, "zh")
+    assert filtered == conversations[:3]
+    assert manager.batches == [["s1", "s2", "s3"], ["s2", "s1"], ["s1", "s3"]]
+
+
+def test_export_sessions_by_ids_fetches_all_sessions_in_one_query():
+    from app.utils import export_sessions_by_ids
+
+    class BatchLogger:
+        def __init__(self):
+            self.calls = []
+
+        def get_session_logs(self, session_id, mode=None):
+            raise AssertionError("export by ids must not query sessions one by one")
+
+        def get_logs_for_sessions(self, session_ids, mode=None):
+            self.calls.append((list(session_ids), mode))
+            return [
+                {"session_id": "s1", "turn_number": 1, "timestamp": "2026-06-01T09:00:00"},
+                {"session_id": "s2", "turn_number": 1, "timestamp": "2026-06-02T09:00:00"},
+                {"session_id": "s1", "turn_number": 2, "timestamp": "2026-06-01T09:01:00"},
+            ]
+
+    logger = BatchLogger()
+    sessions, total = export_sessions_by_ids(logger, "s1, s2,missing", "jti")
+
+    assert logger.calls == [(["s1", "s2", "missing"], "jti")]
+    assert [s["session_id"] for s in sessions] == ["s2", "s1"]
+    assert [c["turn_number"] for c in sessions[1]["conversations"]] == [1, 2]
+    assert total == 3
+
+
+def test_streamed_and_buffered_exports_match_for_same_limit(tmp_path):
+    from app.services.logging.conversation_logger import ConversationLogger
+    from app.utils import build_date_query, export_sessions_by_mode, iter_export_sessions
+
+    logger = ConversationLogger(log_dir=str(tmp_path))
+    for session_id in ("s1", "s2", "s3", "s4", "s2", "s1"):
+        logger.log_conversation(
+            session_id=session_id,
+            user_message=f"q-{session_id}",
+            agent_response=f"a-{session_id}",
+            mode="jti",
+        )
+    manager = BatchSessionManager({"s1": "zh", "s2": "en", "s3": "zh", "s4": "zh"})
+
+    for language in (None, "zh"):
+        for limit in (None, 1, 2, 5):
+            buffered, _ = export_sessions_by_mode(logger, "jti", manager, language, limit=limit)
+            streamed = list(iter_export_sessions(
+                logger, build_date_query("jti", None, None), manager, language, page_size=1, limit=limit,
+            ))
+            assert streamed == buffered, (language, limit)
+
+    newest_zh, _ = export_sessions_by_mode(logger, "jti", manager, "zh", limit=2)
+    assert [s["session_id"] for s in newest_zh] == ["s4", "s3"]
@@ -0,0 +1,308 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from tests.support.app_test_support import install_app_import_mocks
+
+install_app_import_mocks()
+
+import app.deps as deps
+from app.routers._shared import persona_router
+from app.prompts import PromptIndexEntry, StorePrompts
+from app.routers._shared.persona_router import (
+    NestedProfilePersonaAdapter,
+    PersonaRouterConfig,
+    build_persona_router,
+)
+from app.services.jti.runtime_settings import (
+    JtiRuntimeSettings,
+    PROFILE_PERSONA_KEY,
+    RULE_SECTION_FIELDS,
+    SYSTEM_DEFAULT_PROMPT_ID,
+    load_runtime_settings_from_prompt_manager,
+    save_runtime_settings_to_prompt_manager,
+)
+
+
+class CountingPromptManager:
+    def __init__(self, store_prompts):
+        self.store_prompts = store_prompts
+        self.reads = 0
+        self.writes = 0
+
+    def get_store_prompts(self, store_name, fields=None):
+        self.reads += 1
+        self.last_fields = fields
+        return self.store_prompts.model_copy(deep=True)
+
+    def save_store_prompts(self, store_prompts):
+        self.writes += 1
+        self.store_prompts = store_prompts.model_copy(deep=True)
+
+
+def _build_router():
+    config = PersonaRouterConfig(
+        tag="test",
+        store_name_zh="__jti__",
+        store_name_en="__jti__en",
+        system_default_prompt_id=SYSTEM_DEFAULT_PROMPT_ID,
+        persona_defaults={"zh": "預設", "en": "default"},
+        default_prompt_names={"zh": "預設", "en": "預設"},
+        custom_prompt_name_prefix={"zh": "自訂", "en": "自訂"},
+        persona_adapter=NestedProfilePersonaAdapter(
+            attr="jti_profiles_by_prompt",
+            key=PROFILE_PERSONA_KEY,
+        ),
+        runtime_settings_type=JtiRuntimeSettings,
+        runtime_settings_load=load_runtime_settings_from_prompt_manager,
+        runtime_settings_save=save_runtime_settings_to_prompt_manager,
+        runtime_settings_rule_section_fields=tuple(RULE_SECTION_FIELDS),
+        max_response_chars_ge=0,
+        max_response_chars_le=600,
+        main_agent=SimpleNamespace(remove_all_sessions=lambda: None),
+        prompt_index_attr="jti_prompt_index",
+        active_prompt_id_attr="jti_active_prompt_id",
+    )
+    return build_persona_router(config)
+
+
+def _endpoint(router, method, path):
+    for route in router.routes:
+        if route.path == path and method in route.methods:
+            return route.endpoint
+    raise AssertionError(f"{method} {path} not found")
+
+
+def _read(endpoint, **kwargs):
+    return json.loads(asyncio.run(endpoint(**kwargs)).body)
+
+
+def test_runtime_settings_endpoints_read_store_document_once(monkeypatch):
+    entry = PromptIndexEntry(name="自訂 1")
+    manager = CountingPromptManager(
+        StorePrompts(
+            store_name="__jti__",
+            jti_prompt_index=[entry],
+            jti_active_prompt_id=entry.id,
+        )
+    )
+    monkeypatch.setattr(deps, "prompt_manager", manager)
+    router = _build_router()
+
+    result = _read(_endpoint(router, "GET", "/runtime-settings"), prompt_id=None, language="zh")
+    assert result["prompt_id"] == entry.id
+    assert manager.reads == 1
+
+    manager.reads = 0
+    request = SimpleNamespace(
+        prompt_id=entry.id,
+        response_rule_sections=None,
+        welcome=None,
+        max_response_chars=120,
+    )
+    result = _endpoint(router, "POST", "/runtime-settings")(request=request, language="zh")
+    assert result["settings"]["max_response_chars"] == 120
+    assert manager.reads == 1
+    assert manager.writes == 1
+    assert (
+        manager.store_prompts.jti_profiles_by_prompt[entry.id]["runtime_settings"]["max_response_chars"]
+        == 120
+    )
+
+
+def test_clone_reads_and_writes_store_document_once(monkeypatch):
+    manager = CountingPromptManager(StorePrompts(store_name="__jti__"))
+    monkeypatch.setattr(deps, "prompt_manager", manager)
+    router = _build_router()
+
+    result = _endpoint(router, "POST", "/clone")(language="zh")
+
+    prompt_id = result["prompt"]["id"]
+    assert manager.reads == 1
+    assert manager.writes == 1
+    saved = manager.store_prompts
+    assert saved.jti_active_prompt_id == prompt_id
+    profile = saved.jti_profiles_by_prompt[prompt_id]
+    assert profile["persona"] == {"zh": "預設", "en": "default"}
+    assert "runtime_settings" in profile
+
+
+def test_read_cache_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(persona_router, "_READ_CACHE_TTL_SEC", 0.0)
+    manager = CountingPromptManager(StorePrompts(store_name="__jti__"))
+    monkeypatch.setattr(deps, "prompt_manager", manager)
+    router = _build_router()
+    list_prompts = _endpoint(router, "GET", "/")
+
+    asyncio.run(list_prompts(language="zh"))
+    asyncio.run(list_prompts(language="zh"))
+
+    assert manager.reads == 2
+
+
+def test_read_cache_serves_repeat_reads_until_mutation(monkeypatch):
+    monkeypatch.setattr(persona_router, "_READ_CACHE_TTL_SEC", 10.0)
+    manager = CountingPromptManager(StorePrompts(store_name="__jti__"))
+    monkeypatch.setattr(deps, "prompt_manager", manager)
+    router = _build_router()
+    list_prompts = _endpoint(router, "GET", "/")
+    get_active = _endpoint(router, "GET", "/active")
+
+    assert len(_read(list_prompts, language="zh")["prompts"]) == 1
+    asyncio.run(list_prompts(language="zh"))
+    assert _read(get_active, language="zh")["is_default"] is True
+    asyncio.run(get_active(language="zh"))
+    assert manager.reads == 2
+
+    cloned = _endpoint(router, "POST", "/clone")(language="zh")
+    manager.reads = 0
+
+    listed = _read(list_prompts, language="zh")
+    active = _read(get_active, language="zh")
+    assert manager.reads == 2
+    assert listed["active_prompt_id"] == cloned["prompt"]["id"]
+    assert active["prompt"]["id"] == cloned["prompt"]["id"]
+
+
+def test_read_cache_hits_return_independent_copies(monkeypatch):
+    monkeypatch.setattr(persona_router, "_READ_CACHE_TTL_SEC", 10.0)
+    manager = CountingPromptManager(StorePrompts(store_name="__jti__"))
+    monkeypatch.setattr(deps, "prompt_manager", manager)
+    router = _build_router()
+    list_prompts = _endpoint(router, "GET", "/")
+
+    first = _read(list_prompts, language="zh")
+    first["prompts"].clear()
+    second = _read(list_prompts, language="zh")
+    second["prompts"][0]["name"] = "changed"
+    third = _read(list_prompts, language="zh")
+
+    assert manager.reads == 1
+    assert len(third["prompts"]) == 1
+    assert third["prompts"][0]["name"] != "changed"
+
+
+def test_general_prompt_list_reads_store_document_once(monkeypatch):
+    from app.prompts import Prompt
+    from app.routers.general import prompts as general_prompts
+
+    custom = Prompt(name="Custom", content="persona")
+    manager = CountingPromptManager(
+        StorePrompts(store_name="store_a", prompts=[custom], active_prompt_id=custom.id)
+    )
+    manager.MAX_PROMPTS_PER_STORE = 3
+    monkeypatch.setattr(deps, "prompt_manager", manager)
+    monkeypatch.setattr(general_prompts, "_system_default_prompt_item", lambda store_name: {"id": "default"})
+
+    result = general_prompts.list_store_prompts("store_a")
+
+    assert manager.reads == 1
+    assert result["active_prompt_id"] == custom.id
+    assert [p["is_active"] for p in result["prompts"]] == [False, True]
+
+
+def test_update_prompt_mutates_index_entry_in_place(monkeypatch):
+    entry = PromptIndexEntry(name="自訂 1")
+    manager = CountingPromptManager(StorePrompts(store_name="__jti__", jti_prompt_index=[entry]))
+    monkeypatch.setattr(deps, "prompt_manager", manager)
+    router = _build_router()
+
+    request = SimpleNamespace(name="改名", content="新 persona")
+    result = _endpoint(router, "PUT", "/{prompt_id}")(prompt_id=entry.id, request=request, language="zh")
+
+    assert result["name"] == "改名"
+    assert result["content"] == "新 persona"
+    assert manager.writes == 1
+    saved_entry = manager.store_prompts.jti_prompt_index[0]
+    assert saved_entry.name == "改名"
+    assert saved_entry.updated_at == result["updated_at"]
+
+
+def test_list_prompts_projects_index_entries(monkeypatch):
+    first = PromptIndexEntry(name="自訂 2")
+    second = PromptIndexEntry(name="自訂 1")
+    store_prompts = StorePrompts(
+        store_name="__jti__",
+        jti_prompt_index=[first, second],
+        jti_active_prompt_id=second.id,
+        jti_profiles_by_prompt={second.id: {"persona": {"zh": "二號", "en": "two"}}},
+    )
+    monkeypatch.setattr(deps, "prompt_manager", CountingPromptManager(store_prompts))
+    router = _build_router()
+
+    result = _read(_endpoint(router, "GET", "/"), language="zh")
+
+    default, *custom = result["prompts"]
+    assert default["is_active"] is False
+    assert [p["id"] for p in custom] == [second.id, first.id]
+    assert custom[0] == {
+        "id": second.id,
+        "name": "自訂 1",
+        "created_at": second.created_at,
+        "updated_at": second.updated_at,
+        "content": "二號",
+        "is_default": False,
+        "readonly": False,
+        "is_active": True,
+    }
+    assert custom[1]["content"] == ""
+    assert custom[1]["is_active"] is False
+
+
+def test_runtime_settings_request_merges_fixed_language_fields(monkeypatch):
+    entry = PromptIndexEntry(name="自訂 1")
+    manager = CountingPromptManager(
+        StorePrompts(store_name="__jti__", jti_prompt_index=[entry], jti_active_prompt_id=entry.id)
+    )
+    monkeypatch.setattr(deps, "prompt_manager", manager)
+    router = _build_router()
+
+    request = persona_router._UpdateRuntimeSettingsRequestBase.model_validate(
+        {
+            "prompt_id": entry.id,
+            "response_rule_sections": {"en": {"role_scope": "EN scope"}, "ja": {"role_scope": "x"}},
+            "welcome": {"zh": {"title": "歡迎"}},
+        }
+    )
+    result = _endpoint(router, "POST", "/runtime-settings")(request=request, language="zh")
+
+    settings = result["settings"]
+    assert settings["response_rule_sections"]["en"]["role_scope"] == "EN scope"
+    assert settings["response_rule_sections"]["zh"]["role_scope"] != "EN scope"
+    assert settings["welcome"]["zh"]["title"] == "歡迎"
+
+
+def test_list_and_active_project_only_persona_fields(monkeypatch):
+    manager = CountingPromptManager(StorePrompts(store_name="__jti__"))
+    monkeypatch.setattr(deps, "prompt_manager", manager)
+    router = _build_router()
+    expected = ("jti_prompt_index", "jti_active_prompt_id", "jti_profiles_by_prompt")
+
+    asyncio.run(_endpoint(router, "GET", "/")(language="zh"))
+    assert manager.last_fields == expected
+
+    asyncio.run(_endpoint(router, "GET", "/active")(language="zh"))
+    assert manager.last_fields == expected
+
+
+def test_prompt_manager_projects_requested_fields():
+    from app.prompts import PromptManager
+
+    class FakeCollection:
+        def find_one(self, query, projection=None):
+            self.call = (query, projection)
+            return {"_id": "x", "store_name": "__hciot__", "hciot_active_prompt_id": "p1"}
+
+    manager = PromptManager.__new__(PromptManager)
+    manager.collection = FakeCollection()
+
+    store_prompts = manager.get_store_prompts("__hciot__", fields=["hciot_active_prompt_id"])
+
+    assert manager.collection.call == (
+        {"store_name": "__hciot__"},
+        {"hciot_active_prompt_id": 1, "store_name": 1},
+    )
+    assert store_prompts.hciot_active_prompt_id == "p1"
+
+    manager.get_store_prompts("__hciot__")
+    assert manager.collection.call == ({"store_name": "__hciot__"}, None)
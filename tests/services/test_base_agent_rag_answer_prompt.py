@@ -1,3 +1,5 @@
+import asyncio
+import threading
 from types import SimpleNamespace
 
 import pytest
@@ -149,3 +151,97 @@ async def test_chat_answers_from_rag_results_without_empty_response_recovery(mon
             "text": "PRP 是 Platelet-Rich Plasma，中文常稱高濃度血小板血漿。",
         }
     ]
+
+
+class FakeStreamingChatSession(FakeChatSession):
+    def send_message_stream(self, message, config=None):
+        self.sent_messages.append((message, config))
+        self._curated_history.append(SimpleNamespace(role="user", parts=[]))
+        self._curated_history.append(SimpleNamespace(role="model", parts=[]))
+        for text in ["PRP 是使用自體血液", "[cite: PRP", ".csv]取得血小板濃縮液的治療。"]:
+            yield _text_response(text)
+
+
+@pytest.mark.anyio
+async def test_chat_stream_yields_clean_deltas_then_full_result(monkeypatch):
+    import app.services.gemini_service as gemini_service
+
+    monkeypatch.setattr(gemini_service, "client", object())
+
+    session = Session(session_id="sid-rag-stream", language="zh")
+    session.metadata = {"store_name": "__hciot__", "model": "test-model"}
+    chat_session = FakeStreamingChatSession()
+    agent = FakeAgent(FakeSessionManager(session), chat_session)
+
+    events = [event async for event in agent.chat_stream("sid-rag-stream", "PRP是啥?")]
+
+    deltas = "".join(event["delta"] for event in events if "delta" in event)
+    assert deltas == "PRP 是使用自體血液取得血小板濃縮液的治療。"
+    assert "result" in events[-1]
+    assert events[-1]["result"]["message"] == deltas
+    assert events[-1]["result"]["citations"][0]["title"] == "PRP.csv"
+    answer_prompt, answer_config = chat_session.sent_messages[1]
+    assert "<知識庫查詢結果>" in answer_prompt
+    assert answer_config.tools is None
+
+
+class FlakyStreamingChatSession(FakeStreamingChatSession):
+    def __init__(self):
+        super().__init__()
+        self.stream_attempts = 0
+
+    def send_message_stream(self, message, config=None):
+        self.stream_attempts += 1
+        if self.stream_attempts == 1:
+            raise RuntimeError("503 UNAVAILABLE")
+        yield from super().send_message_stream(message, config=config)
+
+
+@pytest.mark.anyio
+async def test_chat_stream_retries_unavailable_answer_stream(monkeypatch):
+    import app.services.gemini_service as gemini_service
+
+    monkeypatch.setattr(gemini_service, "client", object())
+    monkeypatch.setattr(gemini_service.time, "sleep", lambda _: None)
+
+    session = Session(session_id="sid-rag-retry", language="zh")
+    session.metadata = {"store_name": "__hciot__", "model": "test-model"}
+    chat_session = FlakyStreamingChatSession()
+    agent = FakeAgent(FakeSessionManager(session), chat_session)
+
+    events = [event async for event in agent.chat_stream("sid-rag-retry", "PRP是啥?")]
+
+    assert chat_session.stream_attempts == 2
+    assert events[-1]["result"]["message"] == "PRP 是使用自體血液取得血小板濃縮液的治療。"
+    assert "error" not in events[-1]["result"]
+
+
+class EndlessStreamingChatSession(FakeChatSession):
+    def __init__(self):
+        super().__init__()
+        self.produced = 0
+        self.closed = threading.Event()
+
+    def send_message_stream(self, message, config=None):
+        try:
+            while True:
+                self.produced += 1
+                yield _text_response(f"chunk-{self.produced}")
+        finally:
+            self.closed.set()
+
+
+@pytest.mark.anyio
+async def test_stream_send_stops_upstream_when_consumer_leaves():
+    import app.services.base_agent as base_agent
+
+    chat_session = EndlessStreamingChatSession()
+    agent = FakeAgent(FakeSessionManager(Session(session_id="sid-stop")), chat_session)
+
+    stream = agent._stream_send(chat_session, "hi", None)
+    assert [await stream.__anext__() for _ in range(2)] == ["chunk-1", "chunk-2"]
+    await stream.aclose()
+
+    assert await asyncio.to_thread(chat_session.closed.wait, 2)
+    # 有界 queue：consumer 離開前 worker 最多只會多讀 queue 容量的 chunk
+    assert chat_session.produced <= base_agent._STREAM_QUEUE_SIZE + 4
@@ -97,6 +97,37 @@ class TestEmbeddingServiceRemote(unittest.TestCase):
         self.assertEqual(result.shape, (130, 1024))
         self.assertEqual(post_calls, [64, 64, 2])
 
+    def test_remote_encode_reuses_one_http_client(self):
+        service = self._make_service()
+        created = []
+
+        class FakeResponse:
+            def raise_for_status(self):
+                pass
+
+            def json(self):
+                return {"vectors": [[0.1] * 4]}
+
+        class FakeClient:
+            def __init__(self_inner, **kwargs):
+                created.append(self_inner)
+                self_inner.closed = False
+
+            def post(self_inner, url, json):
+                return FakeResponse()
+
+            def close(self_inner):
+                self_inner.closed = True
+
+        EmbeddingService._instance = service
+        with patch("httpx.Client", FakeClient):
+            service.encode("a")
+            service.encode("b")
+            self.assertTrue(EmbeddingService.release())
+
+        self.assertEqual(len(created), 1)
+        self.assertTrue(created[0].closed)
+
     def test_remote_encode_http_error_raises(self):
         import httpx
 
@@ -6,7 +6,11 @@ from app.routers.knowledge_utils import (
     MAX_SINGLE_UPLOAD_SIZE_BYTES,
     MAX_TOTAL_UPLOAD_FILES,
     SimpleRateLimiter,
+    extract_docx_text,
+    knowledge_cache_headers,
+    read_upload_limited,
     validate_upload_limits,
+    write_docx_text,
 )
 from app.services.rag.backfill import BackfillService
 
@@ -45,6 +49,70 @@ class TestRagLimitsAndPruning(unittest.TestCase):
         self.assertEqual(ctx.exception.status_code, 400)
         self.assertIn("單一檔案大小不可超過 5 MB", ctx.exception.detail)
 
+    def test_read_upload_limited_stops_past_size_cap(self):
+        import asyncio
+        import io
+
+        from fastapi import UploadFile
+
+        ok = UploadFile(file=io.BytesIO(b"hello"), filename="ok.txt")
+        self.assertEqual(asyncio.run(read_upload_limited(ok)), b"hello")
+
+        body = io.BytesIO(b"x" * (3 * MB))
+        large = UploadFile(file=body, filename="large.txt")
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(read_upload_limited(large, max_bytes=MB))
+        self.assertEqual(ctx.exception.status_code, 400)
+        self.assertLess(body.tell(), 3 * MB)
+
+    def test_write_docx_text_replaces_paragraphs_and_keeps_other_entries(self):
+        import io
+        import zipfile
+
+        ns = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+        document = (
+            f'<w:document xmlns:w="{ns}"><w:body>'
+            "<w:p><w:r><w:t>old</w:t></w:r></w:p><w:sectPr/>"
+            "</w:body></w:document>"
+        )
+        source = io.BytesIO()
+        with zipfile.ZipFile(source, "w") as zf:
+            zf.writestr("[Content_Types].xml", "<Types/>")
+            zf.writestr("word/document.xml", document)
+            zf.writestr("word/media/image1.png", b"\x89PNG" * 64, compress_type=zipfile.ZIP_DEFLATED)
+
+        updated = write_docx_text(source.getvalue(), "first\nsecond")
+
+        self.assertEqual(extract_docx_text(updated), "first\nsecond")
+        with zipfile.ZipFile(io.BytesIO(updated)) as zf:
+            self.assertEqual(zf.read("[Content_Types].xml"), b"<Types/>")
+            self.assertIn(b"sectPr", zf.read("word/document.xml"))
+            self.assertEqual(zf.getinfo("word/document.xml").compress_type, zipfile.ZIP_DEFLATED)
+            media = zf.getinfo("word/media/image1.png")
+            self.assertEqual(media.compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(zf.read(media), b"\x89PNG" * 64)
+
+    def test_write_docx_text_drops_xml_illegal_control_characters(self):
+        import io
+        import zipfile
+
+        ns = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+        source = io.BytesIO()
+        with zipfile.ZipFile(source, "w") as zf:
+            zf.writestr("word/document.xml", f'<w:document xmlns:w="{ns}"><w:body/></w:document>')
+
+        updated = write_docx_text(source.getvalue(), "page\x0cbreak\nstart\x01 end\ttab")
+
+        self.assertEqual(extract_docx_text(updated), "pagebreak\nstart end\ttab")
+
+    def test_knowledge_etag_changes_with_metadata_not_only_bytes(self):
+        doc = {"data": b"same", "filename": "a.txt", "content_type": "text/plain", "updated_at": "t1"}
+        etag = knowledge_cache_headers(doc)["ETag"]
+
+        self.assertEqual(knowledge_cache_headers(dict(doc))["ETag"], etag)
+        for change in ({"filename": "b.txt"}, {"content_type": "text/csv"}, {"updated_at": "t2"}):
+            self.assertNotEqual(knowledge_cache_headers({**doc, **change})["ETag"], etag)
+
     def test_total_file_count_limit(self):
         files = [{"filename": f"file_{i}.txt", "size": 100} for i in range(MAX_TOTAL_UPLOAD_FILES)]
         with self.assertRaises(HTTPException) as ctx:
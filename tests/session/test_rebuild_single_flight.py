@@ -0,0 +1,60 @@
+import threading
+import time
+import unittest
+
+from app.services.general import quiz_helpers
+from app.services.quiz.config import QuizFlowConfig
+
+
+class _SlowRebuildSessionManager:
+    def __init__(self):
+        self._sessions = {}
+        self.rebuild_calls = 0
+
+    def get_session(self, session_id):
+        return self._sessions.get(session_id)
+
+    def rebuild_session_from_logs(self, session_id, logs):
+        self.rebuild_calls += 1
+        time.sleep(0.05)
+        session = object()
+        self._sessions[session_id] = session
+        return session
+
+
+class _Logger:
+    def __init__(self):
+        self.calls = []
+
+    def get_session_logs(self, session_id, mode=None):
+        self.calls.append((session_id, mode))
+        return [{"session_id": session_id, "mode": mode, "turn_number": 1}]
+
+
+class TestRebuildSingleFlight(unittest.TestCase):
+    def test_concurrent_requests_rebuild_expired_session_once(self):
+        manager = _SlowRebuildSessionManager()
+        conversation_logger = _Logger()
+        config = QuizFlowConfig(
+            session_manager_getter=lambda: manager,
+            conversation_logger_getter=lambda: conversation_logger,
+        )
+        results = []
+
+        def worker():
+            results.append(quiz_helpers._get_or_rebuild_session("expired", config))
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(manager.rebuild_calls, 1)
+        self.assertEqual(conversation_logger.calls, [("expired", "jti")])
+        self.assertEqual(len(set(map(id, results))), 1)
+        self.assertEqual(quiz_helpers._rebuild_locks, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
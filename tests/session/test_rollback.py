@@ -1,5 +1,12 @@
+import asyncio
 import unittest
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
+
+from app.models.session import Session
+from app.schemas.chat import ChatRequest
+from app.services.general import managed_chat
+from app.services.general.managed_chat import ManagedChatConfig, ManagedChatService
 from app.services.logging.mongo_conversation_logger import MongoConversationLogger
 
 class TestRollback(unittest.TestCase):
@@ -44,5 +51,67 @@ class TestRollback(unittest.TestCase):
         self.assertEqual(query["session_id"], session_id)
         self.assertEqual(query["turn_number"], {"$gte": turn_number})
 
+    def test_replace_turns_from_reuses_truncated_turn_number(self):
+        self.mock_conversations.delete_many.return_value.deleted_count = 2
+        self.mock_conversations.insert_one.return_value.inserted_id = "new-id"
+
+        result = self.logger.replace_turns_from(
+            "test-session", 3, user_message="hi", agent_response="hello", mode="jti"
+        )
+
+        self.assertEqual(result, ("new-id", 3))
+        self.mock_conversations.find_one.assert_not_called()
+        self.assertEqual(self.mock_conversations.insert_one.call_args[0][0]["turn_number"], 3)
+
+    def test_replace_turns_from_without_deleted_turns_counts_normally(self):
+        self.mock_conversations.delete_many.return_value.deleted_count = 0
+        self.mock_conversations.find_one.return_value = {"turn_number": 1}
+
+        result = self.logger.replace_turns_from(
+            "test-session", 5, user_message="hi", agent_response="hello", mode="jti"
+        )
+
+        self.assertEqual(result[1], 2)
+
+
+class TestManagedChatRegenerate(unittest.TestCase):
+    def test_regenerated_agent_turn_is_truncated_once_and_logged_with_known_turn(self):
+        session = Session(session_id="sid", language="zh")
+        conversation_logger = MagicMock()
+        conversation_logger.delete_turns_from.return_value = 2
+        conversation_logger.get_session_logs.return_value = []
+        conversation_logger.log_conversation.return_value = ("new-id", 3)
+        session_manager = MagicMock()
+        session_manager.update_session.side_effect = lambda s: s
+
+        async def chat(session_id, user_message):
+            return {"message": "hello", "tool_calls": []}
+
+        service = ManagedChatService(
+            ManagedChatConfig(
+                app="test",
+                opening_messages={"zh": "hi"},
+                session_manager_getter=lambda: session_manager,
+                conversation_logger_getter=lambda: conversation_logger,
+                agent=SimpleNamespace(chat=chat, remove_session=lambda session_id: None),
+                quiz=SimpleNamespace(mode="jti", keywords=None, negative_keywords=None),
+            )
+        )
+
+        async def no_quiz(*args, **kwargs):
+            return None
+
+        with patch.object(managed_chat, "_get_or_rebuild_session", return_value=session), \
+                patch.object(managed_chat, "handle_quiz_message", side_effect=no_quiz):
+            response = asyncio.run(
+                service.send_message(ChatRequest(session_id="sid", message="hi", turn_number=3))
+            )
+
+        self.assertEqual(response.turn_number, 3)
+        conversation_logger.delete_turns_from.assert_called_once_with("sid", 3)
+        conversation_logger.replace_turns_from.assert_not_called()
+        self.assertEqual(conversation_logger.log_conversation.call_args.kwargs["turn_number"], 3)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from app.models.session import Session, SessionStep
+
+
+class TestSessionDump(unittest.TestCase):
+    def test_dump_reflects_in_place_mutation(self):
+        session = Session(language="en")
+        session.model_dump()
+
+        session.chat_history.append({"role": "user", "content": "hi"})
+        session.step = SessionStep.QUIZ
+        dumped = session.model_dump()
+
+        self.assertEqual(dumped["chat_history"], [{"role": "user", "content": "hi"}])
+        self.assertEqual(dumped["step"], SessionStep.QUIZ)
+        self.assertIsInstance(dumped["created_at"], str)
+
+    def test_dump_is_independent_of_session_state(self):
+        session = Session()
+        session.answers = {"q1": "a"}
+        dumped = session.model_dump()
+        dumped["answers"]["q1"] = "b"
+
+        self.assertEqual(session.answers, {"q1": "a"})
+
+    def test_kwargs_are_passed_through(self):
+        session = Session()
+        dumped = session.model_dump(include={"session_id"})
+        self.assertEqual(set(dumped), {"session_id", "created_at", "updated_at"})
+
+    def test_current_question_id_is_not_dumped(self):
+        session = Session()
+        self.assertIsNone(session.current_question_id)
+
+        session.current_question = {"id": "q3", "text": "..."}
+        self.assertEqual(session.current_question_id, "q3")
+        self.assertNotIn("current_question_id", session.model_dump())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,6 +23,113 @@ class TestConversationLogger(unittest.TestCase):
                     mode="",
                 )
 
+    def test_paginated_session_ids_order_by_latest_activity(self):
+        with TemporaryDirectory() as tmp_dir:
+            logger = ConversationLogger(log_dir=tmp_dir)
+            for session_id in ("older", "newer", "other-mode"):
+                logger.log_conversation(
+                    session_id=session_id,
+                    user_message="hi",
+                    agent_response="hello",
+                    mode="jti" if session_id != "other-mode" else "hciot",
+                )
+            logger.log_conversation(
+                session_id="older",
+                user_message="again",
+                agent_response="hello again",
+                mode="jti",
+            )
+
+            session_ids, total = logger.get_paginated_session_ids({"mode": "jti"}, page=1, page_size=1)
+
+            self.assertEqual(total, 2)
+            self.assertEqual(session_ids, ["older"])
+
+    def test_session_ids_after_cursor_walks_all_pages(self):
+        with TemporaryDirectory() as tmp_dir:
+            logger = ConversationLogger(log_dir=tmp_dir)
+            for session_id in ("s1", "s2", "s3"):
+                logger.log_conversation(
+                    session_id=session_id,
+                    user_message="hi",
+                    agent_response="hello",
+                    mode="jti",
+                )
+
+            first, after = logger.get_session_ids_after({"mode": "jti"}, page_size=2)
+            second, last = logger.get_session_ids_after({"mode": "jti"}, after=after, page_size=2)
+
+            expected, _ = logger.get_paginated_session_ids({"mode": "jti"}, page=1, page_size=3)
+            self.assertEqual(first + second, expected)
+            self.assertEqual(after[1], first[-1])
+            self.assertIsNone(last)
+
+    def test_export_session_ids_order_by_first_message_and_ignore_new_activity(self):
+        with TemporaryDirectory() as tmp_dir:
+            logger = ConversationLogger(log_dir=tmp_dir)
+            for session_id in ("first", "second", "other-mode"):
+                logger.log_conversation(
+                    session_id=session_id,
+                    user_message="hi",
+                    agent_response="hello",
+                    mode="jti" if session_id != "other-mode" else "hciot",
+                )
+            logger.log_conversation(
+                session_id="first",
+                user_message="again",
+                agent_response="hello again",
+                mode="jti",
+            )
+
+            self.assertEqual(logger.get_export_session_ids({"mode": "jti"}), ["second", "first"])
+
+    def test_session_logs_can_be_filtered_by_mode(self):
+        with TemporaryDirectory() as tmp_dir:
+            logger = ConversationLogger(log_dir=tmp_dir)
+            logger.log_conversation(session_id="s1", user_message="a", agent_response="b", mode="jti")
+            logger.log_conversation(session_id="s1", user_message="c", agent_response="d", mode="hciot")
+
+            self.assertEqual(len(logger.get_session_logs("s1")), 2)
+            jti_logs = logger.get_session_logs("s1", mode="jti")
+            self.assertEqual([log["user_message"] for log in jti_logs], ["a"])
+
+    def test_grouped_session_logs_by_mode(self):
+        with TemporaryDirectory() as tmp_dir:
+            logger = ConversationLogger(log_dir=tmp_dir)
+            logger.log_conversation(session_id="s1", user_message="a", agent_response="b", mode="jti")
+            logger.log_conversation(session_id="s1", user_message="c", agent_response="d", mode="jti")
+            logger.log_conversation(session_id="s2", user_message="e", agent_response="f", mode="hciot")
+
+            sessions = logger.get_grouped_session_logs_by_mode("jti")
+
+            self.assertEqual([session["session_id"] for session in sessions], ["s1"])
+            self.assertEqual(sessions[0]["total"], 2)
+            self.assertEqual(
+                [conv["user_message"] for conv in sessions[0]["conversations"]],
+                ["a", "c"],
+            )
+
+
+    def test_session_summaries_use_first_turn_and_latest_activity(self):
+        with TemporaryDirectory() as tmp_dir:
+            logger = ConversationLogger(log_dir=tmp_dir)
+            logger.log_conversation(
+                session_id="s1", user_message="first", agent_response="a", mode="jti",
+            )
+            logger.log_conversation(
+                session_id="s1", user_message="second", agent_response="b", mode="jti",
+            )
+
+            summaries = logger.get_session_summaries(["missing", "s1"], {"mode": "jti"})
+            logs = logger.get_session_logs("s1")
+
+            self.assertEqual(len(summaries), 1)
+            summary = summaries[0]
+            self.assertEqual(summary["session_id"], "s1")
+            self.assertEqual(summary["preview"], "first")
+            self.assertEqual(summary["message_count"], 2)
+            self.assertEqual(summary["first_message_time"], logs[0]["timestamp"])
+            self.assertEqual(summary["last_message_time"], logs[1]["timestamp"])
 
 if __name__ == "__main__":
     unittest.main()
@@ -167,6 +167,111 @@ class TestMongoConversationLogger(unittest.TestCase):
         self.assertEqual(len(logs), 5)
         self.mock_conversations.find.return_value.limit.assert_called_once_with(5)
 
+    def test_get_session_logs_pushes_mode_filter_to_query(self):
+        mock_cursor = MagicMock()
+        mock_cursor.sort.return_value = mock_cursor
+        mock_cursor.__iter__.return_value = iter([])
+        self.mock_conversations.find.return_value = mock_cursor
+
+        self.logger.get_session_logs("test-123", mode="jti")
+
+        self.mock_conversations.find.assert_called_once_with({"session_id": "test-123", "mode": "jti"})
+
+    def test_get_grouped_session_logs_by_mode_groups_in_pipeline(self):
+        first = datetime(2026, 6, 1, 10, 0, 0)
+        self.mock_conversations.aggregate.return_value = iter([
+            {"_id": "s1", "first_message_time": first, "total": 2},
+        ])
+        mock_cursor = MagicMock()
+        mock_cursor.sort.return_value = mock_cursor
+        mock_cursor.__iter__.return_value = iter([
+            {"_id": MagicMock(), "session_id": "s1", "turn_number": 1, "timestamp": first},
+            {"_id": MagicMock(), "session_id": "s1", "turn_number": 2, "timestamp": first},
+        ])
+        self.mock_conversations.find.return_value = mock_cursor
+
+        sessions = self.logger.get_grouped_session_logs_by_mode("jti")
+
+        pipeline = self.mock_conversations.aggregate.call_args[0][0]
+        self.assertEqual(pipeline[0], {"$match": {"mode": "jti"}})
+        self.assertNotIn("conversations", pipeline[1]["$group"])
+        self.assertEqual(self.mock_conversations.aggregate.call_args[1], {"allowDiskUse": True})
+        query, projection = self.mock_conversations.find.call_args[0]
+        self.assertEqual(query, {"mode": "jti", "session_id": {"$in": ["s1"]}})
+        self.assertNotIn("_id", projection)
+        self.assertEqual(projection["session_snapshot"], 1)
+        self.assertEqual(sessions[0]["session_id"], "s1")
+        self.assertEqual(sessions[0]["first_message_time"], first.isoformat())
+        self.assertEqual([c["turn_number"] for c in sessions[0]["conversations"]], [1, 2])
+        self.assertEqual(sessions[0]["conversations"][0]["timestamp"], first.isoformat())
+        self.assertEqual(sessions[0]["total"], 2)
+
+    def test_get_export_session_ids_sorts_by_first_message_time(self):
+        self.mock_conversations.aggregate.return_value = iter([{"_id": "s2"}, {"_id": "s1"}])
+
+        session_ids = self.logger.get_export_session_ids({"mode": "jti"})
+
+        pipeline = self.mock_conversations.aggregate.call_args[0][0]
+        self.assertEqual(session_ids, ["s2", "s1"])
+        self.assertEqual(pipeline[0], {"$match": {"mode": "jti"}})
+        self.assertEqual(pipeline[1]["$group"]["first_message_time"], {"$min": "$timestamp"})
+        self.assertEqual(pipeline[2], {"$sort": {"first_message_time": -1, "_id": -1}})
+        self.assertEqual(self.mock_conversations.aggregate.call_args[1], {"allowDiskUse": True})
+
+    def test_get_session_ids_after_walks_timestamps_without_grouping(self):
+        """測試游標分頁沿 timestamp 掃描、不對整個範圍 $group，且各頁不重複不遺漏。"""
+        base = datetime(2026, 6, 1, 10, 0, 0)
+        logs = [
+            {"session_id": sid, "mode": "jti", "timestamp": base + timedelta(minutes=minute)}
+            for sid, minute in [
+                ("a", 0), ("b", 1), ("a", 2), ("c", 3), ("d", 3),
+                ("e", 4), ("b", 5), ("f", 6), ("other", 7),
+            ]
+        ]
+        logs[-1]["mode"] = "hciot"
+
+        def matches(doc, query):
+            for key, cond in query.items():
+                if key == "$and":
+                    if not all(matches(doc, part) for part in cond):
+                        return False
+                elif isinstance(cond, dict):
+                    ops = {"$lte": doc[key].__le__, "$gt": doc[key].__gt__}
+                    if not all(ops[op](value) for op, value in cond.items()):
+                        return False
+                elif doc.get(key) != cond:
+                    return False
+            return True
+
+        def find(query, projection):
+            cursor = MagicMock()
+            cursor.sort.side_effect = lambda field, direction: iter(sorted(
+                (doc for doc in logs if matches(doc, query)),
+                key=lambda doc: doc[field], reverse=direction == -1,
+            ))
+            return cursor
+
+        self.mock_conversations.find.side_effect = find
+        self.mock_conversations.find_one.side_effect = lambda query, projection: next(
+            (doc for doc in logs if matches(doc, query)), None
+        )
+
+        pages, after = [], None
+        while True:
+            session_ids, after = self.logger.get_session_ids_after({"mode": "jti"}, after=after, page_size=2)
+            pages.append(session_ids)
+            if after is None:
+                break
+
+        self.assertEqual(pages, [["f", "b"], ["e", "d"], ["c", "a"]])
+        self.mock_conversations.aggregate.assert_not_called()
+
+    def test_get_grouped_session_logs_by_mode_propagates_errors(self):
+        self.mock_conversations.aggregate.side_effect = RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            self.logger.get_grouped_session_logs_by_mode("jti")
+
     def test_get_session_summaries_uses_aggregation_without_loading_full_logs(self):
         """測試列表摘要只用 aggregation，不撈完整對話內容。"""
         first_a = datetime(2026, 6, 1, 10, 0, 0)
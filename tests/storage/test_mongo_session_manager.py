@@ -24,6 +24,9 @@ class FakeRedisCache:
     def get(self, key):
         return self.values.get(key)
 
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
     def set(self, key, value, ex=None):
         self.values[key] = value
         self.ttls[key] = ex
@@ -133,6 +136,20 @@ class TestMongoSessionManager(unittest.TestCase):
         self.assertEqual(fetched.session_id, session.session_id)
         self.mock_sessions.find_one.assert_not_called()
 
+    def test_get_session_parses_bytes_cache_payload(self):
+        cache = FakeRedisCache()
+        manager = self._make_manager(cache_client=cache)
+        session = manager.create_session(language="en")
+        cache_key = f"session:hciot_app:{session.session_id}"
+        cache.values[cache_key] = cache.values[cache_key].encode("utf-8")
+
+        fetched = manager.get_session(session.session_id)
+
+        self.assertEqual(fetched.session_id, session.session_id)
+        self.assertEqual(fetched.language, "en")
+        self.assertEqual(fetched.created_at, session.created_at)
+        self.mock_sessions.find_one.assert_not_called()
+
     def test_get_session_backfills_redis_cache_after_mongo_miss(self):
         cache = FakeRedisCache()
         manager = self._make_manager(cache_client=cache)
@@ -145,6 +162,24 @@ class TestMongoSessionManager(unittest.TestCase):
         self.mock_sessions.find_one.assert_called_once_with({"session_id": "test-123"})
         self.assertIn("session:hciot_app:test-123", cache.values)
 
+    def test_get_sessions_batches_cache_and_mongo_misses(self):
+        cache = FakeRedisCache()
+        manager = self._make_manager(cache_client=cache)
+        cached = manager.create_session(language="en")
+        self.mock_sessions.find.return_value = [
+            self._make_valid_mock_doc(session_id="test-123", language="zh"),
+        ]
+
+        sessions = manager.get_sessions([cached.session_id, "test-123", "missing", "test-123"])
+
+        self.assertEqual(set(sessions), {cached.session_id, "test-123"})
+        self.assertEqual(sessions[cached.session_id].language, "en")
+        self.mock_sessions.find.assert_called_once_with(
+            {"session_id": {"$in": ["test-123", "missing"]}}
+        )
+        self.mock_sessions.find_one.assert_not_called()
+        self.assertIn("session:hciot_app:test-123", cache.values)
+
     def test_update_session_write_through_updates_redis_cache(self):
         cache = FakeRedisCache()
         manager = self._make_manager(cache_client=cache)